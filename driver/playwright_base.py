@@ -1,71 +1,226 @@
 # driver/playwright_base.py
-"""Módulo para gestionar el navegador utilizando Playwright."""
+"""Módulo para gestionar el navegador utilizando Playwright.
 
-from playwright.sync_api import sync_playwright
+`BrowserManager` lanza un único navegador (asíncrono) por ejecución y mantiene
+un pool de `BrowserContext` con su página ya creados. Cada escenario toma uno
+con `lease()` y lo devuelve con `release()`; el contexto usado se cierra y una
+tarea en segundo plano crea otro para el pool, así que el escenario siguiente
+no espera a `new_context()`/`new_page()`.
 
+Las tareas de reposición avanzan mientras el event loop está activo (durante
+los steps, que se ejecutan con `run_until_complete`), de modo que un pool de
+dos contextos basta para la ejecución secuencial: uno en uso y otro listo.
 
-class PlaywrightBase:
-    """Clase base para gestionar el navegador con Playwright."""
+`lease()` admite tres niveles de aislamiento (ISOLATION_MODES):
+- fresh: un contexto nuevo del pool, que se cierra al devolverlo.
+- reset: un contexto reutilizado entre escenarios, al que antes de entregarlo
+  se le borran cookies, permisos, almacenamiento (local, de sesión e
+  IndexedDB), rutas interceptadas y páginas extra, y se deja en about:blank.
+- shared: el mismo contexto reutilizado, sin limpiar (para escenarios que no
+  dependen del estado del navegador, como los de API).
 
-    _playwright = None
-    _browser = None
-    _context = None
-    _page = None
+Configuración por variables de entorno:
+- BROWSER_TYPE: chromium, firefox o webkit (por defecto, 'chromium').
+- HEADLESS: 'false' para ver el navegador (por defecto, 'true').
+- BROWSER_SLOW_MO: retardo en ms entre acciones (por defecto, 500).
+- BROWSER_POOL_SIZE: contextos preparados en el pool (por defecto, 2).
+- BROWSER_ISOLATION: aislamiento por defecto de `lease()` (por defecto, 'fresh').
+"""
 
-    @classmethod
-    def start_browser(cls, headless=True, browser_type="chromium"):
-        """Inicia el navegador y configura un contexto y una página nueva.
+import asyncio
+import os
+
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import async_playwright
+
+from utils.logger import Logger
+
+ISOLATION_MODES = ("fresh", "reset", "shared")
+# Borra el almacenamiento del origen en el que está la página
+CLEAR_STORAGE_SCRIPT = """async () => {
+    localStorage.clear();
+    sessionStorage.clear();
+    if (indexedDB.databases) {
+        const databases = await indexedDB.databases();
+        databases.forEach((database) => indexedDB.deleteDatabase(database.name));
+    }
+}"""
+
+logger = Logger().get_logger()
+
+
+class BrowserManager:
+    """Navegador de Playwright con un pool de contextos y páginas precreados."""
+
+    def __init__(self, browser_type=None, headless=None, pool_size=None):
+        """Inicializa la configuración del navegador (no lo lanza).
 
         Args:
-            headless (bool, opcional): Ejecutar en modo 'headless' (sin ventana).
-                Por defecto, True.
             browser_type (str, opcional): Tipo de navegador a utilizar
-                (chromium, firefox o webkit). Por defecto, 'chromium'.
-
-        Returns:
-            playwright.sync_api.Page: Página lista para su uso.
+                (chromium, firefox o webkit). Por defecto, BROWSER_TYPE o
+                'chromium'.
+            headless (bool, opcional): Ejecutar en modo 'headless' (sin
+                ventana). Por defecto, según HEADLESS (True si no se define).
+            pool_size (int, opcional): Contextos preparados en el pool. Por
+                defecto, BROWSER_POOL_SIZE o 2.
         """
-        if not cls._playwright:
-            cls._playwright = sync_playwright().start()
-        browser_launcher = getattr(cls._playwright, browser_type)
-        cls._browser = browser_launcher.launch(
-            headless=headless,
+        self.browser_type = browser_type or os.getenv("BROWSER_TYPE") or "chromium"
+        if headless is None:
+            headless = os.getenv("HEADLESS", "true").lower() != "false"
+        self.headless = headless
+        self.slow_mo = float(os.getenv("BROWSER_SLOW_MO", "500"))
+        self.pool_size = max(1, pool_size or int(os.getenv("BROWSER_POOL_SIZE", "2")))
+        self.playwright = None
+        self.browser = None
+        # Páginas listas para entregar (cada una en su propio contexto)
+        self._ready = None
+        self._refills = set()
+        # Página del contexto reutilizado por los modos 'reset' y 'shared'
+        self._reusable = None
+        self._reusable_leased = False
+        # Veces que un escenario tuvo que esperar a que se creara un contexto
+        self.waits = 0
+
+    async def start(self):
+        """Inicia Playwright, lanza el navegador y llena el pool de contextos."""
+        self.playwright = await async_playwright().start()
+        browser_launcher = getattr(self.playwright, self.browser_type)
+        self.browser = await browser_launcher.launch(
+            headless=self.headless,
             args=["--start-maximized"],
+            slow_mo=self.slow_mo,
         )
-        cls._context = cls._browser.new_context()
-        cls._page = cls._context.new_page()
-        return cls._page
+        self._ready = asyncio.Queue()
+        await asyncio.gather(*(self._refill() for _ in range(self.pool_size)))
+        logger.info(
+            f"🌐 Navegador {self.browser_type} listo con {self.pool_size} contextos "
+            "precreados."
+        )
+
+    async def _refill(self):
+        """Crea un contexto con su página y lo añade al pool."""
+        browser_context = await self.browser.new_context()
+        page = await browser_context.new_page()
+        self._ready.put_nowait(page)
 
-    @classmethod
-    def get_page(cls):
-        """Obtiene la página actual; si no existe, inicia un nuevo navegador.
+    def _schedule_refill(self):
+        """Lanza en segundo plano la creación de un contexto para el pool."""
+        task = asyncio.ensure_future(self._refill())
+        self._refills.add(task)
+        task.add_done_callback(self._refill_done)
+
+    def _refill_done(self, task):
+        """Retira la tarea terminada y registra su error, si lo hubo."""
+        self._refills.discard(task)
+        if not task.cancelled() and task.exception():
+            error = task.exception()
+            logger.error(f"❌ No se pudo reponer el pool de contextos: {error}")
+
+    async def lease(self, isolation=None):
+        """Toma una página (con su contexto) para un escenario.
+
+        Args:
+            isolation (str, opcional): Uno de ISOLATION_MODES. Por defecto,
+                BROWSER_ISOLATION o 'fresh'.
 
         Returns:
-            playwright.sync_api.Page: Página activa de Playwright.
+            playwright.async_api.Page: Página lista para su uso; su contexto
+                está en `page.context`.
+
+        Raises:
+            ValueError: Si el modo de aislamiento no es válido.
+
+        Note:
+            Con escenarios concurrentes, si el contexto reutilizado ya está
+            prestado a otro escenario se entrega uno nuevo ('fresh').
         """
-        if cls._page is None:
-            cls.start_browser()
-        return cls._page
-
-    @classmethod
-    def close_browser(cls):
-        """Cierra el contexto, el navegador y detiene Playwright."""
-        if cls._context:
-            cls._context.close()
-        if cls._browser:
-            cls._browser.close()
-        if cls._playwright:
-            cls._playwright.stop()
-
-    @classmethod
-    def reset_context(cls):
-        """Reinicia el contexto de navegación y crea una nueva página.
+        isolation = isolation or os.getenv("BROWSER_ISOLATION", "fresh")
+        if isolation not in ISOLATION_MODES:
+            modes = ", ".join(ISOLATION_MODES)
+            raise ValueError(f"Aislamiento no válido: '{isolation}' (usa {modes})")
+        if isolation == "fresh" or self._reusable_leased:
+            return await self._take()
+        # Se marca antes de esperar, para que otro escenario concurrente no lo tome
+        self._reusable_leased = True
+        try:
+            if self._reusable is None:
+                # El contexto reutilizado sale del pool para siempre: se repone
+                self._reusable = await self._take()
+                self._schedule_refill()
+            elif isolation == "reset":
+                await self._reset(self._reusable)
+        except BaseException:
+            self._reusable_leased = False
+            raise
+        return self._reusable
 
-        Returns:
-            playwright.sync_api.Page: Nueva página dentro del contexto reiniciado.
+    async def _take(self):
+        """Saca una página del pool de contextos nuevos.
+
+        Si el pool está vacío se espera a las reposiciones en curso o, si no
+        hay ninguna (porque fallaron), se crea un contexto en el momento; así
+        un error del navegador llega al escenario en lugar de bloquearlo.
+        """
+        if self._ready.empty():
+            self.waits += 1
+            logger.info("⏳ Pool de contextos vacío: esperando a uno nuevo.")
+        while self._ready.empty():
+            if self._refills:
+                pending = set(self._refills)
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await self._refill()
+        return self._ready.get_nowait()
+
+    async def _reset(self, page):
+        """Deja el contexto de `page` sin el estado del escenario anterior.
+
+        El almacenamiento se borra antes de salir del origen en el que quedó
+        la página, que es el único al que puede acceder el script.
         """
-        if cls._context:
-            cls._context.close()
-        cls._context = cls._browser.new_context()
-        cls._page = cls._context.new_page()
-        return cls._page
+        browser_context = page.context
+        for other in browser_context.pages:
+            if other is not page:
+                await other.close()
+        await browser_context.unroute_all(behavior="ignoreErrors")
+        await page.unroute_all(behavior="ignoreErrors")
+        await browser_context.clear_cookies()
+        await browser_context.clear_permissions()
+        if page.url.startswith("http"):
+            try:
+                await page.evaluate(CLEAR_STORAGE_SCRIPT)
+            except PlaywrightError as error:
+                logger.info(f"⚠️ No se pudo borrar el almacenamiento: {error}")
+        await page.goto("about:blank")
+
+    async def release(self, page):
+        """Devuelve una página obtenida con `lease()`.
+
+        Un contexto nuevo ('fresh') se cierra y se repone el pool en segundo
+        plano; el contexto reutilizado se conserva para el siguiente escenario.
+
+        Args:
+            page (playwright.async_api.Page): Página obtenida con `lease()`.
+        """
+        if page is self._reusable:
+            self._reusable_leased = False
+            return
+        self._schedule_refill()
+        await page.context.close()
+
+    async def close(self):
+        """Cierra los contextos del pool, el navegador y detiene Playwright."""
+        if self._reusable is not None:
+            await self._reusable.context.close()
+            self._reusable = None
+        if self._refills:
+            await asyncio.gather(*self._refills, return_exceptions=True)
+        while self._ready is not None and not self._ready.empty():
+            page = self._ready.get_nowait()
+            await page.context.close()
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+        self.browser = None
+        self.playwright = None
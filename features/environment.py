@@ -2,14 +2,33 @@
 """Módulo de configuración de entorno para pruebas con Playwright."""
 
 import asyncio
+import itertools
 import os
+import re
 from datetime import datetime
 from pathlib import Path
 
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
 
+from driver.playwright_base import ISOLATION_MODES, BrowserManager
+from features.pages.api_test_page import ApiTest
+from mocks.embedded import EmbeddedMockServer
+from utils.cassette import Cassette
 from utils.error_dictionary import ErrorDictionary
+from utils.http_client import HttpClient
+from utils.threaded_loop import ThreadedLoop
+
+# Numeración de escenarios para los tenants por escenario (API_TENANT=scenario)
+SCENARIO_IDS = itertools.count(1)
+# Escenarios de API que parten siempre del mismo estado del servidor mock
+API_TAG = "api_test"
+API_SNAPSHOT = "behave-baseline"
+# Carpeta de artefactos (trazas, capturas); cada worker paralelo usa la suya
+REPORTS_DIR = Path(os.getenv("REPORTS_DIR", "reports"))
+# Grabación/reproducción de las peticiones de API (API_CASSETTE=record|replay)
+CASSETTE_DIR = Path(os.getenv("API_CASSETTE_DIR", "resources/cassettes"))
+# Aislamiento del navegador según los tags del escenario (en orden de prioridad)
+ISOLATION_TAGS = {"FAIL": "fresh", "security": "fresh", API_TAG: "shared"}
 
 
 async def start_tracing(context):
@@ -18,11 +37,11 @@ async def start_tracing(context):
 
 
 async def stop_tracing(context):
-    """Detiene el tracing y guarda un archivo .zip en 'reports/traces/'.
+    """Detiene el tracing y guarda un archivo .zip en '<REPORTS_DIR>/traces/'.
 
     El nombre del archivo incluye fecha/hora para evitar sobreescrituras.
     """
-    trace_dir = Path("reports/traces")
+    trace_dir = REPORTS_DIR / "traces"
     trace_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     trace_path = trace_dir / f"trace_{timestamp}.zip"
@@ -30,11 +49,11 @@ async def stop_tracing(context):
 
 
 async def take_screenshot(page, scenario_name):
-    """Toma una captura de pantalla y la guarda en 'reports/screenshots/'.
+    """Toma una captura de pantalla y la guarda en '<REPORTS_DIR>/screenshots/'.
 
     El nombre del archivo incluye fecha/hora y el nombre del escenario.
     """
-    screenshot_dir = Path("reports/screenshots")
+    screenshot_dir = REPORTS_DIR / "screenshots"
     screenshot_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     scenario_safe_name = scenario_name.replace(" ", "_")
@@ -43,14 +62,96 @@ async def take_screenshot(page, scenario_name):
     print(f"🖼  Captura de pantalla guardada: {screenshot_path}")
 
 
+def scenario_tenant():
+    """Devuelve el tenant del servidor mock que usará el escenario.
+
+    Se configura con la variable de entorno API_TENANT:
+    - Sin definir o vacía: datos compartidos (tenant por defecto).
+    - 'scenario': un tenant nuevo por escenario, clonado de la semilla.
+    - Cualquier otro valor: ese tenant para toda la ejecución (p. ej. uno por
+      worker cuando se lanzan varias ejecuciones en paralelo).
+
+    Returns:
+        str | None: Nombre del tenant o None para el tenant por defecto.
+    """
+    tenant = os.getenv("API_TENANT", "")
+    if tenant == "scenario":
+        return f"run{os.getpid()}-{next(SCENARIO_IDS)}"
+    return tenant or None
+
+
+def reset_api_state(context, scenario):
+    """Deja los ítems del servidor mock en el estado inicial de la ejecución.
+
+    La primera vez que se usa un tenant se guarda una instantánea de su estado
+    y, en los escenarios siguientes, se restaura en O(1) en lugar de deshacer
+    los cambios con DELETEs. Solo aplica a escenarios con el tag `@api_test`;
+    los tenants por escenario ya empiezan limpios.
+    """
+    if API_TAG not in scenario.effective_tags or os.getenv("API_TENANT") == "scenario":
+        return
+    page = ApiTest(context)
+    context.loop.run_until_complete(page.login())
+    if context.api_tenant in context.api_snapshots:
+        context.loop.run_until_complete(page.restore_snapshot(API_SNAPSHOT))
+    else:
+        context.loop.run_until_complete(page.take_snapshot(API_SNAPSHOT))
+        context.api_snapshots.add(context.api_tenant)
+
+
+def scenario_cassette(scenario):
+    """Abre la cassette del escenario si API_CASSETTE está activo.
+
+    Cada escenario `@api_test` tiene su propio fichero,
+    `<API_CASSETTE_DIR>/<feature>/<escenario>.msgpack`.
+
+    Returns:
+        Cassette | None: Cassette en modo 'record' o 'replay', o None.
+    """
+    mode = os.getenv("API_CASSETTE", "")
+    if not mode or API_TAG not in scenario.effective_tags:
+        return None
+    name = re.sub(r"[^A-Za-z0-9]+", "_", scenario.name).strip("_").lower()
+    path = CASSETTE_DIR / Path(scenario.filename).stem / f"{name}.msgpack"
+    return Cassette(str(path), mode)
+
+
+def scenario_isolation(scenario):
+    """Elige el aislamiento del navegador para el escenario según sus tags.
+
+    - `@isolation_fresh`, `@isolation_reset` o `@isolation_shared` lo fijan
+      explícitamente (en el escenario o en la feature).
+    - `@FAIL` y `@security` usan siempre un contexto nuevo, para que el
+      estado que dejan otros escenarios no influya en su resultado.
+    - `@api_test` reutiliza el contexto sin limpiarlo: no usa el navegador.
+    - El resto usa BROWSER_ISOLATION (por defecto, 'fresh').
+
+    Returns:
+        str: Uno de `ISOLATION_MODES`.
+    """
+    tags = scenario.effective_tags
+    for mode in ISOLATION_MODES:
+        if f"isolation_{mode}" in tags:
+            return mode
+    for tag, mode in ISOLATION_TAGS.items():
+        if tag in tags:
+            return mode
+    return os.getenv("BROWSER_ISOLATION", "fresh")
+
+
 def before_all(context):
     """Se ejecuta antes de cualquier test (feature).
 
-    - Inicializa el loop de asyncio.
-    - Inicia Playwright y el navegador.
-    - Crea el browser_context y la page que usarán los escenarios.
+    - Arranca el servidor mock embebido si MOCK_EMBEDDED=true.
+    - Inicializa el loop de asyncio (en su propio hilo si BEHAVE_CONCURRENCY > 1).
+    - Lanza el navegador con su pool de contextos (`BrowserManager`).
     """
     load_dotenv()
+    context.mock_server = None
+    if os.getenv("MOCK_EMBEDDED", "false").lower() == "true":
+        # Servidor mock propio en un puerto libre: API_URL apunta a él
+        context.mock_server = EmbeddedMockServer()
+        os.environ["API_URL"] = context.mock_server.start()
     context.config.userdata = {
         "base_url": os.getenv("BASE_URL"),
         "api_url": os.getenv("API_URL"),
@@ -58,30 +159,42 @@ def before_all(context):
         "browser_type": os.getenv("BROWSER_TYPE"),
     }
     context.errors = ErrorDictionary()
+    # Tenants del servidor mock con instantánea inicial guardada
+    context.api_snapshots = set()
     context.config.setup_logging()
-    context.loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(context.loop)
-    context.playwright = context.loop.run_until_complete(async_playwright().start())
-    context.browser = context.loop.run_until_complete(
-        context.playwright.chromium.launch(
-            headless=True,
-            args=["--start-maximized"],
-            slow_mo=500,
-        )
-    )
-    context.browser_context = context.loop.run_until_complete(
-        context.browser.new_context()
+    if int(os.getenv("BEHAVE_CONCURRENCY", "1")) > 1:
+        # Escenarios concurrentes (scripts/run_concurrent.py): un loop en su hilo
+        context.loop = ThreadedLoop()
+    else:
+        context.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(context.loop)
+    context.browser_manager = BrowserManager(
+        browser_type=context.config.userdata["browser_type"]
     )
-    context.page = context.loop.run_until_complete(context.browser_context.new_page())
+    context.loop.run_until_complete(context.browser_manager.start())
 
 
 def before_scenario(context, scenario):
     """Se ejecuta antes de cada escenario.
 
+    - Selecciona el tenant del servidor mock y restaura su estado inicial.
+    - Activa la cassette de API del escenario, si se graba o reproduce.
+    - Toma un contexto y su página con el aislamiento que piden sus tags.
     - Inicia el tracing asíncrono en el contexto de Playwright.
     """
     if context.errors.has_errors():
         context.errors.clear_errors()
+    context.api_tenant = scenario_tenant()
+    context.api_cassette = scenario_cassette(scenario)
+    # Al reproducir no hay servidor que restaurar; al grabar, se graba desde aquí
+    if not (context.api_cassette and context.api_cassette.replaying):
+        reset_api_state(context, scenario)
+    HttpClient.use_cassette(context.api_cassette)
+    isolation = scenario_isolation(scenario)
+    context.page = context.loop.run_until_complete(
+        context.browser_manager.lease(isolation)
+    )
+    context.browser_context = context.page.context
     context.loop.run_until_complete(start_tracing(context.browser_context))
     print(f"\n\n🚀 Iniciando escenario: '{scenario.name}'")
 
@@ -91,12 +204,19 @@ def after_scenario(context, scenario):
 
     - Si hay errores o el escenario falla, tomar screenshot.
     - Detener tracing y guardar el archivo .zip.
+    - Devolver el contexto al navegador (si era nuevo, se cierra y se repone
+      el pool en segundo plano).
+    - Guardar la cassette de API si se está grabando.
     - Imprimir y limpiar errores acumulados.
     """
     if scenario.status == "failed" or context.errors.has_errors():
         print(f"⚠️ El escenario '{scenario.name}' falló o acumuló errores.")
         context.loop.run_until_complete(take_screenshot(context.page, scenario.name))
     context.loop.run_until_complete(stop_tracing(context.browser_context))
+    context.loop.run_until_complete(context.browser_manager.release(context.page))
+    if context.api_cassette:
+        context.api_cassette.save()
+        HttpClient.use_cassette(None)
     if context.errors.has_errors():
         for error in context.errors.get_all_errors():
             print(error)
@@ -106,11 +226,23 @@ def after_scenario(context, scenario):
 def after_all(context):
     """Se ejecuta una vez cuando se han corrido todas las features.
 
-    - Cierra el contexto de navegador, el navegador y Playwright de forma asíncrona.
-    - Cierra el event loop.
+    - Cierra el pool de contextos, el navegador y Playwright de forma asíncrona.
+    - Muestra la reutilización de conexiones HTTP y cierra la sesión compartida.
+    - Cierra el event loop y detiene el servidor mock embebido, si lo hay.
     """
-    context.loop.run_until_complete(context.browser_context.close())
-    context.loop.run_until_complete(context.browser.close())
-    context.loop.run_until_complete(context.playwright.stop())
+    context.loop.run_until_complete(context.browser_manager.close())
+    if context.browser_manager.waits:
+        print(
+            f"⏳ {context.browser_manager.waits} escenarios esperaron un contexto "
+            "nuevo: conviene subir BROWSER_POOL_SIZE."
+        )
+    stats = HttpClient.stats()
+    print(
+        f"🔌 API: {stats['requests']} peticiones, {stats['connections']} conexiones "
+        f"abiertas, {stats['reused']} reutilizadas."
+    )
+    context.loop.run_until_complete(HttpClient.close())
     context.loop.close()
+    if context.mock_server:
+        context.mock_server.stop()
     print("✅ Finalizada la ejecución de todas las pruebas.")
@@ -1,25 +1,55 @@
 # features/pages/api_test_page.py
 """Módulo que define los steps para la funcionalidad de API_TEST en BDD."""
 
+import asyncio
+import contextlib
+import json
 import os
+from itertools import islice
 
-import requests
 from dotenv import load_dotenv
 
+from utils.criteria import Criteria, CriteriaEngine
 from utils.error_dictionary import ErrorDictionary
+from utils.http_client import ApiResponse, HttpClient
+from utils.json_stream import JsonArrayStream
 from utils.logger import Logger
+from utils.token_cache import TokenCache
 
 errors = ErrorDictionary()
 load_dotenv()
 
 
+class BatchItemResponse(ApiResponse):
+    """Resultado de un ítem dentro de una respuesta de /items/batch.
+
+    Es un `ApiResponse` más, para que los métodos verify_* funcionen igual con
+    peticiones individuales o por lotes.
+    """
+
+    def __init__(self, result: dict):
+        """Separa el código de estado del resto del resultado del ítem."""
+        body = {k: v for k, v in result.items() if k != "status"}
+        super().__init__(result["status"], json.dumps(body, ensure_ascii=False))
+
+
 class ApiTest:
     """Clase para pruebas contra la API simulada."""
 
     def __init__(self, context=None):
         """Inicializa la configuración de la API y carga valores del contexto."""
         self.context = context
-        self.API_URL = os.getenv("API_URL")
+        # Con tenant, todas las peticiones van a su vista aislada de los datos
+        tenant = getattr(context, "api_tenant", None) if context else None
+        self.API_URL = os.getenv("API_URL") + (f"/t/{tenant}" if tenant else "")
+        # El token es del servidor, no del tenant: se cachea por la URL base
+        self.AUTH_KEY = os.getenv("API_URL")
+        self.MATCH_LIMIT = int(os.getenv("API_MATCH_LIMIT", "10"))
+        self.CONCURRENCY = int(os.getenv("API_CONCURRENCY", "10"))
+        self.BATCH_SIZE = int(os.getenv("API_BATCH_SIZE", "500"))
+        # Streaming de GET /items: solo se guardan una muestra y las coincidencias
+        self.STREAM = os.getenv("API_STREAM", "false").lower() == "true"
+        self.SAMPLE_SIZE = int(os.getenv("API_SAMPLE_SIZE", "3"))
         self.TOKEN = context.token if context and hasattr(context, "token") else None
         self.items_request = (
             context.items_request
@@ -27,10 +57,13 @@ class ApiTest:
             else None
         )
         self.logger = Logger().get_logger()
+        # Cliente asíncrono compartido: reutiliza las conexiones entre steps
+        self.http = HttpClient()
+        self.auth_lock = asyncio.Lock()
 
     async def test_login(self):
         """Realiza la petición POST a /login para obtener el token."""
-        response = requests.post(f"{self.API_URL}/login", json={})
+        response = await self.http.post(f"{self.API_URL}/login", json={})
         msg_login = f"❌ Error al hacer login: status {response.status_code}"
         assert response.status_code == 200, msg_login
 
@@ -41,11 +74,105 @@ class ApiTest:
 
         self.TOKEN = json_data["token"]
         self.logger.info(f"🔑 Token obtenido: {self.TOKEN}")
+        # Un token reproducido de una cassette no sirve contra el servidor real
+        if not (HttpClient.cassette and HttpClient.cassette.replaying):
+            TokenCache().put(self.AUTH_KEY, self.TOKEN, json_data.get("expires_in"))
 
-    async def test_get_items(self):
-        """Realiza la petición GET a /items con el token."""
+    async def login(self, cold=False):
+        """Obtiene un token reutilizando el de la caché compartida si sigue vigente.
+
+        Args:
+            cold (bool, opcional): Si es True, ignora la caché y hace siempre
+                POST /login (p. ej. en los escenarios de seguridad).
+        """
+        token = None if cold else TokenCache().get(self.AUTH_KEY)
+        if token is None:
+            await self.test_login()
+        else:
+            self.TOKEN = token
+            self.logger.info("🔑 Token reutilizado de la caché.")
+        if self.context:
+            self.context.token = self.TOKEN
+
+    async def authorized(self, method, url, **kwargs):
+        """Envía una petición con el token y renueva el token ante un 401.
+
+        Si el servidor rechaza el token (caducado o emitido por otra instancia
+        del mock), se descarta de la caché, se hace login y se repite la
+        petición una sola vez.
+
+        Args:
+            method (str): Método HTTP.
+            url (str): URL completa.
+            **kwargs: Argumentos de `HttpClient.request` (params, json...).
+
+        Returns:
+            ApiResponse: Respuesta de la petición.
+        """
+        token = self.TOKEN
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await self.http.request(method, url, headers=headers, **kwargs)
+        if response.status_code != 401 or token is None:
+            return response
+
+        await self.renew_token(token)
         headers = {"Authorization": f"Bearer {self.TOKEN}"}
-        response = requests.get(f"{self.API_URL}/items", headers=headers)
+        return await self.http.request(method, url, headers=headers, **kwargs)
+
+    async def renew_token(self, token):
+        """Descarta un token rechazado (401) y hace login de nuevo.
+
+        Las peticiones concurrentes con el mismo token solo renuevan una vez.
+        """
+        self.logger.info("🔑 Token rechazado (401): se renueva con un nuevo login.")
+        TokenCache().invalidate(self.AUTH_KEY, token)
+        async with self.auth_lock:
+            if self.TOKEN == token:
+                await self.login()
+
+    async def stream_items(self, consume):
+        """Recorre GET /items en streaming, sin cargar la respuesta entera.
+
+        Cada ítem se entrega a `consume` en cuanto se decodifica y después se
+        descarta, así que la memoria no depende del tamaño del catálogo. Como
+        en `authorized`, un 401 renueva el token y repite la petición una vez.
+
+        Args:
+            consume (callable): Recibe cada ítem; si devuelve False se deja de
+                leer la respuesta.
+
+        Returns:
+            dict: Resto de campos de la respuesta (success, total...), o {} si
+                se paró antes del final.
+        """
+        url = f"{self.API_URL}/items"
+        for attempt in range(2):
+            token = self.TOKEN
+            headers = {"Authorization": f"Bearer {token}"}
+            async with self.http.stream("GET", url, headers=headers) as response:
+                status = response.status_code
+                rejected = status == 401 and token is not None and attempt == 0
+                if not rejected:
+                    assert status == 200, f"❌ Error al obtener ítems: status {status}"
+                    stream = JsonArrayStream(response.chunks)
+                    async with contextlib.aclosing(aiter(stream)) as items:
+                        async for item in items:
+                            if consume(item) is False:
+                                return {}
+                    return stream.fields
+            # Se renueva fuera del `async with`, con la respuesta rechazada ya cerrada
+            await self.renew_token(token)
+
+    async def test_get_items(self):
+        """Realiza la petición GET a /items con el token.
+
+        Con `API_STREAM=true` la respuesta se recorre en streaming y solo se
+        guardan los primeros `API_SAMPLE_SIZE` ítems como muestra.
+        """
+        if self.STREAM:
+            await self.test_get_items_streaming()
+            return
+        response = await self.authorized("GET", f"{self.API_URL}/items")
         msg_items = f"❌ Error al obtener ítems: status {response.status_code}"
         assert response.status_code == 200, msg_items
 
@@ -60,91 +187,123 @@ class ApiTest:
         first_items = json_data['data'][:3]
         self.logger.info(f"📄 Items (primeros 3): {first_items}...")
 
+    async def test_get_items_streaming(self):
+        """Realiza GET /items en streaming, guardando solo una muestra acotada."""
+        sample = []
+        count = 0
+
+        def consume(item):
+            nonlocal count
+            count += 1
+            if len(sample) < self.SAMPLE_SIZE:
+                sample.append(item)
+
+        fields = await self.stream_items(consume)
+        error_msg = "❌ La respuesta de /items no indicó éxito."
+        assert fields.get("success") is True, error_msg
+
+        self.items_request = sample
+        self.logger.info(f"📄 Se han recorrido {count} ítems en streaming.")
+        self.logger.info(f"📄 Items (primeros {self.SAMPLE_SIZE}): {sample}...")
+
     async def test_get_items_no_token(self):
         """Realiza la petición GET a /items sin token."""
         self.logger.info("🚀 Enviando GET a /items sin token.")
-        response = requests.get(f"{self.API_URL}/items")
+        response = await self.http.get(f"{self.API_URL}/items")
         self.items_request = response
         msg = f"✅ Respuesta sin token: {response.status_code} - {response.text}"
         self.logger.info(msg)
 
+    async def query_items(self, filters: dict, fields=None):
+        """Realiza GET /items con filtros en servidor y devuelve la primera página.
+
+        Args:
+            filters (dict): Criterios con la misma sintaxis que la tabla Gherkin
+                (p. ej. {"price": ">100"}). Los valores vacíos se ignoran.
+            fields (list, opcional): Campos a proyectar en la respuesta.
+
+        Returns:
+            list: Ítems devueltos por el servidor (como mucho `API_MATCH_LIMIT`).
+        """
+        params = {k: v.strip() for k, v in filters.items() if v.strip()}
+        params["limit"] = str(self.MATCH_LIMIT)
+        if fields:
+            params["fields"] = ",".join(fields)
+        url = f"{self.API_URL}/items"
+        response = await self.authorized("GET", url, params=params)
+        msg_items = f"❌ Error al filtrar ítems {params}: status {response.status_code}"
+        assert response.status_code == 200, msg_items
+
+        json_data = response.json()
+        self.logger.info(f"🔎 Filtro {params} -> {json_data['total']} ítems en total")
+        return json_data["data"]
+
+    @staticmethod
+    def item_matches(item: dict, criteria: dict) -> bool:
+        """Indica si un ítem cumple una fila de criterios de la tabla Gherkin.
+
+        Se revisan campos como description, price, stock, available y
+        cualquier otro, comparando valores directos o usando >, <, etc. (ver
+        `utils/criteria.py`). Para varias filas o muchos ítems es preferible
+        compilar la tabla una vez con `CriteriaEngine`.
+        """
+        return Criteria(criteria)(item)
+
     async def verify_items_request(self, data_table):
         """Verifica que la lista de ítems cumpla con los criterios especificados.
 
         Si no se han obtenido ítems, se lanza un ValueError.
-        Se revisan campos como description, price, stock, available y
-        cualquier otro, comparando valores directos o usando >, <, etc.
+        Cada fila de criterios se envía como filtro a GET /items (todas a la
+        vez), de modo que solo se transfieren los ítems candidatos (con los
+        campos necesarios). Después, la tabla compilada se evalúa en local en
+        una sola pasada sobre los candidatos para validar el filtrado del
+        propio servidor.
+
+        Con `API_STREAM=true`, en cambio, se recorre el catálogo completo en
+        streaming y cada ítem se evalúa en cuanto llega, guardando como mucho
+        `API_MATCH_LIMIT` coincidencias por fila; la lectura se corta cuando
+        todas las filas las tienen.
         """
         if self.items_request is None:
             raise ValueError(
                 "No se han obtenido ítems. Llama primero a test_get_items()."
             )
 
-        for criteria in data_table:
-            matching_items = []
-            for item in self.items_request:
-                match = True
-                for key, value in criteria.items():
-                    val = value.strip()
-                    if val:
-                        item_value = item.get(key)
-                        if item_value is None:
-                            match = False
-                            break
-                        if key == "description":
-                            if val not in str(item_value):
-                                match = False
-                                break
-                        elif key in ["price", "stock"]:
-                            if val.startswith(">") or val.startswith("<"):
-                                operator = val[0]
-                                try:
-                                    threshold = float(val[1:])
-                                    item_numeric = float(item_value)
-                                except ValueError:
-                                    match = False
-                                    break
-                                if operator == ">" and not (item_numeric > threshold):
-                                    match = False
-                                    break
-                                if operator == "<" and not (item_numeric < threshold):
-                                    match = False
-                                    break
-                            else:
-                                try:
-                                    if float(item_value) != float(val):
-                                        match = False
-                                        break
-                                except ValueError:
-                                    match = False
-                                    break
-                        elif key == "available":
-                            if str(item_value).lower() != val.lower():
-                                match = False
-                                break
-                        else:
-                            if str(item_value) != val:
-                                match = False
-                                break
-                if match:
-                    matching_items.append(item)
+        engine = CriteriaEngine(data_table)
+        if self.STREAM:
+            matcher = engine.matcher(self.MATCH_LIMIT)
+            await self.stream_items(matcher.add)
+            self.assert_matches(data_table, matcher.matches)
+            return
 
+        queries = []
+        for criteria in data_table:
+            columns = [k for k, v in criteria.items() if v.strip() and k != "id"]
+            queries.append(self.query_items(criteria, fields=["id"] + columns))
+        candidates = {}
+        for page in await asyncio.gather(*queries):
+            for item in page:
+                # Las proyecciones de distintas filas del mismo ítem se combinan
+                candidates.setdefault(item["id"], {}).update(item)
+
+        self.assert_matches(data_table, engine.match(list(candidates.values())))
+
+    def assert_matches(self, data_table, all_matches):
+        """Comprueba que cada fila de criterios tenga al menos una coincidencia."""
+        for criteria, matching_items in zip(data_table, all_matches):
             msg_criteria = f"❌ No se encontró ningún ítem que cumpla {criteria}"
             assert matching_items, msg_criteria
             self.logger.info(f"📥 Criterios {criteria} -> Ítems: {matching_items}")
 
         self.logger.info("✅ Todos los criterios se han verificado correctamente.")
 
-    async def test_create_item_from_params(self, params: dict):
-        """Envía una petición POST a /items con los parámetros dados.
+    @staticmethod
+    def build_item_payload(params: dict) -> dict:
+        """Convierte una fila de la tabla Gherkin al cuerpo JSON de un ítem.
 
-        No forzamos el assert == 201, pues en casos 'unhappy' puede ser 400/409.
-        Devolvemos la respuesta para que se valide en el step correspondiente.
+        Convierte id, price, stock y available a su tipo y elimina los campos
+        vacíos. La fila se modifica en el sitio y también se devuelve.
         """
-        headers = {
-            "Authorization": f"Bearer {self.TOKEN}",
-            "Content-Type": "application/json",
-        }
         try:
             if params["id"].strip():
                 params["id"] = int(params["id"])
@@ -178,18 +337,127 @@ class ApiTest:
         except KeyError:
             pass
 
+        return params
+
+    async def test_create_item_from_params(self, params: dict):
+        """Envía una petición POST a /items con los parámetros dados.
+
+        No forzamos el assert == 201, pues en casos 'unhappy' puede ser 400/409.
+        Devolvemos la respuesta para que se valide en el step correspondiente.
+        """
+        self.build_item_payload(params)
+
         msg_params = f"🚀 Creando ítem con parámetros: {params}"
         self.logger.info(msg_params)
-        response = requests.post(f"{self.API_URL}/items", json=params, headers=headers)
+        url = f"{self.API_URL}/items"
+        response = await self.authorized("POST", url, json=params)
         msg_create = f"→ Respuesta creación: {response.status_code} - {response.text}"
         self.logger.info(msg_create)
         return response
 
+    async def create_items_batch(self, rows):
+        """Envía una única petición POST a /items/batch con todas las filas.
+
+        Como en test_create_item_from_params, no se fuerza el 201: se devuelve
+        una respuesta por ítem para que se valide en el step correspondiente.
+
+        Args:
+            rows (list): Filas de la tabla Gherkin (se convierten en el sitio).
+
+        Returns:
+            list[BatchItemResponse]: Respuesta de cada ítem, en el mismo orden.
+        """
+        items = [self.build_item_payload(params) for params in rows]
+        self.logger.info(f"🚀 Creando {len(items)} ítems en una sola petición")
+        url = f"{self.API_URL}/items/batch"
+        response = await self.authorized("POST", url, json={"items": items})
+        msg_batch = f"❌ Error en la creación por lotes: status {response.status_code}"
+        assert response.status_code == 200, msg_batch
+
+        results = [BatchItemResponse(r) for r in response.json()["results"]]
+        for result in results:
+            msg_create = f"→ Respuesta creación: {result.status_code} - {result.text}"
+            self.logger.info(msg_create)
+        return results
+
+    async def delete_items_batch(self, item_ids):
+        """Envía una única petición DELETE a /items/batch.
+
+        Returns:
+            dict: Resultado de cada id ({"status", "success", "message"...}).
+        """
+        self.logger.info(f"🚀 Enviando DELETE por lotes para los IDs {item_ids}")
+        url = f"{self.API_URL}/items/batch"
+        response = await self.authorized("DELETE", url, json={"ids": item_ids})
+        del_err = f"❌ Error en el borrado por lotes: status {response.status_code}"
+        assert response.status_code == 200, del_err
+        return {result["id"]: result for result in response.json()["results"]}
+
+    async def take_snapshot(self, name: str):
+        """Guarda con un nombre el estado actual de los ítems en el servidor mock."""
+        url = f"{self.API_URL}/admin/snapshots/{name}"
+        response = await self.authorized("POST", url)
+        msg_snap = f"❌ Error al guardar la instantánea: status {response.status_code}"
+        assert response.status_code == 201, msg_snap
+        self.logger.info(f"📸 Instantánea '{name}' guardada")
+
+    async def restore_snapshot(self, name: str):
+        """Restaura los ítems del servidor mock a una instantánea guardada."""
+        url = f"{self.API_URL}/admin/snapshots/{name}/restore"
+        response = await self.authorized("POST", url)
+        msg_rest = f"❌ Error al restaurar '{name}': status {response.status_code}"
+        assert response.status_code == 200, msg_rest
+        self.logger.info(f"⏪ Instantánea '{name}' restaurada")
+
+    async def check_items_concurrently(self, item_ids, check):
+        """Ejecuta `check(item_id)` para todos los ids a la vez y agrega los fallos.
+
+        Como mucho se lanzan `API_CONCURRENCY` peticiones simultáneas, así que el
+        tiempo total lo marca la petición más lenta y no la suma de todas. No
+        se para en el primer fallo: se comprueban todos los ids y se informa de
+        todos los que fallaron en una sola aserción.
+
+        Args:
+            item_ids (list): IDs a comprobar.
+            check (callable): Corrutina que recibe un id y lanza una excepción
+                (normalmente AssertionError) si la comprobación falla.
+
+        Returns:
+            dict: Resultado por id: None si fue bien o el mensaje del error.
+        """
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+        async def run(item_id):
+            async with semaphore:
+                try:
+                    await check(item_id)
+                except Exception as error:
+                    return f"{type(error).__name__}: {error}"
+            return None
+
+        outcomes = await asyncio.gather(*(run(item_id) for item_id in item_ids))
+        results = dict(zip(item_ids, outcomes))
+        failures = {item_id: msg for item_id, msg in results.items() if msg}
+        detail = "\n".join(
+            f"  - ID {item_id}: {msg}" for item_id, msg in failures.items()
+        )
+        msg_fail = f"❌ Fallaron {len(failures)} de {len(results)} ítems:\n{detail}"
+        assert not failures, msg_fail
+        return results
+
+    async def verify_created_items(self, item_ids):
+        """Verifica de forma concurrente que existan todos los ítems de item_ids."""
+        await self.check_items_concurrently(item_ids, self.verify_created_item)
+
+    async def verify_deleted_items(self, item_ids):
+        """Verifica de forma concurrente que no exista ninguno de los ítems."""
+        await self.check_items_concurrently(item_ids, self.verify_deleted_item)
+
     async def verify_created_item(self, item_id):
         """Verifica, vía GET /items/{item_id}, que el ítem exista."""
-        headers = {"Authorization": f"Bearer {self.TOKEN}"}
         self.logger.info(f"🚀 Verificando ítem con ID {item_id}")
-        response = requests.get(f"{self.API_URL}/items/{item_id}", headers=headers)
+        url = f"{self.API_URL}/items/{item_id}"
+        response = await self.authorized("GET", url)
         msg_item = f"❌ Error al obtener el ítem creado: status {response.status_code}"
         assert response.status_code == 200, msg_item
 
@@ -200,10 +468,10 @@ class ApiTest:
 
     async def test_delete_item(self, item_id: int):
         """Envía una petición DELETE a /items/{item_id} para eliminarlo."""
-        headers = {"Authorization": f"Bearer {self.TOKEN}"}
         msg_del = f"🚀 Enviando DELETE para el ítem con ID {item_id}"
         self.logger.info(msg_del)
-        response = requests.delete(f"{self.API_URL}/items/{item_id}", headers=headers)
+        url = f"{self.API_URL}/items/{item_id}"
+        response = await self.authorized("DELETE", url)
         del_err = f"❌ Error al borrar el ítem: status {response.status_code}"
         assert response.status_code == 200, del_err
 
@@ -216,18 +484,35 @@ class ApiTest:
         self.logger.info(msg_ok)
 
     async def delete_created_items(self, item_ids):
-        """Envía DELETE para cada ítem en item_ids."""
-        for item_id in item_ids:
-            await self.test_delete_item(item_id)
+        """Elimina todos los ítems de item_ids con peticiones por lotes concurrentes.
+
+        Los ids se reparten en lotes de `API_BATCH_SIZE` que se envían a la vez
+        (como mucho `API_CONCURRENCY`), y los borrados fallidos de todos los
+        lotes se informan juntos en una sola aserción.
+        """
+        remaining = iter(item_ids)
+        batches = list(iter(lambda: list(islice(remaining, self.BATCH_SIZE)), []))
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+        async def run(batch):
+            async with semaphore:
+                return await self.delete_items_batch(batch)
+
+        results = {}
+        for batch_results in await asyncio.gather(*(run(b) for b in batches)):
+            results.update(batch_results)
+        failed = {k: r["message"] for k, r in results.items() if r["status"] != 200}
+        assert not failed, f"❌ Falló la eliminación de {len(failed)} ítems: {failed}"
+        self.logger.info(f"✅ {len(results)} ítems eliminados correctamente.")
 
     async def verify_deleted_item(self, item_id):
         """Verifica que el ítem con ID item_id ya no exista.
 
         GET /items/{item_id} debe retornar 404 si fue borrado.
         """
-        headers = {"Authorization": f"Bearer {self.TOKEN}"}
         self.logger.info(f"🚀 Confirmando la eliminación del ítem con ID {item_id}")
-        response = requests.get(f"{self.API_URL}/items/{item_id}", headers=headers)
+        url = f"{self.API_URL}/items/{item_id}"
+        response = await self.authorized("GET", url)
         msg_err = f"❌ El ítem todavía existe (status {response.status_code})"
         assert response.status_code == 404, msg_err
         self.logger.info(f"✅ Ítem con ID {item_id} confirmado como eliminado.")
@@ -252,10 +537,10 @@ class ApiTest:
 
         Si no existe, lo crea con valores por defecto.
         """
-        headers = {"Authorization": f"Bearer {self.TOKEN}"}
         msg_ver = f"🚀 Verificando existencia del ítem con ID {item_id}"
         self.logger.info(msg_ver)
-        response = requests.get(f"{self.API_URL}/items/{item_id}", headers=headers)
+        url = f"{self.API_URL}/items/{item_id}"
+        response = await self.authorized("GET", url)
 
         if response.status_code == 200:
             msg_has = f"✅ El ítem con ID {item_id} ya existe."
@@ -273,9 +558,8 @@ class ApiTest:
         }
         msg_cre = f"🚀 Creando ítem con ID {item_id} porque no existía."
         self.logger.info(msg_cre)
-        resp = requests.post(
-            f"{self.API_URL}/items", json=default_item, headers=headers
-        )  # noqa
+        url = f"{self.API_URL}/items"
+        resp = await self.authorized("POST", url, json=default_item)
         assert resp.status_code == 201, f"❌ Error al crear el ítem con ID {item_id}."
 
     async def verify_duplicate_item_creation(self, creation_response):
@@ -293,9 +577,8 @@ class ApiTest:
 
     async def get_item_by_id(self, item_id: int):
         """Realiza GET /items/{item_id} y retorna la respuesta."""
-        headers = {"Authorization": f"Bearer {self.TOKEN}"}
         self.logger.info(f"🚀 Obteniendo ítem con ID {item_id}")
-        return requests.get(f"{self.API_URL}/items/{item_id}", headers=headers)
+        return await self.authorized("GET", f"{self.API_URL}/items/{item_id}")
 
     async def verify_item_not_found_response(self, response):
         """Verifica que la respuesta indique un 404 y 'Item not found'."""
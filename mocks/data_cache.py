@@ -0,0 +1,114 @@
+# mocks/data_cache.py
+"""Módulo que gestiona la caché binaria (msgpack) del snapshot YAML de items.
+
+Parsear un YAML grande con el cargador de PyYAML es lento, así que junto al YAML
+se guarda una copia compilada en msgpack. La copia solo se usa si sigue siendo
+fiel al YAML: primero se compara mtime y tamaño y, si no coinciden (p. ej. tras
+un `git checkout`), se compara el hash SHA-256 del contenido.
+"""
+
+import hashlib
+import os
+import time
+
+import msgpack
+import yaml
+
+from utils.logger import Logger
+
+# Cargador y volcador en C (libyaml) cuando están disponibles; si no, los de Python
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+logger = Logger().get_logger()
+
+
+def _file_signature(path):
+    """Devuelve (mtime_ns, tamaño) del fichero indicado."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_hash(path):
+    """Calcula el hash SHA-256 del contenido del fichero."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_cache(yaml_path, cache_path, items):
+    """Guarda los items en la caché msgpack firmada con el estado del YAML.
+
+    Args:
+        yaml_path (str): Ruta del YAML del que proceden los items.
+        cache_path (str): Ruta del fichero de caché.
+        items (list): Items a guardar.
+    """
+    mtime_ns, size = _file_signature(yaml_path)
+    payload = {
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "sha256": _file_hash(yaml_path),
+        "items": items,
+    }
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "wb") as file:
+        msgpack.pack(payload, file, use_bin_type=True)
+    os.replace(tmp_path, cache_path)
+
+
+def _read_cache(yaml_path, cache_path):
+    """Lee la caché si sigue siendo válida para el YAML actual.
+
+    Returns:
+        list | None: Items de la caché o None si no existe o está obsoleta.
+    """
+    try:
+        with open(cache_path, "rb") as file:
+            payload = msgpack.unpack(file, raw=False, strict_map_key=False)
+    except (FileNotFoundError, ValueError, msgpack.UnpackException):
+        return None
+
+    if (payload["mtime_ns"], payload["size"]) == _file_signature(yaml_path):
+        return payload["items"]
+    if payload["sha256"] == _file_hash(yaml_path):
+        # Mismo contenido con otro mtime: se re-firma para no volver a hashear
+        write_cache(yaml_path, cache_path, payload["items"])
+        return payload["items"]
+    return None
+
+
+def load_items(yaml_path, cache_path):
+    """Carga los items del snapshot usando la caché binaria si está al día.
+
+    Si la caché no sirve se parsea el YAML (con libyaml si está disponible) y
+    se regenera la caché para el siguiente arranque.
+
+    Args:
+        yaml_path (str): Ruta del YAML con la clave `items`.
+        cache_path (str): Ruta del fichero de caché msgpack.
+
+    Returns:
+        list: Lista de items; vacía si el YAML no existe o no es válido.
+    """
+    if not os.path.exists(yaml_path):
+        return []
+    start = time.perf_counter()
+    items = _read_cache(yaml_path, cache_path)
+    source = "caché msgpack"
+
+    if items is None:
+        source = f"YAML ({YamlLoader.__name__})"
+        try:
+            with open(yaml_path, "r", encoding="utf-8") as file:
+                data = yaml.load(file, Loader=YamlLoader)
+        except yaml.YAMLError:
+            return []
+        items = (data or {}).get("items", [])
+        write_cache(yaml_path, cache_path, items)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"📦 {len(items)} items cargados desde {source} en {elapsed_ms:.1f} ms")
+    return items
@@ -0,0 +1,144 @@
+# mocks/embedded.py
+"""Módulo que arranca el servidor mock embebido en la ejecución de behave.
+
+`EmbeddedMockServer` lanza `python -m mocks.mock_server` en un subproceso, en
+un puerto libre elegido al vuelo, y espera activamente a `GET /health` en lugar
+de un retardo fijo. Cada servidor trabaja sobre una copia temporal de los datos
+semilla, así que varias suites en paralelo en la misma máquina no comparten
+puerto ni ficheros (y la ejecución no modifica `resources/mock_data.yaml`).
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from utils.logger import Logger
+
+SEED_FILE = "resources/mock_data.yaml"
+# Intentos si otro proceso ocupa el puerto elegido antes de que el servidor lo abra
+START_ATTEMPTS = 3
+
+logger = Logger().get_logger()
+
+
+def _free_port(host):
+    """Pide al sistema un puerto TCP libre en `host`."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class EmbeddedMockServer:
+    """Servidor mock en un subproceso, con puerto efímero y datos aislados."""
+
+    def __init__(self, mode=None, host="127.0.0.1", timeout=None):
+        """Inicializa la configuración del servidor (no lo arranca).
+
+        Args:
+            mode (str, opcional): Modo de `mocks.serving.serve`. Por defecto,
+                MOCK_SERVER_MODE o 'gevent'.
+            host (str, opcional): Interfaz de escucha. Por defecto, '127.0.0.1'.
+            timeout (float, opcional): Segundos máximos de espera a /health.
+                Por defecto, MOCK_START_TIMEOUT o 30.
+        """
+        self.mode = mode or os.getenv("MOCK_SERVER_MODE", "gevent")
+        self.host = host
+        self.timeout = timeout or float(os.getenv("MOCK_START_TIMEOUT", "30"))
+        self.process = None
+        self.url = None
+        self._workdir = None
+
+    def start(self):
+        """Arranca el servidor y espera a que responda.
+
+        Returns:
+            str: URL base del servidor (p. ej. 'http://127.0.0.1:54321').
+
+        Raises:
+            RuntimeError: Si el servidor termina o no responde a tiempo.
+        """
+        self._workdir = Path(tempfile.mkdtemp(prefix="mock-server-"))
+        seed_file = os.getenv("MOCK_DATA_FILE", SEED_FILE)
+        data_file = self._workdir / Path(seed_file).name
+        shutil.copy2(seed_file, data_file)
+        env = {**os.environ, "MOCK_DATA_FILE": str(data_file), "MOCK_SWAGGER": "false"}
+        log_path = self._workdir / "server.log"
+
+        for attempt in range(1, START_ATTEMPTS + 1):
+            port = _free_port(self.host)
+            command = [
+                sys.executable,
+                "-m",
+                "mocks.mock_server",
+                "--server",
+                self.mode,
+                "--host",
+                self.host,
+                "--port",
+                str(port),
+                "--no-swagger",
+                "--quiet",
+            ]
+            with open(log_path, "wb") as log_file:
+                self.process = subprocess.Popen(
+                    command, env=env, stdout=log_file, stderr=subprocess.STDOUT
+                )
+            self.url = f"http://{self.host}:{port}"
+            start = time.perf_counter()
+            if self._wait_ready():
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                msg_ready = f"🧩 Servidor mock embebido listo en {self.url}"
+                logger.info(f"{msg_ready} ({elapsed_ms:.0f} ms)")
+                return self.url
+            if self.process.poll() is None:
+                self.stop()
+                msg_timeout = f"❌ El servidor mock no respondió en {self.timeout:.0f} s"
+                raise RuntimeError(f"{msg_timeout} ({self.url})")
+            logger.info(f"⚠️ El servidor mock terminó al arrancar (intento {attempt}).")
+
+        output = log_path.read_text(encoding="utf-8", errors="replace")
+        self.stop()
+        raise RuntimeError(f"❌ No se pudo arrancar el servidor mock:\n{output}")
+
+    def _wait_ready(self):
+        """Sondea /health hasta que responde 200, el proceso muere o se agota el tiempo.
+
+        Returns:
+            bool: True si el servidor está listo.
+        """
+        deadline = time.monotonic() + self.timeout
+        delay = 0.02
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                return False
+            try:
+                health = f"{self.url}/health"
+                with urllib.request.urlopen(health, timeout=1) as response:
+                    if response.status == 200:
+                        return True
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                pass
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+        return False
+
+    def stop(self):
+        """Detiene el servidor (SIGTERM, que compacta el diario) y borra sus datos."""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+        if self._workdir:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+            self._workdir = None
@@ -0,0 +1,129 @@
+# mocks/item_query.py
+"""Módulo que define el filtrado, la paginación y la proyección de GET /items.
+
+Los filtros usan los mismos operadores que las tablas de criterios de los
+escenarios de API (ver `ApiTest.verify_items_request`):
+
+- `description`: contiene el texto indicado.
+- `price`, `stock`: `>N`, `<N` o igualdad numérica.
+- `available`: igualdad sin distinguir mayúsculas (`true`/`false`).
+- Resto de campos (cualquiera, como en las tablas de criterios): igualdad
+  exacta como texto. Un item sin el campo no cumple el filtro.
+
+Además se admiten `limit`, `offset` y `fields` (lista separada por comas).
+"""
+
+NUMERIC_FIELDS = ("price", "stock")
+RESERVED_PARAMS = ("limit", "offset", "fields")
+
+
+class InvalidQueryError(ValueError):
+    """Error de validación de los parámetros de consulta de /items."""
+
+
+class ItemQuery:
+    """Consulta compilada sobre la colección de items."""
+
+    def __init__(self, filters=None, limit=None, offset=0, fields=None):
+        """Inicializa la consulta.
+
+        Args:
+            filters (dict, opcional): Campo -> valor tal y como llega en la URL.
+            limit (int, opcional): Máximo de items a devolver. None = sin límite.
+            offset (int, opcional): Items a saltar antes de la página.
+            fields (list, opcional): Campos a incluir en cada item.
+        """
+        self.filters = {k: v.strip() for k, v in (filters or {}).items() if v.strip()}
+        self.limit = limit
+        self.offset = offset
+        self.fields = fields
+        # Condiciones normalizadas (campo -> (operador, operando)) para los índices
+        self.conditions = {}
+        self.predicates = [self._compile(k, v) for k, v in self.filters.items()]
+
+    @classmethod
+    def from_args(cls, args):
+        """Construye la consulta a partir de `request.args`.
+
+        Args:
+            args (werkzeug.datastructures.MultiDict): Parámetros de la URL.
+
+        Returns:
+            ItemQuery: Consulta lista para aplicar.
+
+        Raises:
+            InvalidQueryError: Si algún parámetro no es válido.
+        """
+        filters = {k: v for k, v in args.items() if k not in RESERVED_PARAMS}
+
+        limit = cls._parse_int(args, "limit")
+        offset = cls._parse_int(args, "offset") or 0
+        fields = None
+        if args.get("fields", "").strip():
+            fields = [f.strip() for f in args["fields"].split(",") if f.strip()]
+        return cls(filters, limit=limit, offset=offset, fields=fields)
+
+    @staticmethod
+    def _parse_int(args, key):
+        """Lee un entero no negativo de los parámetros, o None si no viene."""
+        raw = args.get(key, "").strip()
+        if not raw:
+            return None
+        if not raw.isdigit():
+            raise InvalidQueryError(f"Invalid value for '{key}': {raw}")
+        return int(raw)
+
+    def _compile(self, key, value):
+        """Traduce un filtro a una función `item -> bool`."""
+        if key == "description":
+            return lambda item: key in item and value in str(item[key])
+
+        if key in NUMERIC_FIELDS:
+            operator = value[0] if value[0] in "<>" else "="
+            raw_number = value[1:] if operator != "=" else value
+            try:
+                threshold = float(raw_number)
+            except ValueError:
+                raise InvalidQueryError(f"Invalid value for '{key}': {value}") from None
+            self.conditions[key] = (operator, threshold)
+
+            def numeric(item):
+                try:
+                    number = float(item[key])
+                except (KeyError, TypeError, ValueError):
+                    return False
+                if operator == ">":
+                    return number > threshold
+                if operator == "<":
+                    return number < threshold
+                return number == threshold
+
+            return numeric
+
+        if key == "available":
+            expected = value.lower()
+            self.conditions[key] = ("=", expected)
+            return lambda item: key in item and str(item[key]).lower() == expected
+
+        self.conditions[key] = ("=", value)
+        return lambda item: key in item and str(item[key]) == value
+
+    def matches(self, item):
+        """Indica si un item cumple todos los filtros."""
+        return all(predicate(item) for predicate in self.predicates)
+
+    def paginate(self, matched):
+        """Aplica `offset`, `limit` y la proyección a los items filtrados.
+
+        Args:
+            matched (list): Items que cumplen los filtros, en orden.
+
+        Returns:
+            list: Página de items (proyectados si se pidió `fields`).
+        """
+        start = self.offset
+        end = None if self.limit is None else start + self.limit
+        page = matched[start:end]
+        if self.fields:
+            page = [{f: item[f] for f in self.fields if f in item} for item in page]
+        return page
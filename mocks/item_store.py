@@ -0,0 +1,554 @@
+# mocks/item_store.py
+"""Módulo que define el repositorio en memoria de items del servidor mock.
+
+El estado del repositorio es una instantánea inmutable (`StoreSnapshot`)
+construida sobre las estructuras persistentes de `mocks.persistent`:
+
+- Los items se indexan por su `id` en un `HashTrieMap`, junto con su número de
+  secuencia de alta, y el orden de inserción se guarda en una lista ordenada
+  de `(seq, id)`. El listado completo se devuelve en el orden en el que se
+  cargaron o crearon los items.
+- Índices hash sobre `category` y `available` (valor -> `(seq, id)`).
+- Índices ordenados sobre `price` y `stock` (`(valor, seq, id)`), que
+  resuelven `>`, `<` e igualdad con búsqueda binaria.
+
+Concurrencia: las escrituras se serializan con `ItemStore.lock` (reentrante),
+que los servidores multihilo usan también para agrupar una mutación con su
+registro en el diario. Cada escritura construye una instantánea nueva que
+comparte con la anterior todo lo que no cambia y la publica con una única
+asignación. Los lectores no toman ningún lock: trabajan sobre la instantánea
+vigente al empezar, que es siempre coherente (items, índices y versión) y
+nunca cambia bajo sus pies.
+
+Coste de las escrituras: alta, modificación y baja copian solo el camino de
+la raíz a la hoja en el mapa de items y en cada índice, O(log n) con nodos de
+tamaño acotado. `ItemStore.add_many` y `ItemStore.delete_many` aplican un
+lote entero sobre una sola instantánea nueva y la publican una vez (una sola
+versión más), en lugar de publicar una por item. `pruebas/bench_item_store.py`
+mide las escrituras junto a las consultas.
+"""
+
+import threading
+
+from mocks.persistent import ChunkedSortedList, HashTrieMap
+
+HASH_INDEXED_FIELDS = ("category", "available")
+SORTED_INDEXED_FIELDS = ("price", "stock")
+INDEXED_FIELDS = ("id",) + HASH_INDEXED_FIELDS + SORTED_INDEXED_FIELDS
+
+
+def _hash_key(field, value):
+    """Normaliza un valor igual que lo compara `ItemQuery` para ese campo."""
+    return str(value).lower() if field == "available" else str(value)
+
+
+def _sort_key(value):
+    """Convierte un valor a número para el índice ordenado, o None si no lo es."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class StoreSnapshot:
+    """Estado inmutable del repositorio en una versión concreta."""
+
+    __slots__ = (
+        "_items",
+        "_order",
+        "_hash_indexes",
+        "_sorted_indexes",
+        "_next_seq",
+        "version",
+    )
+
+    def __init__(self, items, order, hash_indexes, sorted_indexes, next_seq, version):
+        """Inicializa la instantánea (ver `StoreSnapshot.build`).
+
+        Args:
+            items (HashTrieMap): id -> `(seq, item)`.
+            order (ChunkedSortedList): Pares `(seq, id)` en orden de inserción.
+            hash_indexes (dict): Campo -> HashTrieMap de valor a
+                ChunkedSortedList de `(seq, id)`.
+            sorted_indexes (dict): Campo -> ChunkedSortedList de `(valor, seq, id)`.
+            next_seq (int): Número de secuencia del próximo alta.
+            version (int): Versión del repositorio (invalida la caché de respuestas).
+        """
+        self._items = items
+        self._order = order
+        self._hash_indexes = hash_indexes
+        self._sorted_indexes = sorted_indexes
+        self._next_seq = next_seq
+        self.version = version
+
+    @classmethod
+    def build(cls, items):
+        """Construye una instantánea a partir de una lista de items.
+
+        Carga masiva: los índices se construyen con un único sort por campo en
+        lugar de una inserción por item.
+
+        Args:
+            items (list): Items iniciales. Si hay ids repetidos, prevalece el
+                último.
+
+        Returns:
+            StoreSnapshot: Instantánea en la versión 0.
+        """
+        by_id = {item["id"]: item for item in items}
+        entries = [
+            (seq, item_id, item) for seq, (item_id, item) in enumerate(by_id.items())
+        ]
+
+        hash_values = {field: {} for field in HASH_INDEXED_FIELDS}
+        sorted_values = {field: [] for field in SORTED_INDEXED_FIELDS}
+        for seq, item_id, item in entries:
+            for field, index in hash_values.items():
+                if field in item:
+                    key = _hash_key(field, item[field])
+                    index.setdefault(key, []).append((seq, item_id))
+            for field, values in sorted_values.items():
+                value = _sort_key(item.get(field))
+                if value is not None:
+                    values.append((value, seq, item_id))
+
+        return cls(
+            HashTrieMap.from_items(
+                (item_id, (seq, item)) for seq, item_id, item in entries
+            ),
+            ChunkedSortedList.from_sorted(
+                [(seq, item_id) for seq, item_id, _ in entries]
+            ),
+            {
+                field: HashTrieMap.from_items(
+                    (key, ChunkedSortedList.from_sorted(bucket))
+                    for key, bucket in index.items()
+                )
+                for field, index in hash_values.items()
+            },
+            {
+                field: ChunkedSortedList.from_sorted(sorted(values))
+                for field, values in sorted_values.items()
+            },
+            len(entries),
+            0,
+        )
+
+    def __len__(self):
+        """Devuelve el número de items."""
+        return len(self._items)
+
+    def __contains__(self, item_id):
+        """Indica si existe un item con el `item_id` dado."""
+        return item_id in self._items
+
+    def get(self, item_id):
+        """Devuelve el item con el `item_id` dado o None si no existe."""
+        entry = self._items.get(item_id)
+        return entry[1] if entry is not None else None
+
+    def all(self):
+        """Devuelve todos los items en orden de inserción."""
+        items = self._items
+        return [items.get(item_id)[1] for _, item_id in self._order]
+
+    def _reindex(self, removed=(), added=()):
+        """Calcula los índices secundarios tras quitar y añadir entradas.
+
+        Cada índice se modifica con una sola escritura por lotes, así que un
+        lote copia cada nodo afectado una vez.
+
+        Args:
+            removed (list, opcional): Entradas `(seq, id, item)` a quitar.
+            added (list, opcional): Entradas `(seq, id, item)` a añadir.
+
+        Returns:
+            tuple: (índices hash, índices ordenados) nuevos.
+        """
+        hash_indexes = dict(self._hash_indexes)
+        for field, index in self._hash_indexes.items():
+            changes = {}
+            for slot, entries in enumerate((removed, added)):
+                for seq, item_id, item in entries:
+                    if field in item:
+                        key = _hash_key(field, item[field])
+                        changes.setdefault(key, ([], []))[slot].append((seq, item_id))
+            if not changes:
+                continue
+            buckets, emptied = {}, []
+            for key, (gone, new) in changes.items():
+                bucket = index.get(key, ChunkedSortedList())
+                bucket = bucket.remove_many(gone).insert_many(new)
+                if bucket:
+                    buckets[key] = bucket
+                else:
+                    emptied.append(key)
+            hash_indexes[field] = index.set_many(buckets).delete_many(emptied)
+        sorted_indexes = dict(self._sorted_indexes)
+        for field, index in self._sorted_indexes.items():
+            gone, new = [], []
+            for values, entries in ((gone, removed), (new, added)):
+                for seq, item_id, item in entries:
+                    value = _sort_key(item.get(field))
+                    if value is not None:
+                        values.append((value, seq, item_id))
+            sorted_indexes[field] = index.remove_many(gone).insert_many(new)
+        return hash_indexes, sorted_indexes
+
+    def added(self, item):
+        """Devuelve una instantánea nueva con `item` al final (su id no existe)."""
+        return self.added_many((item,))
+
+    def added_many(self, items):
+        """Devuelve una instantánea nueva con `items` al final, en su orden.
+
+        Args:
+            items (list): Items con ids distintos entre sí y que no existen.
+
+        Returns:
+            StoreSnapshot: Instantánea en la versión siguiente.
+        """
+        entries = [
+            (seq, item["id"], item) for seq, item in enumerate(items, self._next_seq)
+        ]
+        return StoreSnapshot(
+            self._items.set_many(
+                (item_id, (seq, item)) for seq, item_id, item in entries
+            ),
+            self._order.insert_many((seq, item_id) for seq, item_id, _ in entries),
+            *self._reindex(added=entries),
+            self._next_seq + len(entries),
+            self.version + 1,
+        )
+
+    def updated(self, item_id, item):
+        """Devuelve una instantánea nueva con el item sustituido por `item`."""
+        seq, old = self._items.get(item_id)
+        return StoreSnapshot(
+            self._items.set(item_id, (seq, item)),
+            self._order,
+            *self._reindex(removed=[(seq, item_id, old)], added=[(seq, item_id, item)]),
+            self._next_seq,
+            self.version + 1,
+        )
+
+    def deleted(self, item_id):
+        """Devuelve una instantánea nueva sin el item (que debe existir)."""
+        return self.deleted_many((item_id,))
+
+    def deleted_many(self, item_ids):
+        """Devuelve una instantánea nueva sin los items indicados.
+
+        Args:
+            item_ids (list): Ids distintos entre sí y que existen.
+
+        Returns:
+            StoreSnapshot: Instantánea en la versión siguiente.
+        """
+        entries = []
+        for item_id in item_ids:
+            seq, item = self._items.get(item_id)
+            entries.append((seq, item_id, item))
+        return StoreSnapshot(
+            self._items.delete_many(item_ids),
+            self._order.remove_many((seq, item_id) for seq, item_id, _ in entries),
+            *self._reindex(removed=entries),
+            self._next_seq,
+            self.version + 1,
+        )
+
+    def with_version(self, version):
+        """Devuelve la misma instantánea con otra versión, en O(1)."""
+        return StoreSnapshot(
+            self._items,
+            self._order,
+            self._hash_indexes,
+            self._sorted_indexes,
+            self._next_seq,
+            version,
+        )
+
+    def changes_since(self, other):
+        """Calcula las mutaciones que llevan de `other` a esta instantánea.
+
+        Solo se recorren los subárboles del mapa de items que han cambiado
+        desde que ambas instantáneas divergieron.
+
+        Args:
+            other (StoreSnapshot): Instantánea de partida.
+
+        Returns:
+            tuple: (ids a borrar, items a guardar en orden de inserción).
+        """
+        deleted, put = [], []
+        for item_id in self._items.diff(other._items):
+            entry = self._items.get(item_id)
+            if entry is None:
+                deleted.append(item_id)
+            else:
+                put.append(entry)
+        put.sort(key=lambda entry: entry[0])
+        return deleted, [item for _, item in put]
+
+    def _candidates(self, field, operator, operand):
+        """Resuelve una condición indexada.
+
+        Returns:
+            list: Pares `(seq, id)` de los items que cumplen la condición.
+        """
+        if field == "id":
+            for key in (operand, int(operand) if operand.isdigit() else None):
+                if key in self._items and str(key) == operand:
+                    return [(self._items.get(key)[0], key)]
+            return []
+        if field in self._hash_indexes:
+            return list(self._hash_indexes[field].get(operand, ()))
+        lo, hi = self._range(field, operator, operand)
+        index = self._sorted_indexes[field]
+        return [(seq, item_id) for _, seq, item_id in index.slice(lo, hi)]
+
+    def _range(self, field, operator, operand):
+        """Calcula con búsqueda binaria el tramo del índice ordenado que cumple."""
+        index = self._sorted_indexes[field]
+        if operator == ">":
+            return index.bisect_right((operand, float("inf"))), len(index)
+        if operator == "<":
+            return 0, index.bisect_left((operand,))
+        upper = (operand, float("inf"))
+        return index.bisect_left((operand,)), index.bisect_right(upper)
+
+    def _estimate(self, field, operator, operand):
+        """Estima en O(log n) cuántos items devolvería una condición indexada."""
+        if field == "id":
+            return 1
+        if field in self._hash_indexes:
+            return len(self._hash_indexes[field].get(operand, ()))
+        lo, hi = self._range(field, operator, operand)
+        return hi - lo
+
+    def query(self, item_query):
+        """Devuelve, en orden de inserción, los items que cumplen una consulta.
+
+        Se elige la condición indexada más selectiva para obtener los
+        candidatos y el resto de filtros se comprueban solo sobre ellos. Si
+        ninguna condición está indexada se recorre la colección completa.
+
+        Args:
+            item_query (mocks.item_query.ItemQuery): Consulta con los filtros.
+
+        Returns:
+            list: Items que cumplen todos los filtros.
+        """
+        if not item_query.predicates:
+            return self.all()
+
+        indexed = [
+            (field, *condition)
+            for field, condition in item_query.conditions.items()
+            if field in INDEXED_FIELDS
+        ]
+        if not indexed:
+            return [item for item in self.all() if item_query.matches(item)]
+
+        best = min(indexed, key=lambda condition: self._estimate(*condition))
+        candidates = self._candidates(*best)
+        candidates.sort()
+        items = (self._items.get(item_id)[1] for _, item_id in candidates)
+        return [item for item in items if item_query.matches(item)]
+
+
+class ItemStore:
+    """Repositorio en memoria de items indexado por `id`."""
+
+    def __init__(self, items=None):
+        """Inicializa el repositorio con una lista de items opcional.
+
+        Args:
+            items (list, opcional): Items iniciales. Si hay ids repetidos,
+                prevalece el último.
+        """
+        self.lock = threading.RLock()
+        self._state = StoreSnapshot.build(items or [])
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Crea un repositorio que parte de una instantánea, en O(1).
+
+        El repositorio nuevo comparte toda la estructura con la instantánea y
+        solo copia lo que va modificando, sin afectar a quien más la use.
+
+        Args:
+            snapshot (StoreSnapshot): Estado inicial.
+
+        Returns:
+            ItemStore: Repositorio nuevo.
+        """
+        store = cls()
+        store._state = snapshot
+        return store
+
+    @property
+    def version(self):
+        """int: Versión actual; se incrementa en cada mutación."""
+        return self._state.version
+
+    def snapshot(self):
+        """Devuelve la instantánea vigente, sin tomar el lock.
+
+        Sirve para hacer varias lecturas coherentes entre sí (p. ej. versión y
+        consulta de un mismo listado).
+
+        Returns:
+            StoreSnapshot: Estado inmutable del repositorio.
+        """
+        return self._state
+
+    def __len__(self):
+        """Devuelve el número de items almacenados."""
+        return len(self._state)
+
+    def __contains__(self, item_id):
+        """Indica si existe un item con el `item_id` dado."""
+        return item_id in self._state
+
+    def get(self, item_id):
+        """Obtiene un item por su id.
+
+        Args:
+            item_id (int): Identificador del item.
+
+        Returns:
+            dict | None: El item encontrado o None si no existe.
+        """
+        return self._state.get(item_id)
+
+    def add(self, item):
+        """Añade un item nuevo al final del repositorio.
+
+        Args:
+            item (dict): Item con, al menos, la clave `id`.
+
+        Returns:
+            bool: `True` si se ha añadido, `False` si el id ya existía.
+        """
+        with self.lock:
+            if item["id"] in self._state:
+                return False
+            self._state = self._state.added(item)
+        return True
+
+    def add_many(self, items):
+        """Añade varios items al final del repositorio, en su orden.
+
+        Todo el lote se publica con una sola instantánea nueva (y una sola
+        versión más): los lectores ven o ninguno o todos los items.
+
+        Args:
+            items (list): Items con, al menos, la clave `id`.
+
+        Returns:
+            list: Por cada item, `True` si se ha añadido o `False` si su id ya
+                existía (también si se repite dentro del lote).
+        """
+        with self.lock:
+            state, new_ids, added = self._state, set(), []
+            for item in items:
+                item_id = item["id"]
+                added.append(item_id not in state and item_id not in new_ids)
+                new_ids.add(item_id)
+            new_items = [item for item, ok in zip(items, added) if ok]
+            if new_items:
+                self._state = state.added_many(new_items)
+        return added
+
+    def update(self, item_id, changes):
+        """Actualiza los campos indicados de un item existente.
+
+        El `id` es la clave del repositorio y no se modifica: si `changes`
+        incluye otro id, se ignora. El item se sustituye por un dict nuevo, así
+        que los items ya devueltos no cambian.
+
+        Args:
+            item_id (int): Identificador del item.
+            changes (dict): Campos a actualizar.
+
+        Returns:
+            dict | None: El item actualizado o None si no existe.
+        """
+        with self.lock:
+            item = self._state.get(item_id)
+            if item is None:
+                return None
+            updated = {**item, **{k: v for k, v in changes.items() if k != "id"}}
+            self._state = self._state.updated(item_id, updated)
+        return updated
+
+    def delete(self, item_id):
+        """Elimina un item por su id.
+
+        Args:
+            item_id (int): Identificador del item.
+
+        Returns:
+            dict | None: El item eliminado o None si no existía.
+        """
+        with self.lock:
+            item = self._state.get(item_id)
+            if item is None:
+                return None
+            self._state = self._state.deleted(item_id)
+        return item
+
+    def delete_many(self, item_ids):
+        """Elimina varios items por su id con una sola instantánea nueva.
+
+        Args:
+            item_ids (list): Identificadores de los items.
+
+        Returns:
+            list: Por cada id, el item eliminado o None si no existía (también
+                si se repite dentro del lote).
+        """
+        with self.lock:
+            state, removed, deleted = self._state, {}, []
+            for item_id in item_ids:
+                item = None if item_id in removed else state.get(item_id)
+                if item is not None:
+                    removed[item_id] = item
+                deleted.append(item)
+            if removed:
+                self._state = state.deleted_many(list(removed))
+        return deleted
+
+    def restore(self, snapshot):
+        """Vuelve al estado de una instantánea anterior, en O(1).
+
+        La versión no retrocede: el estado restaurado recibe una versión nueva
+        para que los ETags y la caché de respuestas no confundan estados.
+
+        Args:
+            snapshot (StoreSnapshot): Instantánea obtenida con `snapshot()`.
+
+        Returns:
+            tuple: (ids borrados, items guardados) respecto al estado previo,
+                para registrarlos en el diario.
+        """
+        with self.lock:
+            previous = self._state
+            self._state = snapshot.with_version(previous.version + 1)
+        return snapshot.changes_since(previous)
+
+    def all(self):
+        """Devuelve todos los items en orden de inserción.
+
+        Returns:
+            list: Lista de items.
+        """
+        return self._state.all()
+
+    def query(self, item_query):
+        """Devuelve, en orden de inserción, los items que cumplen una consulta.
+
+        Ver `StoreSnapshot.query`.
+        """
+        return self._state.query(item_query)
@@ -0,0 +1,219 @@
+# mocks/journal.py
+"""Módulo que define el diario (write-ahead journal) del servidor mock.
+
+Cada mutación se anexa como una línea JSON al fichero de diario en lugar de
+reescribir el YAML completo. Periódicamente (o al apagar el servidor) el diario
+se compacta: se vuelca el estado actual al snapshot YAML y se descartan los
+registros ya incluidos en él. Al arrancar, los registros pendientes se
+reaplican sobre el snapshot.
+
+Registros soportados:
+    {"op": "put", "item": {...}}  Alta o actualización (item completo).
+    {"op": "delete", "id": 5}     Borrado por id.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+FSYNC_POLICIES = ("always", "batch", "none")
+
+
+class Journal:
+    """Diario de solo-anexado con compactación en segundo plano."""
+
+    def __init__(
+        self,
+        path,
+        snapshot_writer,
+        items_provider,
+        state_lock=None,
+        fsync_policy="batch",
+        fsync_interval=1.0,
+        compact_every=1000,
+    ):
+        """Inicializa el diario y abre el fichero en modo anexado.
+
+        Args:
+            path (str): Ruta del fichero de diario.
+            snapshot_writer (callable): Función que recibe la lista de items y
+                la persiste como snapshot (el YAML).
+            items_provider (callable): Función que devuelve la lista actual de
+                items que se volcará al compactar.
+            state_lock (threading.RLock, opcional): Lock que protege el estado
+                de `items_provider`. Si se indica, se toma antes que el lock
+                del diario (el mismo orden que siguen los escritores), para que
+                la rotación y la captura del estado sean atómicas.
+            fsync_policy (str, opcional): 'always' hace fsync en cada registro,
+                'batch' cada `fsync_interval` segundos y 'none' nunca.
+                Por defecto, 'batch'.
+            fsync_interval (float, opcional): Segundos entre fsync en modo
+                'batch'. Por defecto, 1.0.
+            compact_every (int, opcional): Número de registros tras el que se
+                lanza una compactación en segundo plano. Por defecto, 1000.
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(
+                f"Política de fsync '{fsync_policy}' no válida. "
+                f"Usa una de: {', '.join(FSYNC_POLICIES)}"
+            )
+        self.path = path
+        self.compacting_path = f"{path}.compacting"
+        self.snapshot_writer = snapshot_writer
+        self.items_provider = items_provider
+        self.state_lock = state_lock or contextlib.nullcontext()
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._pending = self._count_leftover_records()
+        self._dirty = False
+        self._closed = False
+        if self.fsync_policy == "batch":
+            threading.Thread(target=self._fsync_loop, daemon=True).start()
+
+    @staticmethod
+    def replay(path, items):
+        """Reaplica los registros del diario sobre una lista de items.
+
+        Se leen, por orden, el segmento en compactación (si quedó a medias) y
+        el diario activo. Un registro final truncado se descarta.
+
+        Args:
+            path (str): Ruta del fichero de diario.
+            items (list): Items del snapshot YAML.
+
+        Returns:
+            list: Items resultantes tras aplicar el diario, en orden.
+        """
+        by_id = {item["id"]: item for item in items}
+        for segment in (f"{path}.compacting", path):
+            try:
+                with open(segment, "r", encoding="utf-8") as file:
+                    for line in file:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            break
+                        if record["op"] == "put":
+                            by_id[record["item"]["id"]] = record["item"]
+                        elif record["op"] == "delete":
+                            by_id.pop(record["id"], None)
+            except FileNotFoundError:
+                continue
+        return list(by_id.values())
+
+    def _count_leftover_records(self):
+        """Cuenta los registros que quedaron sin compactar de una ejecución previa."""
+        pending = 0
+        for segment in (self.compacting_path, self.path):
+            try:
+                with open(segment, "r", encoding="utf-8") as file:
+                    pending += sum(1 for _ in file)
+            except FileNotFoundError:
+                continue
+        return pending
+
+    def record_put(self, item):
+        """Anexa el alta o actualización de un item."""
+        self._append([{"op": "put", "item": item}])
+
+    def record_delete(self, item_id):
+        """Anexa el borrado de un item."""
+        self._append([{"op": "delete", "id": item_id}])
+
+    def record_puts(self, items):
+        """Anexa varias altas de golpe, con una sola escritura y un solo fsync."""
+        if items:
+            self._append([{"op": "put", "item": item} for item in items])
+
+    def record_deletes(self, item_ids):
+        """Anexa varios borrados de golpe, con una sola escritura y un solo fsync."""
+        if item_ids:
+            self._append([{"op": "delete", "id": item_id} for item_id in item_ids])
+
+    def _append(self, records):
+        """Escribe los registros y aplica la política de fsync."""
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        )
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+            if self.fsync_policy == "always":
+                os.fsync(self._file.fileno())
+            else:
+                self._dirty = True
+            self._pending += len(records)
+            should_compact = self._pending >= self.compact_every
+        if should_compact and not self._compact_lock.locked():
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def _fsync_loop(self):
+        """Hace fsync periódicamente mientras haya escrituras pendientes."""
+        while not self._closed:
+            time.sleep(self.fsync_interval)
+            with self._lock:
+                if self._dirty and not self._closed:
+                    os.fsync(self._file.fileno())
+                    self._dirty = False
+
+    def compact(self):
+        """Vuelca el estado actual al snapshot y descarta el diario aplicado.
+
+        El diario activo se rota a `<path>.compacting` bajo el lock, de modo
+        que las mutaciones que lleguen durante el volcado van a un diario
+        nuevo y no se pierden.
+        """
+        with self._compact_lock:
+            with self.state_lock, self._lock:
+                if self._pending == 0 or self._closed:
+                    return
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._rotate()
+                self._file = open(self.path, "a", encoding="utf-8")
+                self._pending = 0
+                self._dirty = False
+                items = self.items_provider()
+            self.snapshot_writer(items)
+            os.remove(self.compacting_path)
+
+    def _rotate(self):
+        """Mueve el diario activo al segmento en compactación.
+
+        Si quedó un segmento de una compactación interrumpida, se le anexa el
+        diario activo para no perder ninguno de sus registros.
+        """
+        if not os.path.exists(self.compacting_path):
+            os.replace(self.path, self.compacting_path)
+            return
+        with open(self.path, "r", encoding="utf-8") as src, open(
+            self.compacting_path, "a", encoding="utf-8"
+        ) as dst:
+            dst.write(src.read())
+        os.remove(self.path)
+
+    def detach(self):
+        """Cierra el diario sin compactar, dejando sus registros para otro proceso.
+
+        Para procesos que importan el servidor pero no atienden peticiones
+        (como el supervisor del recargador de Werkzeug): su copia de los items
+        no ve las mutaciones del proceso que sirve, y compactarla sobrescribiría
+        el snapshot con datos desfasados.
+        """
+        with self._lock:
+            self._closed = True
+            self._file.close()
+
+    def close(self):
+        """Compacta los registros pendientes y cierra el diario."""
+        self.compact()
+        with self._lock:
+            self._closed = True
+            self._file.close()
@@ -1,6 +1,19 @@
 # mocks/mock_server.py
 """Módulo que define un servidor mock usando Flask con Swagger y persistencia en YAML.
 
+Las mutaciones se registran en un diario de solo-anexado (`mocks/journal.py`) que
+se compacta en el YAML en segundo plano o al apagar el servidor. La política de
+fsync se configura con MOCK_FSYNC_POLICY (always, batch o none).
+
+Modos de arranque (`python -m mocks.mock_server --help`):
+    dev       Servidor de desarrollo de Werkzeug con debugger y recarga.
+    threaded  Werkzeug multihilo, sin debugger ni recarga.
+    gevent    WSGIServer de gevent (greenlets), para carga alta con locust.
+Swagger es opcional: `--no-swagger` o MOCK_SWAGGER=false.
+
+Tenants: la cabecera `X-Mock-Tenant` o el prefijo `/t/<tenant>/` seleccionan un
+clon en memoria de los datos semilla (ver `mocks/tenants.py`).
+
 En este mock se exige que todos los campos (id, name, description, category, price,
 stock, available)
 vengan informados (no vacíos) para que el endpoint /items devuelva 201. En caso de
@@ -8,24 +21,64 @@ que falte alguno,
 o esté vacío, se devuelve un 400 (Bad Request). Si el id ya existe, devuelve 409.
 """
 
+import argparse
+import atexit
+import os
 import secrets
+import signal
+import sys
 from functools import wraps
 
 import yaml
-from flasgger import Swagger
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
+
+from mocks.data_cache import YamlDumper, load_items, write_cache
+from mocks.item_query import InvalidQueryError, ItemQuery
+from mocks.item_store import ItemStore
+from mocks.journal import Journal
+from mocks.response_cache import ResponseCache, make_etag
+from mocks.serving import SERVER_MODES, serve
+from mocks.tenants import (
+    DEFAULT_TENANT,
+    TENANT_HEADER,
+    InvalidTenantError,
+    Tenant,
+    TenantPrefixMiddleware,
+    TenantRegistry,
+)
 
 app = Flask(__name__)
+# Permite elegir el tenant con el prefijo de URL /t/<tenant>/ (ver mocks/tenants.py)
+app.wsgi_app = TenantPrefixMiddleware(app.wsgi_app)
+
+
+def init_swagger():
+    """Registra la documentación Swagger (flasgger) en la app.
+
+    flasgger solo se importa aquí, de modo que es una dependencia opcional.
+
+    Returns:
+        flasgger.Swagger: Extensión registrada.
+    """
+    from flasgger import Swagger
+
+    # Configuración básica de Swagger
+    app.config["SWAGGER"] = {
+        "title": "Mock TESTING API - Documentación",
+        "description": "API para gestionar items simulados con persistencia en YAML.",
+        "version": "1.0.1",
+    }
+    return Swagger(app)
+
 
-# Configuración básica de Swagger
-app.config["SWAGGER"] = {
-    "title": "Mock TESTING API - Documentación",
-    "description": "API para gestionar items simulados con persistencia en YAML.",
-    "version": "1.0.1",
-}
-swagger = Swagger(app)
+SWAGGER_ENABLED = os.getenv("MOCK_SWAGGER", "true").lower() == "true"
+# Al ejecutarse como script, main() decide según los argumentos de línea de comandos
+swagger = init_swagger() if SWAGGER_ENABLED and __name__ != "__main__" else None
 
-MOCK_FILE = "resources/mock_data.yaml"
+# La caché binaria y el diario viven junto al YAML (MOCK_DATA_FILE para cambiarlo)
+MOCK_FILE = os.getenv("MOCK_DATA_FILE", "resources/mock_data.yaml")
+MOCK_CACHE_FILE = f"{os.path.splitext(MOCK_FILE)[0]}.msgpack"
+JOURNAL_FILE = f"{os.path.splitext(MOCK_FILE)[0]}.journal"
 
 # Generamos un token de ejemplo en el arranque
 TOKEN = secrets.token_hex(16)
@@ -57,30 +110,161 @@ def token_required(f):
 
 
 def load_mock_data():
-    """Carga los datos desde el archivo YAML.
+    """Carga los datos desde el archivo YAML y reaplica el diario pendiente.
+
+    Si la caché binaria del YAML está al día se usa en su lugar (ver
+    `mocks/data_cache.py`).
 
     Returns:
         list: Lista de items cargados desde el archivo YAML.
     """
-    try:
-        with open(MOCK_FILE, "r", encoding="utf-8") as file:
-            data = yaml.safe_load(file)
-            return data.get("items", [])
-    except (FileNotFoundError, yaml.YAMLError):
-        return []
+    items = load_items(MOCK_FILE, MOCK_CACHE_FILE)
+    return Journal.replay(JOURNAL_FILE, items)
 
 
 def save_mock_data(data):
     """Guarda los datos en el archivo YAML.
 
+    Se escribe en un fichero temporal que luego reemplaza al original, de modo
+    que un corte durante la escritura nunca deja el snapshot a medias.
+
     Args:
         data (list): Lista de items.
     """
-    with open(MOCK_FILE, "w", encoding="utf-8") as file:
-        yaml.dump({"items": data}, file, default_flow_style=False, allow_unicode=True)
+    tmp_file = f"{MOCK_FILE}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        yaml.dump(
+            {"items": data},
+            file,
+            Dumper=YamlDumper,
+            default_flow_style=False,
+            allow_unicode=True,
+        )
+    os.replace(tmp_file, MOCK_FILE)
+    write_cache(MOCK_FILE, MOCK_CACHE_FILE, data)
+
+
+item_store = ItemStore(load_mock_data())
+journal = Journal(
+    JOURNAL_FILE,
+    snapshot_writer=save_mock_data,
+    items_provider=item_store.all,
+    state_lock=item_store.lock,
+    fsync_policy=os.getenv("MOCK_FSYNC_POLICY", "batch"),
+    fsync_interval=float(os.getenv("MOCK_FSYNC_INTERVAL", "1.0")),
+    compact_every=int(os.getenv("MOCK_COMPACT_EVERY", "1000")),
+)
+atexit.register(journal.close)
+list_cache = ResponseCache()
+# Solo el tenant por defecto se persiste; el resto son clones en memoria
+tenants = TenantRegistry(
+    Tenant(DEFAULT_TENANT, item_store, journal, list_cache),
+    max_tenants=int(os.getenv("MOCK_MAX_TENANTS", "256")),
+)
+
+
+@app.before_request
+def select_tenant():
+    """Resuelve el tenant de la petición (cabecera X-Mock-Tenant) en `g.tenant`."""
+    try:
+        g.tenant = tenants.get(request.headers.get(TENANT_HEADER))
+    except InvalidTenantError as error:
+        return jsonify({"success": False, "message": str(error)}), 400
+
+
+REQUIRED_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "category",
+    "price",
+    "stock",
+    "available",
+]
+# El id es la clave del repositorio: solo se admiten tipos que sirvan como tal
+ID_TYPES = (int, str)
+
+
+def _valid_id(item_id):
+    """Indica si `item_id` es de un tipo admitido como id (ver ID_TYPES).
+
+    Los booleanos se rechazan aunque sean `int`: `True` chocaría con el id 1.
+    """
+    return isinstance(item_id, ID_TYPES) and not isinstance(item_id, bool)
 
 
-mock_data = load_mock_data()
+def _invalid_item(new_item):
+    """Valida un item recibido para darlo de alta.
+
+    Se exige que vengan todos los campos, que no estén vacíos y que el id
+    sea un entero o una cadena.
+
+    Args:
+        new_item (dict): Item recibido en la petición.
+
+    Returns:
+        tuple | None: (cuerpo de la respuesta, 400) si no es válido, o None.
+    """
+    if not isinstance(new_item, dict):
+        return {"success": False, "message": "Invalid data"}, 400
+    for field in REQUIRED_FIELDS:
+        # Verifica presencia y no-vacío
+        if field not in new_item or not str(new_item[field]).strip():
+            return {
+                "success": False,
+                "message": f"Missing or invalid field '{field}'",
+            }, 400
+    if not _valid_id(new_item["id"]):
+        return {"success": False, "message": "Missing or invalid field 'id'"}, 400
+    return None
+
+
+def _added_response(new_item, added):
+    """Construye la respuesta de un alta según si el id ya existía.
+
+    Returns:
+        tuple: (cuerpo de la respuesta, código HTTP): 201 o 409.
+    """
+    if not added:
+        return {"success": False, "message": "Item ID already exists"}, 409
+    return {"success": True, "data": new_item}, 201
+
+
+def _add_item(store, new_item):
+    """Valida y añade un item al repositorio, sin persistirlo.
+
+    Args:
+        store (mocks.item_store.ItemStore): Repositorio del tenant.
+        new_item (dict): Item recibido en la petición.
+
+    Returns:
+        tuple: (cuerpo de la respuesta, código HTTP): 201, 400 o 409.
+    """
+    error = _invalid_item(new_item)
+    if error is not None:
+        return error
+    return _added_response(new_item, store.add(new_item))
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    """Indica que el servidor está listo para recibir peticiones.
+
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Servidor operativo.
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+            items:
+              type: integer
+    """
+    return jsonify({"success": True, "items": len(g.tenant.store)}), 200
 
 
 @app.route("/login", methods=["POST"])
@@ -119,11 +303,50 @@ def login():
 @app.route("/items", methods=["GET"])
 @token_required
 def get_items():
-    """Devuelve la lista completa de items.
+    """Devuelve la lista de items, con filtros, paginación y proyección opcionales.
 
     ---
     tags:
       - Items
+    parameters:
+      - name: description
+        in: query
+        type: string
+        required: false
+        description: Texto que debe contener la descripción
+      - name: price
+        in: query
+        type: string
+        required: false
+        description: Precio exacto o umbral con '>' / '<' (p. ej. '>100')
+      - name: stock
+        in: query
+        type: string
+        required: false
+        description: Stock exacto o umbral con '>' / '<' (p. ej. '>0')
+      - name: category
+        in: query
+        type: string
+        required: false
+      - name: available
+        in: query
+        type: string
+        required: false
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Máximo de items a devolver
+      - name: offset
+        in: query
+        type: integer
+        required: false
+        description: Items a saltar antes de la página
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Campos a devolver, separados por comas (p. ej. 'id,name')
     responses:
       200:
         description: Lista de items obtenida correctamente.
@@ -136,8 +359,61 @@ def get_items():
               type: array
               items:
                 type: object
+            total:
+              type: integer
+            next_offset:
+              type: integer
+      304:
+        description: El listado no ha cambiado desde el ETag de If-None-Match.
+      400:
+        description: Parámetros de consulta inválidos.
     """
-    return jsonify({"success": True, "data": mock_data}), 200
+    try:
+        query = ItemQuery.from_args(request.args)
+    except InvalidQueryError as error:
+        return jsonify({"success": False, "message": str(error)}), 400
+
+    # La caché y el ETag dependen de la versión del repositorio y de la consulta
+    # (el ETag, también de la encarnación del tenant: ver mocks/tenants.py).
+    # Se trabaja sobre una instantánea inmutable, así que el cuerpo corresponde
+    # exactamente a esa versión sin bloquear a los escritores.
+    snapshot = g.tenant.store.snapshot()
+    key = (g.tenant.name, *sorted(request.args.items(multi=True)))
+    etag = make_etag(g.tenant.incarnation, snapshot.version, key)
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = _list_response(query, snapshot, key)
+
+    response.set_etag(etag, weak=True)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _list_response(query, snapshot, key):
+    """Construye (o recupera de la caché) la respuesta 200 de GET /items."""
+
+    def build():
+        matched = snapshot.query(query)
+        page = query.paginate(matched)
+        next_offset = query.offset + len(page)
+        payload = {
+            "success": True,
+            "data": page,
+            "total": len(matched),
+            "next_offset": next_offset if next_offset < len(matched) else None,
+        }
+        return app.json.dumps(payload).encode("utf-8")
+
+    encoding = request.accept_encodings.best_match(
+        ["br", "gzip", "identity"], default="identity"
+    )
+    body, applied = g.tenant.list_cache.get(snapshot.version, key, build, encoding)
+    response = app.response_class(body, status=200, mimetype="application/json")
+    if applied != "identity":
+        response.headers["Content-Encoding"] = applied
+    return response
 
 
 @app.route("/items/<int:item_id>", methods=["GET"])
@@ -167,7 +443,7 @@ def get_item(item_id):
       404:
         description: Item no encontrado
     """
-    item = next((i for i in mock_data if i["id"] == item_id), None)
+    item = g.tenant.store.get(item_id)
     if item:
         return jsonify({"success": True, "data": item}), 200
     return jsonify({"success": False, "message": "Item not found"}), 404
@@ -217,35 +493,13 @@ def create_item():
       409:
         description: ID duplicado
     """
-    new_item = request.json
-    # Cambios: validamos que vengan todos los campos y que no estén vacíos.
-    required_fields = [
-        "id",
-        "name",
-        "description",
-        "category",
-        "price",
-        "stock",
-        "available",
-    ]
-    for field in required_fields:
-        # Verifica presencia y no-vacío
-        if field not in new_item or not str(new_item[field]).strip():
-            return (
-                jsonify(
-                    {"success": False, "message": f"Missing or invalid field '{field}'"}
-                ),
-                400,
-            )
-
-    # Verificar si el ID ya existe en la lista
-    if any(i["id"] == new_item["id"] for i in mock_data):
-        return jsonify({"success": False, "message": "Item ID already exists"}), 409
-
-    # Si llega aquí, se asume que todos los campos son válidos
-    mock_data.append(new_item)
-    save_mock_data(mock_data)
-    return jsonify({"success": True, "data": new_item}), 201
+    # Mutación y registro en el diario bajo el mismo lock: mismo orden en ambos
+    tenant = g.tenant
+    with tenant.store.lock:
+        body, status = _add_item(tenant.store, request.json)
+        if status == 201:
+            tenant.journal.record_put(body["data"])
+    return jsonify(body), status
 
 
 @app.route("/items/<int:item_id>", methods=["DELETE"])
@@ -268,16 +522,146 @@ def delete_item(item_id):
       404:
         description: Item no encontrado
     """
-    global mock_data
-    item = next((i for i in mock_data if i["id"] == item_id), None)
-    if not item:
-        return jsonify({"success": False, "message": "Item not found"}), 404
-
-    mock_data = [i for i in mock_data if i["id"] != item_id]
-    save_mock_data(mock_data)
+    tenant = g.tenant
+    with tenant.store.lock:
+        if tenant.store.delete(item_id) is None:
+            return jsonify({"success": False, "message": "Item not found"}), 404
+        tenant.journal.record_delete(item_id)
     return jsonify({"success": True, "message": "Item deleted"}), 200
 
 
+@app.route("/items/batch", methods=["POST"])
+@token_required
+def create_items_batch():
+    """Crea varios items en una sola petición.
+
+    Cada item se valida igual que en POST /items y obtiene su propio código
+    de estado. Los items válidos se añaden al repositorio con una sola
+    escritura (una sola versión nueva) y se persisten de una vez.
+
+    ---
+    tags:
+      - Items
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            items:
+              type: array
+              items:
+                type: object
+    responses:
+      200:
+        description: Resultado por item (status 201, 400 o 409).
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+            results:
+              type: array
+              items:
+                type: object
+      400:
+        description: Falta la lista 'items'.
+    """
+    items = (request.get_json(silent=True) or {}).get("items")
+    if not isinstance(items, list):
+        return jsonify({"success": False, "message": "Missing 'items' list"}), 400
+
+    errors = [_invalid_item(new_item) for new_item in items]
+    valid = [new_item for new_item, error in zip(items, errors) if error is None]
+    results, created = [], []
+    tenant = g.tenant
+    with tenant.store.lock:
+        added = iter(tenant.store.add_many(valid))
+        for new_item, error in zip(items, errors):
+            body, status = error or _added_response(new_item, next(added))
+            item_id = new_item.get("id") if isinstance(new_item, dict) else None
+            results.append({"id": item_id, "status": status, **body})
+            if status == 201:
+                created.append(body["data"])
+        tenant.journal.record_puts(created)
+    success = len(created) == len(items)
+    return jsonify({"success": success, "results": results}), 200
+
+
+@app.route("/items/batch", methods=["DELETE"])
+@token_required
+def delete_items_batch():
+    """Elimina varios items en una sola petición.
+
+    Los ids válidos se eliminan con una sola escritura (una sola versión
+    nueva) y se persisten de una vez.
+
+    ---
+    tags:
+      - Items
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids:
+              type: array
+              items:
+                type: integer
+    responses:
+      200:
+        description: Resultado por item (status 200, 400 si el id no es válido o 404).
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+            results:
+              type: array
+              items:
+                type: object
+      400:
+        description: Falta la lista 'ids'.
+    """
+    item_ids = (request.get_json(silent=True) or {}).get("ids")
+    if not isinstance(item_ids, list):
+        return jsonify({"success": False, "message": "Missing 'ids' list"}), 400
+
+    valid_ids = [item_id for item_id in item_ids if _valid_id(item_id)]
+    results, deleted = [], []
+    tenant = g.tenant
+    with tenant.store.lock:
+        removed = iter(tenant.store.delete_many(valid_ids))
+        for item_id in item_ids:
+            if not _valid_id(item_id):
+                results.append(
+                    {
+                        "id": item_id,
+                        "status": 400,
+                        "success": False,
+                        "message": "Invalid item ID",
+                    }
+                )
+                continue
+            found = next(removed) is not None
+            if found:
+                deleted.append(item_id)
+            results.append(
+                {
+                    "id": item_id,
+                    "status": 200 if found else 404,
+                    "success": found,
+                    "message": "Item deleted" if found else "Item not found",
+                }
+            )
+        tenant.journal.record_deletes(deleted)
+    success = len(deleted) == len(item_ids)
+    return jsonify({"success": success, "results": results}), 200
+
+
 @app.route("/items/<int:item_id>", methods=["PUT"])
 @token_required
 def put_item(item_id):
@@ -318,10 +702,8 @@ def put_item(item_id):
       404:
         description: Item no encontrado.
     """
-    global mock_data
-    item = next((i for i in mock_data if i["id"] == item_id), None)
-
-    if not item:
+    tenant = g.tenant
+    if item_id not in tenant.store:
         return jsonify({"success": False, "message": "Item not found"}), 404
 
     update_data = request.json
@@ -329,14 +711,183 @@ def put_item(item_id):
         return jsonify({"success": False, "message": "Invalid data"}), 400
 
     # Actualiza solo los campos que se envíen en la petición
-    item.update(update_data)
-
-    save_mock_data(mock_data)
+    with tenant.store.lock:
+        item = tenant.store.update(item_id, update_data)
+        if item is None:
+            return jsonify({"success": False, "message": "Item not found"}), 404
+        tenant.journal.record_put(item)
     return (
         jsonify({"success": True, "message": f"Item {item_id} updated", "data": item}),
         200,
     )
 
 
+@app.route("/admin/snapshots", methods=["GET"])
+@token_required
+def list_snapshots():
+    """Lista las instantáneas con nombre del tenant.
+
+    ---
+    tags:
+      - Admin
+    responses:
+      200:
+        description: Nombre de cada instantánea y su número de items.
+    """
+    snapshots = {name: len(state) for name, state in g.tenant.snapshots.items()}
+    return jsonify({"success": True, "data": snapshots}), 200
+
+
+@app.route("/admin/snapshots/<name>", methods=["POST"])
+@token_required
+def take_snapshot(name):
+    """Guarda con un nombre el estado actual de los items del tenant, en O(1).
+
+    La instantánea comparte toda la estructura con el repositorio (no se copia
+    ni se escribe nada en disco). Si ya existía una con ese nombre, se sustituye.
+
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: name
+        in: path
+        type: string
+        required: true
+        description: Nombre de la instantánea
+    responses:
+      201:
+        description: Instantánea guardada.
+    """
+    snapshot = g.tenant.store.snapshot()
+    g.tenant.snapshots[name] = snapshot
+    body = {"success": True, "name": name, "items": len(snapshot)}
+    return jsonify(body), 201
+
+
+@app.route("/admin/snapshots/<name>/restore", methods=["POST"])
+@token_required
+def restore_snapshot(name):
+    """Restaura los items del tenant al estado de una instantánea, en O(1).
+
+    En el tenant por defecto, las diferencias con el estado previo se
+    registran en el diario (no se reescribe el YAML); los items que vuelven
+    tras haberse borrado se anexan al final del YAML al compactar.
+
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: name
+        in: path
+        type: string
+        required: true
+        description: Nombre de la instantánea
+    responses:
+      200:
+        description: Estado restaurado.
+      404:
+        description: La instantánea no existe.
+    """
+    tenant = g.tenant
+    snapshot = tenant.snapshots.get(name)
+    if snapshot is None:
+        return jsonify({"success": False, "message": "Snapshot not found"}), 404
+    with tenant.store.lock:
+        deleted, put = tenant.store.restore(snapshot)
+        tenant.journal.record_deletes(deleted)
+        tenant.journal.record_puts(put)
+    body = {"success": True, "name": name, "items": len(snapshot)}
+    return jsonify(body), 200
+
+
+@app.route("/admin/snapshots/<name>", methods=["DELETE"])
+@token_required
+def delete_snapshot(name):
+    """Elimina una instantánea con nombre del tenant.
+
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: name
+        in: path
+        type: string
+        required: true
+        description: Nombre de la instantánea
+    responses:
+      200:
+        description: Instantánea eliminada.
+      404:
+        description: La instantánea no existe.
+    """
+    if g.tenant.snapshots.pop(name, None) is None:
+        return jsonify({"success": False, "message": "Snapshot not found"}), 404
+    return jsonify({"success": True, "message": f"Snapshot {name} deleted"}), 200
+
+
+@app.route("/tenants/<name>", methods=["DELETE"])
+@token_required
+def delete_tenant(name):
+    """Descarta un tenant en memoria; se volverá a clonar si se usa de nuevo.
+
+    ---
+    tags:
+      - Tenants
+    parameters:
+      - name: name
+        in: path
+        type: string
+        required: true
+        description: Nombre del tenant
+    responses:
+      200:
+        description: Tenant descartado.
+      404:
+        description: El tenant no existe (o es el tenant por defecto).
+    """
+    if not tenants.discard(name):
+        return jsonify({"success": False, "message": "Tenant not found"}), 404
+    return jsonify({"success": True, "message": f"Tenant {name} deleted"}), 200
+
+
+def main():
+    """Arranca el servidor mock en el modo indicado por línea de comandos."""
+    parser = argparse.ArgumentParser(description="Servidor mock de la API de items.")
+    parser.add_argument(
+        "--server",
+        choices=SERVER_MODES,
+        default=os.getenv("MOCK_SERVER_MODE", "dev"),
+        help="Servidor WSGI a usar (por defecto, MOCK_SERVER_MODE o 'dev').",
+    )
+    parser.add_argument("--host", default=os.getenv("MOCK_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_PORT", "5000")))
+    parser.add_argument(
+        "--no-swagger",
+        dest="swagger",
+        action="store_false",
+        default=SWAGGER_ENABLED,
+        help="No registra la documentación Swagger (/apidocs).",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="No registra una línea de log por petición (recomendado bajo carga).",
+    )
+    args = parser.parse_args()
+
+    if args.server == "dev" and os.getenv("WERKZEUG_RUN_MAIN") != "true":
+        # Proceso supervisor del recargador: solo relanza al hijo que sirve las
+        # peticiones, así que no debe compactar su copia (desfasada) de los datos
+        atexit.unregister(journal.close)
+        journal.detach()
+    if args.swagger:
+        init_swagger()
+    # SIGTERM (p. ej. `kill` desde run_tests.sh) también compacta el diario
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    serve(app, args.server, args.host, args.port, quiet=args.quiet)
+
+
 if __name__ == "__main__":
-    app.run(port=5000, debug=True)
+    main()
@@ -0,0 +1,519 @@
+# mocks/persistent.py
+"""Módulo con estructuras de datos persistentes (inmutables) para el servidor mock.
+
+Cada modificación devuelve una estructura nueva que comparte con la anterior
+todo lo que no ha cambiado (structural sharing). Así, una versión ya publicada
+nunca cambia: los lectores pueden usarla sin locks, y clonarla o guardarla como
+snapshot cuesta O(1).
+
+- `HashTrieMap`: diccionario en forma de trie sobre los bits del hash de la
+  clave (HAMT), con nodos de `WIDTH` hijos y hojas de hasta `BUCKET_SIZE`
+  claves. Una escritura copia solo el camino de la raíz a la hoja:
+  O(log32 n) nodos de tamaño acotado.
+- `ChunkedSortedList`: lista ordenada en forma de árbol B+ persistente. Las
+  hojas son tramos (chunks) ordenados de hasta 2*`CHUNK_SIZE` elementos y
+  cada nodo interno guarda el máximo y el tamaño de sus hijos, de modo que
+  una escritura copia un tramo y O(log n) nodos de hasta 2*`FANOUT` hijos, y
+  las posiciones globales se calculan bajando por el árbol.
+
+Las dos admiten escrituras por lotes (`set_many`, `delete_many`,
+`insert_many`, `remove_many`), que copian cada nodo afectado una sola vez
+aunque el lote toque varias de sus entradas.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+# HashTrieMap: bits del hash por nivel, hijos por nodo y claves por hoja
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+BUCKET_SIZE = 8
+# Pasado este desplazamiento el hash no aporta más bits: la hoja crece sin dividirse
+MAX_SHIFT = 64
+# ChunkedSortedList: tamaño objetivo de los tramos y de los nodos internos
+CHUNK_SIZE = 256
+FANOUT = 32
+_MISSING = object()
+
+
+def _build_trie(entries, shift):
+    """Construye un subárbol a partir de tuplas `(hash, clave, valor)`.
+
+    Returns:
+        tuple: (nodo, número de claves distintas).
+    """
+    if len(entries) <= BUCKET_SIZE or shift >= MAX_SHIFT:
+        leaf = {key: value for _, key, value in entries}
+        return leaf, len(leaf)
+    groups = [[] for _ in range(WIDTH)]
+    for entry in entries:
+        groups[(entry[0] >> shift) & MASK].append(entry)
+    children, length = [], 0
+    for group in groups:
+        child, count = _build_trie(group, shift + BITS) if group else (None, 0)
+        children.append(child)
+        length += count
+    return tuple(children), length
+
+
+def _trie_entries(node):
+    """Devuelve como dict todas las claves de un subárbol (None si está vacío)."""
+    if node is None:
+        return {}
+    if type(node) is dict:
+        return node
+    merged = {}
+    for child in node:
+        if child is not None:
+            merged.update(_trie_entries(child))
+    return merged
+
+
+def _trie_set(node, entries, shift):
+    """Devuelve el subárbol con los pares `(hash, clave, valor)` asociados."""
+    if node is None:
+        return _build_trie(entries, shift)[0]
+    if type(node) is dict:
+        leaf = dict(node)
+        leaf.update((key, value) for _, key, value in entries)
+        if len(leaf) <= BUCKET_SIZE or shift >= MAX_SHIFT:
+            return leaf
+        return _build_trie([(hash(k), k, v) for k, v in leaf.items()], shift)[0]
+    children = list(node)
+    if len(entries) == 1:
+        index = (entries[0][0] >> shift) & MASK
+        children[index] = _trie_set(children[index], entries, shift + BITS)
+        return tuple(children)
+    groups = {}
+    for entry in entries:
+        groups.setdefault((entry[0] >> shift) & MASK, []).append(entry)
+    for index, group in groups.items():
+        children[index] = _trie_set(children[index], group, shift + BITS)
+    return tuple(children)
+
+
+def _trie_delete(node, entries, shift):
+    """Devuelve el subárbol sin las claves de `(hash, clave)` (None si queda vacío)."""
+    if type(node) is dict:
+        leaf = dict(node)
+        for _, key in entries:
+            del leaf[key]
+        return leaf or None
+    children = list(node)
+    groups = {}
+    for entry in entries:
+        groups.setdefault((entry[0] >> shift) & MASK, []).append(entry)
+    for index, group in groups.items():
+        children[index] = _trie_delete(children[index], group, shift + BITS)
+    if not any(children):
+        return None
+    return tuple(children)
+
+
+def _trie_diff(mine, theirs):
+    """Recorre las claves que difieren entre dos subárboles (ver `HashTrieMap.diff`)."""
+    if mine is theirs:
+        return
+    if type(mine) is tuple and type(theirs) is tuple:
+        for my_child, their_child in zip(mine, theirs):
+            yield from _trie_diff(my_child, their_child)
+        return
+    mine, theirs = _trie_entries(mine), _trie_entries(theirs)
+    for key in mine.keys() | theirs.keys():
+        if mine.get(key, _MISSING) is not theirs.get(key, _MISSING):
+            yield key
+
+
+class HashTrieMap:
+    """Diccionario persistente en forma de trie sobre el hash de las claves."""
+
+    __slots__ = ("_root", "_len")
+
+    def __init__(self, root=None, length=0):
+        """Inicializa el mapa (vacío si no se indica la raíz).
+
+        Args:
+            root (dict | tuple, opcional): Nodo raíz: una hoja (dict) o un
+                nodo interno (tupla de `WIDTH` hijos).
+            length (int, opcional): Número total de claves.
+        """
+        self._root = root
+        self._len = length
+
+    @classmethod
+    def from_items(cls, pairs):
+        """Construye el mapa a partir de pares (clave, valor).
+
+        Si hay claves repetidas, prevalece el último valor.
+        """
+        entries = [(hash(key), key, value) for key, value in pairs]
+        if not entries:
+            return cls()
+        return cls(*_build_trie(entries, 0))
+
+    def __len__(self):
+        """Devuelve el número de claves."""
+        return self._len
+
+    def __contains__(self, key):
+        """Indica si la clave existe."""
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """Devuelve el valor de la clave o `default`."""
+        node, hashed, shift = self._root, hash(key), 0
+        while type(node) is tuple:
+            node = node[(hashed >> shift) & MASK]
+            shift += BITS
+        if node is None:
+            return default
+        return node.get(key, default)
+
+    def set(self, key, value):
+        """Devuelve un mapa nuevo con `key` asociada a `value`."""
+        added = key not in self
+        root = _trie_set(self._root, [(hash(key), key, value)], 0)
+        return HashTrieMap(root, self._len + added)
+
+    def set_many(self, pairs):
+        """Devuelve un mapa nuevo con todos los pares (clave, valor) asociados.
+
+        Cada nodo afectado se copia una sola vez. Si hay claves repetidas,
+        prevalece el último valor.
+        """
+        pairs = dict(pairs)
+        if not pairs:
+            return self
+        added = sum(1 for key in pairs if key not in self)
+        entries = [(hash(key), key, value) for key, value in pairs.items()]
+        return HashTrieMap(_trie_set(self._root, entries, 0), self._len + added)
+
+    def delete(self, key):
+        """Devuelve un mapa nuevo sin `key` (que debe existir)."""
+        return self.delete_many((key,))
+
+    def delete_many(self, keys):
+        """Devuelve un mapa nuevo sin las claves indicadas (que deben existir)."""
+        entries = [(hash(key), key) for key in dict.fromkeys(keys)]
+        if not entries:
+            return self
+        root = _trie_delete(self._root, entries, 0)
+        return HashTrieMap(root, self._len - len(entries))
+
+    def diff(self, other):
+        """Recorre las claves cuyo valor difiere entre este mapa y `other`.
+
+        Los valores se comparan por identidad y los subárboles compartidos (el
+        mismo objeto en ambos mapas) se saltan sin recorrerlos, así que el
+        coste es proporcional a lo que ha cambiado desde que divergieron.
+
+        Args:
+            other (HashTrieMap): Mapa con el que comparar.
+
+        Yields:
+            Claves presentes solo en uno de los mapas o con valores distintos.
+        """
+        return _trie_diff(self._root, other._root)
+
+
+class _Node:
+    """Nodo interno de `ChunkedSortedList`: hijos, su máximo y su tamaño."""
+
+    __slots__ = ("children", "maxes", "lens", "size")
+
+    def __init__(self, children, maxes, lens, size=None):
+        """Inicializa el nodo.
+
+        Args:
+            children (tuple): Subárboles hijos, en orden.
+            maxes (tuple): Máximo de cada hijo.
+            lens (tuple): Número de elementos de cada hijo.
+            size (int, opcional): Suma de `lens`, si ya se conoce.
+        """
+        self.children = children
+        self.maxes = maxes
+        self.lens = lens
+        self.size = sum(lens) if size is None else size
+
+
+def _node_max(node):
+    """Máximo de un subárbol (tramo o nodo interno)."""
+    return node[-1] if type(node) is list else node.maxes[-1]
+
+
+def _node_len(node):
+    """Número de elementos de un subárbol (tramo o nodo interno)."""
+    return len(node) if type(node) is list else node.size
+
+
+def _pieces(sequence, size):
+    """Parte una secuencia en listas de `size` elementos (la última, el resto)."""
+    values = iter(sequence)
+    return list(iter(lambda: list(islice(values, size)), []))
+
+
+def _make_nodes(children):
+    """Agrupa subárboles en nodos internos de hasta 2*`FANOUT` hijos."""
+    groups = [children] if len(children) <= 2 * FANOUT else _pieces(children, FANOUT)
+    return tuple(
+        _Node(
+            tuple(group),
+            tuple(_node_max(child) for child in group),
+            tuple(_node_len(child) for child in group),
+        )
+        for group in groups
+    )
+
+
+def _child_index(node, value):
+    """Índice del hijo de `node` en el que está o iría `value`."""
+    return min(bisect_left(node.maxes, value), len(node.maxes) - 1)
+
+
+def _group_by_child(maxes, values):
+    """Reparte valores ordenados entre los hijos según sus máximos.
+
+    Cada valor va al primer hijo cuyo máximo no es menor que él (o al último,
+    si supera a todos), igual que en una búsqueda con `bisect_left`.
+
+    Returns:
+        list: Pares `(índice del hijo, valores)` en orden.
+    """
+    groups, start, last = [], 0, len(maxes) - 1
+    while start < len(values):
+        index = min(bisect_left(maxes, values[start]), last)
+        stop = len(values) if index == last else bisect_right(values, maxes[index])
+        groups.append((index, values[start:stop]))
+        start = stop
+    return groups
+
+
+def _replace_children(node, replacements):
+    """Sustituye hijos de un nodo interno.
+
+    Args:
+        node (_Node): Nodo a copiar.
+        replacements (list): Pares `(índice, subárboles nuevos)` en orden.
+
+    Returns:
+        list: Hijos del nodo tras la sustitución.
+    """
+    children, previous = [], 0
+    for index, new_children in replacements:
+        children.extend(node.children[previous:index])
+        children.extend(new_children)
+        previous = index + 1
+    children.extend(node.children[previous:])
+    return children
+
+
+def _splice(node, index, new_children):
+    """Sustituye el hijo `index` por `new_children` copiando solo ese nodo."""
+    if len(new_children) == 1:
+        # Caso habitual: el hijo ni se divide ni desaparece
+        child = new_children[0]
+        children, maxes, lens = list(node.children), list(node.maxes), list(node.lens)
+        size = _node_len(child)
+        children[index], maxes[index] = child, _node_max(child)
+        size, lens[index] = node.size + size - lens[index], size
+        return (_Node(tuple(children), tuple(maxes), tuple(lens), size),)
+    rest = index + 1
+    children = node.children[:index] + new_children + node.children[rest:]
+    if len(children) > 2 * FANOUT or not children:
+        return _make_nodes(children) if children else ()
+    maxes = tuple(_node_max(child) for child in new_children)
+    lens = tuple(_node_len(child) for child in new_children)
+    return (
+        _Node(
+            children,
+            node.maxes[:index] + maxes + node.maxes[rest:],
+            node.lens[:index] + lens + node.lens[rest:],
+        ),
+    )
+
+
+def _list_insert(node, values):
+    """Inserta valores ordenados en un subárbol.
+
+    Returns:
+        tuple: Subárboles que sustituyen a `node` (más de uno si se divide).
+    """
+    if type(node) is list:
+        if len(values) == 1:
+            chunk = node.copy()
+            insort(chunk, values[0])
+        else:
+            chunk = sorted(node + values)
+        if len(chunk) <= 2 * CHUNK_SIZE:
+            return (chunk,)
+        return tuple(_pieces(chunk, CHUNK_SIZE))
+    if len(values) == 1:
+        index = _child_index(node, values[0])
+        return _splice(node, index, _list_insert(node.children[index], values))
+    groups = _group_by_child(node.maxes, values)
+    if len(groups) == 1:
+        index, group = groups[0]
+        return _splice(node, index, _list_insert(node.children[index], group))
+    children = _replace_children(
+        node,
+        [(index, _list_insert(node.children[index], group)) for index, group in groups],
+    )
+    return _make_nodes(children)
+
+
+def _list_remove(node, values):
+    """Quita valores ordenados (que deben existir) de un subárbol.
+
+    Returns:
+        tuple: Subárbol que sustituye a `node`, o vacía si se queda sin elementos.
+    """
+    if type(node) is list:
+        chunk = node.copy()
+        for value in reversed(values):
+            del chunk[bisect_left(chunk, value)]
+        return (chunk,) if chunk else ()
+    if len(values) == 1:
+        index = _child_index(node, values[0])
+        return _splice(node, index, _list_remove(node.children[index], values))
+    groups = _group_by_child(node.maxes, values)
+    if len(groups) == 1:
+        index, group = groups[0]
+        return _splice(node, index, _list_remove(node.children[index], group))
+    children = _replace_children(
+        node,
+        [(index, _list_remove(node.children[index], group)) for index, group in groups],
+    )
+    return _make_nodes(children) if children else ()
+
+
+def _leaves_from(node, start):
+    """Recorre los tramos de un subárbol desde la posición `start`.
+
+    Yields:
+        tuple: (tramo, posición dentro del tramo en la que empezar).
+    """
+    if type(node) is list:
+        yield node, start
+        return
+    index, lens = 0, node.lens
+    while index < len(lens) and start >= lens[index]:
+        start -= lens[index]
+        index += 1
+    if index == len(lens):
+        return
+    yield from _leaves_from(node.children[index], start)
+    for child in islice(node.children, index + 1, None):
+        yield from _leaves_from(child, 0)
+
+
+class ChunkedSortedList:
+    """Lista ordenada persistente: árbol B+ con tramos de hasta 2*`CHUNK_SIZE`."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self, root=None):
+        """Inicializa la lista (vacía si no se indica la raíz).
+
+        Args:
+            root (list | _Node, opcional): Un tramo ordenado y no vacío, o un
+                nodo interno. Su contenido no se volverá a modificar.
+        """
+        self._root = root
+
+    @classmethod
+    def from_sorted(cls, values):
+        """Construye la lista a partir de una secuencia ya ordenada."""
+        level = _pieces(values, CHUNK_SIZE)
+        if not level:
+            return cls()
+        while len(level) > 1:
+            level = [
+                _Node(
+                    tuple(group),
+                    tuple(_node_max(child) for child in group),
+                    tuple(_node_len(child) for child in group),
+                )
+                for group in _pieces(level, FANOUT)
+            ]
+        return cls(level[0])
+
+    @staticmethod
+    def _rooted(nodes):
+        """Crea la lista a partir de los subárboles que sustituyen a la raíz."""
+        if not nodes:
+            return ChunkedSortedList()
+        while len(nodes) > 1:
+            nodes = _make_nodes(nodes)
+        root = nodes[0]
+        # Una raíz con un solo hijo no aporta nada: se baja un nivel
+        while type(root) is _Node and len(root.children) == 1:
+            root = root.children[0]
+        return ChunkedSortedList(root)
+
+    def __len__(self):
+        """Devuelve el número de elementos."""
+        return 0 if self._root is None else _node_len(self._root)
+
+    def __iter__(self):
+        """Recorre los elementos en orden."""
+        if self._root is not None:
+            for chunk, _ in _leaves_from(self._root, 0):
+                yield from chunk
+
+    def insert(self, value):
+        """Devuelve una lista nueva con `value` insertado en su posición."""
+        return self.insert_many((value,))
+
+    def insert_many(self, values):
+        """Devuelve una lista nueva con todos los valores insertados."""
+        values = sorted(values)
+        if not values:
+            return self
+        if self._root is None:
+            return ChunkedSortedList.from_sorted(values)
+        return self._rooted(_list_insert(self._root, values))
+
+    def remove(self, value):
+        """Devuelve una lista nueva sin `value` (que debe existir)."""
+        return self.remove_many((value,))
+
+    def remove_many(self, values):
+        """Devuelve una lista nueva sin los valores indicados (que deben existir)."""
+        values = sorted(values)
+        if not values:
+            return self
+        return self._rooted(_list_remove(self._root, values))
+
+    def _position(self, value, bisect):
+        """Posición global de `value` según la función de bisección dada."""
+        node, position = self._root, 0
+        if node is None:
+            return 0
+        while type(node) is _Node:
+            index = bisect(node.maxes, value)
+            if index == len(node.children):
+                return position + node.size
+            position += sum(node.lens[:index])
+            node = node.children[index]
+        return position + bisect(node, value)
+
+    def bisect_left(self, value):
+        """Equivalente a `bisect.bisect_left` sobre la lista completa."""
+        return self._position(value, bisect_left)
+
+    def bisect_right(self, value):
+        """Equivalente a `bisect.bisect_right` sobre la lista completa."""
+        return self._position(value, bisect_right)
+
+    def slice(self, start, stop):
+        """Recorre los elementos entre las posiciones globales `start` y `stop`."""
+        remaining = stop - start
+        if self._root is None or remaining <= 0:
+            return
+        for chunk, offset in _leaves_from(self._root, start):
+            part = chunk[offset:][:remaining]
+            remaining -= len(part)
+            yield from part
+            if remaining <= 0:
+                return
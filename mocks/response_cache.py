@@ -0,0 +1,100 @@
+# mocks/response_cache.py
+"""Módulo que define la caché de respuestas serializadas de GET /items.
+
+Cada listado (por combinación de parámetros de consulta) se serializa una sola
+vez por versión del repositorio de items y se guarda junto con sus variantes
+comprimidas (gzip y Brotli), que se generan bajo demanda. El ETag depende solo
+del arranque, de la encarnación del tenant, de la versión del repositorio y de
+la consulta, por lo que un `If-None-Match` se puede responder con 304 sin tocar
+la caché. La versión sola no basta: un tenant que se descarta y se vuelve a
+crear empieza otra vez con la versión de la semilla.
+"""
+
+import gzip
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+
+import brotli
+
+# Por debajo de este tamaño comprimir no compensa
+MIN_COMPRESS_SIZE = 1024
+
+COMPRESSORS = {
+    "br": lambda body: brotli.compress(body, quality=5),
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+}
+
+# Distingue los ETags de cada arranque: la versión vuelve a empezar en 0
+BOOT_ID = secrets.token_hex(4)
+
+
+def make_etag(incarnation, version, key):
+    """Construye el valor del ETag de un listado.
+
+    Se envía como ETag débil porque las variantes gzip/br del mismo listado
+    lo comparten.
+
+    Args:
+        incarnation (int): Encarnación del tenant (ver `mocks/tenants.py`).
+        version (int): Versión del repositorio de items.
+        key (tuple): Clave normalizada de la consulta.
+
+    Returns:
+        str: Valor del ETag sin comillas, p. ej. '9f3c01ab-3-12-1a2b3c4d'.
+    """
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:8]
+    return f"{BOOT_ID}-{incarnation}-{version}-{digest}"
+
+
+class ResponseCache:
+    """Caché LRU de cuerpos serializados invalidada por versión."""
+
+    def __init__(self, max_entries=64):
+        """Inicializa la caché.
+
+        Args:
+            max_entries (int, opcional): Número máximo de consultas distintas
+                cacheadas para la versión actual. Por defecto, 64.
+        """
+        self.max_entries = max_entries
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key, build, encoding="identity"):
+        """Devuelve el cuerpo cacheado (en la codificación pedida) o lo construye.
+
+        Args:
+            version (int): Versión actual del repositorio de items.
+            key (tuple): Clave normalizada de la consulta.
+            build (callable): Función sin argumentos que devuelve el cuerpo en
+                bytes; solo se llama si no está en caché.
+            encoding (str, opcional): 'identity', 'gzip' o 'br'.
+
+        Returns:
+            tuple: (cuerpo en bytes, codificación realmente aplicada).
+        """
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            variants = self._entries.get(key)
+            if variants is not None:
+                self._entries.move_to_end(key)
+
+        if variants is None:
+            variants = {"identity": build()}
+            with self._lock:
+                if version == self._version:
+                    self._entries[key] = variants
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+
+        body = variants["identity"]
+        if encoding not in COMPRESSORS or len(body) < MIN_COMPRESS_SIZE:
+            return body, "identity"
+        if encoding not in variants:
+            variants[encoding] = COMPRESSORS[encoding](body)
+        return variants[encoding], encoding
@@ -0,0 +1,55 @@
+# mocks/serving.py
+"""Módulo que arranca la app del servidor mock sobre distintos servidores WSGI.
+
+gevent y Werkzeug solo se importan en el modo que los usa, así que ninguno es
+obligatorio para importar el servidor mock.
+"""
+
+import logging
+import socket
+
+SERVER_MODES = ("dev", "threaded", "gevent")
+
+
+def serve(app, mode="dev", host="127.0.0.1", port=5000, quiet=False):
+    """Sirve la app en el modo indicado hasta que se detenga el proceso.
+
+    Args:
+        app (flask.Flask): Aplicación a servir.
+        mode (str, opcional): 'dev' (Werkzeug con debugger y recarga),
+            'threaded' (Werkzeug multihilo) o 'gevent' (WSGIServer de gevent).
+        host (str, opcional): Interfaz de escucha. Por defecto, '127.0.0.1'.
+        port (int, opcional): Puerto de escucha. Por defecto, 5000.
+        quiet (bool, opcional): Si es True, no registra cada petición.
+    """
+    if mode not in SERVER_MODES:
+        raise ValueError(f"Modo '{mode}' no válido. Usa uno de: {SERVER_MODES}")
+
+    if mode == "dev":
+        app.run(host=host, port=port, debug=True)
+        return
+
+    if mode == "threaded":
+        from werkzeug.serving import run_simple
+
+        if quiet:
+            logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        run_simple(host, port, app, threaded=True)
+        return
+
+    from gevent.pywsgi import WSGIServer
+
+    class NoDelayWSGIServer(WSGIServer):
+        """WSGIServer con TCP_NODELAY en cada conexión.
+
+        pywsgi envía cabeceras y cuerpo en escrituras separadas; con Nagle
+        activo, cada respuesta keep-alive esperaría al ACK retardado (~40 ms).
+        """
+
+        def handle(self, sock, address):
+            """Desactiva Nagle en el socket aceptado y atiende la conexión."""
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            super().handle(sock, address)
+
+    log = None if quiet else "default"
+    NoDelayWSGIServer((host, port), app, log=log).serve_forever()
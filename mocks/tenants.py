@@ -0,0 +1,170 @@
+# mocks/tenants.py
+"""Módulo que define los tenants (espacios de nombres) del servidor mock.
+
+Cada tenant tiene su propio repositorio de items, clonado en O(1) a partir de
+la instantánea de los datos semilla (ver `mocks/item_store.py`): el clon
+comparte toda la estructura con la semilla y solo copia lo que modifica. Así,
+cada worker o escenario de behave trabaja sobre su propia vista de los datos
+sin interferir con los demás.
+
+El tenant se elige con la cabecera `X-Mock-Tenant` o con el prefijo de URL
+`/t/<tenant>/...` (p. ej. `/t/worker-1/items`). Sin ninguno de los dos se usa
+el tenant por defecto, el único que se persiste en el YAML y en el diario; el
+resto viven solo en memoria y se descartan (LRU) al superar `max_tenants`.
+
+Un tenant descartado (con DELETE /tenants o por el LRU) se vuelve a clonar de
+la semilla si se usa de nuevo, con la misma versión de repositorio que tenía
+al crearse. Por eso cada `Tenant` lleva un número de encarnación distinto, que
+forma parte del ETag de sus listados.
+"""
+
+import itertools
+import re
+import threading
+from collections import OrderedDict
+
+from mocks.item_store import ItemStore
+from mocks.response_cache import ResponseCache
+
+TENANT_HEADER = "X-Mock-Tenant"
+TENANT_PREFIX = "/t/"
+DEFAULT_TENANT = "default"
+TENANT_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+# Encarnaciones de tenant: únicas dentro de un arranque del servidor
+_INCARNATIONS = itertools.count(1)
+
+
+class InvalidTenantError(ValueError):
+    """Error lanzado cuando el nombre de un tenant no es válido."""
+
+
+class NullJournal:
+    """Diario que no registra nada, para los tenants que no se persisten."""
+
+    def record_put(self, item):
+        """No hace nada."""
+
+    def record_puts(self, items):
+        """No hace nada."""
+
+    def record_delete(self, item_id):
+        """No hace nada."""
+
+    def record_deletes(self, item_ids):
+        """No hace nada."""
+
+
+class Tenant:
+    """Estado de un tenant: repositorio, diario y caché de listados."""
+
+    def __init__(self, name, store, journal=None, list_cache=None):
+        """Inicializa el tenant.
+
+        Args:
+            name (str): Nombre del tenant.
+            store (mocks.item_store.ItemStore): Repositorio de items.
+            journal (mocks.journal.Journal, opcional): Diario de mutaciones.
+                Por defecto, un `NullJournal` (solo en memoria).
+            list_cache (ResponseCache, opcional): Caché de GET /items.
+        """
+        self.name = name
+        # Distingue este tenant de otro con el mismo nombre creado antes o después
+        self.incarnation = next(_INCARNATIONS)
+        self.store = store
+        self.journal = journal or NullJournal()
+        self.list_cache = list_cache or ResponseCache()
+        # Instantáneas con nombre (ver /admin/snapshots en mock_server.py)
+        self.snapshots = {}
+
+
+class TenantRegistry:
+    """Registro de tenants creados bajo demanda a partir de la semilla."""
+
+    def __init__(self, default, max_tenants=256):
+        """Inicializa el registro.
+
+        La semilla de los tenants nuevos es el estado del tenant por defecto en
+        este momento (los datos cargados al arrancar), de modo que los cambios
+        posteriores en él no se filtran a los demás.
+
+        Args:
+            default (Tenant): Tenant por defecto (persistido).
+            max_tenants (int, opcional): Máximo de tenants en memoria, además
+                del tenant por defecto. Por defecto, 256.
+        """
+        self.default = default
+        self.seed = default.store.snapshot()
+        self.max_tenants = max_tenants
+        self._tenants = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def validate(name):
+        """Comprueba que `name` es un nombre de tenant válido.
+
+        Raises:
+            InvalidTenantError: Si contiene caracteres no permitidos o supera
+                los 64 caracteres.
+        """
+        if not TENANT_NAME_RE.match(name):
+            raise InvalidTenantError(
+                f"Tenant '{name}' no válido: usa [A-Za-z0-9_.-], máx. 64 caracteres"
+            )
+
+    def get(self, name=None):
+        """Devuelve el tenant indicado, creándolo desde la semilla si no existe.
+
+        Args:
+            name (str, opcional): Nombre del tenant. Si es None o
+                `DEFAULT_TENANT`, se devuelve el tenant por defecto.
+
+        Returns:
+            Tenant: Tenant solicitado.
+
+        Raises:
+            InvalidTenantError: Si el nombre no es válido (también si está
+                vacío, p. ej. con el prefijo `/t//items`).
+        """
+        if name is None or name == DEFAULT_TENANT:
+            return self.default
+        self.validate(name)
+        with self._lock:
+            tenant = self._tenants.get(name)
+            if tenant is None:
+                tenant = Tenant(name, ItemStore.from_snapshot(self.seed))
+                self._tenants[name] = tenant
+                while len(self._tenants) > self.max_tenants:
+                    self._tenants.popitem(last=False)
+            else:
+                self._tenants.move_to_end(name)
+        return tenant
+
+    def discard(self, name):
+        """Elimina un tenant (el tenant por defecto no se puede eliminar).
+
+        Returns:
+            bool: True si existía y se ha eliminado.
+        """
+        with self._lock:
+            return self._tenants.pop(name, None) is not None
+
+
+class TenantPrefixMiddleware:
+    """Middleware WSGI que traduce `/t/<tenant>/ruta` a `/ruta` + cabecera.
+
+    Permite seleccionar el tenant solo con la URL base del cliente (p. ej.
+    `API_URL=http://localhost:5000/t/worker-1`).
+    """
+
+    def __init__(self, app):
+        """Envuelve la aplicación WSGI `app`."""
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        """Reescribe PATH_INFO y fija la cabecera del tenant si hay prefijo."""
+        path = environ.get("PATH_INFO", "")
+        if path.startswith(TENANT_PREFIX):
+            name, _, rest = path.removeprefix(TENANT_PREFIX).partition("/")
+            environ["HTTP_X_MOCK_TENANT"] = name
+            environ["PATH_INFO"] = f"/{rest}"
+        return self.app(environ, start_response)
@@ -0,0 +1,93 @@
+# python -m pruebas.bench_criteria [tamaños...]
+"""Benchmark del motor de criterios: interpretado vs compilado vs NumPy.
+
+Evalúa la misma tabla de criterios (la de los escenarios de API más algunas
+filas numéricas) sobre catálogos sintéticos con tres implementaciones:
+
+- interpretado: la comprobación original de `verify_items_request`, que vuelve
+  a analizar cada celda (strip, float, lower) por fila, ítem y columna.
+- compilado: `CriteriaEngine` con backend Python (una sola pasada).
+- numpy: `CriteriaEngine` con backend columnar (si NumPy está instalado).
+"""
+
+import sys
+import time
+
+from pruebas.bench_item_store import build_items
+from utils.criteria import CriteriaEngine
+
+ROWS = [
+    {"available": "", "category": "Electrónica", "description": "RTX", "price": ""},
+    {"available": "true", "id": "4", "price": ">100", "stock": ">0"},
+    {"price": "<5", "stock": ">0", "available": "", "description": ""},
+    {"category": "Audio", "available": "false", "stock": "0", "price": ""},
+    {"description": "Monitor", "price": ">1500", "stock": "<50", "available": "true"},
+]
+
+
+def interpreted_matches(item, criteria):
+    for key, value in criteria.items():
+        val = value.strip()
+        if not val:
+            continue
+        item_value = item.get(key)
+        if item_value is None:
+            return False
+        if key == "description":
+            if val not in str(item_value):
+                return False
+        elif key in ["price", "stock"]:
+            try:
+                item_numeric = float(item_value)
+                if val.startswith(">"):
+                    if not item_numeric > float(val[1:]):
+                        return False
+                elif val.startswith("<"):
+                    if not item_numeric < float(val[1:]):
+                        return False
+                elif item_numeric != float(val):
+                    return False
+            except ValueError:
+                return False
+        elif key == "available":
+            if str(item_value).lower() != val.lower():
+                return False
+        elif str(item_value) != val:
+            return False
+    return True
+
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main(sizes):
+    try:
+        import numpy  # noqa: F401
+
+        backends = ["python", "numpy"]
+    except ImportError:
+        backends = ["python"]
+        print("⚠️  NumPy no está instalado: se omite el backend columnar")
+
+    print(f"{'ítems':>10}{'interpretado ms':>17}" + "".join(f"{b + ' ms':>14}" for b in backends))
+    for size in sizes:
+        items = build_items(size)
+        repeat = 5 if size <= 100_000 else 1
+        base_ms, expected = timeit(
+            lambda: [[i for i in items if interpreted_matches(i, r)] for r in ROWS], repeat
+        )
+        line = f"{size:>10,}{base_ms:>17.1f}"
+        for backend in backends:
+            engine = CriteriaEngine(ROWS, backend=backend)
+            ms, result = timeit(lambda: engine.match(items), repeat)
+            assert [len(m) for m in result] == [len(m) for m in expected], backend
+            line += f"{ms:>14.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
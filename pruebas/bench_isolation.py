@@ -0,0 +1,117 @@
+# python -m pruebas.bench_isolation [escenarios]
+"""Benchmark de las estrategias de aislamiento del navegador entre escenarios.
+
+Simula N escenarios que visitan una página local que deja cookie,
+localStorage y sessionStorage, y mide para cada estrategia el coste por
+escenario de obtener la página y devolverla (sin contar el propio escenario)
+y si cada escenario empieza sin el estado del anterior:
+
+- relanzar: un navegador nuevo por escenario (lo que se quiere evitar).
+- contexto nuevo: `browser.new_context()` + `new_page()` en cada escenario.
+- fresh: contexto nuevo sacado del pool de `BrowserManager`.
+- reset: contexto reutilizado y limpiado (cookies, permisos, almacenamiento).
+- shared: contexto reutilizado sin limpiar (referencia; no aísla).
+
+Ejemplo: BROWSER_TYPE=firefox python -m pruebas.bench_isolation 50
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+os.environ.setdefault("BROWSER_SLOW_MO", "0")
+
+from driver.playwright_base import BrowserManager  # noqa: E402
+
+PORT = 5089
+# Tiempo que dura cada escenario simulado (los steps), en segundos
+STEP_SECONDS = 0.2
+
+PAGE = """<html><body data-cookie="{cookie}"><script>
+window.previous = [localStorage.getItem("visitas"), sessionStorage.getItem("visitas")];
+localStorage.setItem("visitas", "1");
+sessionStorage.setItem("visitas", "1");
+</script></body></html>"""
+
+
+async def index(request):
+    body = PAGE.format(cookie=request.cookies.get("sesion", ""))
+    response = web.Response(text=body, content_type="text/html")
+    response.set_cookie("sesion", "1")
+    return response
+
+
+async def scenario(page):
+    """Visita la página y devuelve True si no había estado de un escenario anterior."""
+    await page.goto(f"http://127.0.0.1:{PORT}/")
+    cookie = await page.get_attribute("body", "data-cookie")
+    previous = await page.evaluate("window.previous")
+    await asyncio.sleep(STEP_SECONDS)
+    return not cookie and previous == [None, None]
+
+
+async def run(name, lease, release, count):
+    overheads, clean = [], []
+    for _ in range(count):
+        start = time.perf_counter()
+        page = await lease()
+        overhead = time.perf_counter() - start
+        clean.append(await scenario(page))
+        start = time.perf_counter()
+        await release(page)
+        overheads.append((overhead + time.perf_counter() - start) * 1000)
+    # El primero depende de la estrategia anterior: no cuenta para el aislamiento
+    dirty = clean[1:].count(False)
+    isolated = f"no ({dirty}/{count - 1} sucios)" if dirty else "sí"
+    mean = statistics.mean(overheads)
+    p95 = statistics.quantiles(overheads, n=20)[-1] if count > 1 else mean
+    print(f"{name:<16}{mean:>12.1f}{p95:>12.1f}   {isolated}")
+
+
+async def main(count):
+    app = web.Application()
+    app.router.add_get("/", index)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+
+    manager = BrowserManager()
+    await manager.start()
+    launcher = getattr(manager.playwright, manager.browser_type)
+
+    async def relaunch():
+        browser = await launcher.launch(headless=manager.headless)
+        return await browser.new_page()
+
+    async def close_relaunched(page):
+        await page.context.browser.close()
+
+    async def new_context():
+        browser_context = await manager.browser.new_context()
+        return await browser_context.new_page()
+
+    async def close_context(page):
+        await page.context.close()
+
+    def lease(mode):
+        return lambda: manager.lease(mode)
+
+    print(f"{count} escenarios con {manager.browser_type}")
+    print(f"{'estrategia':<16}{'media ms':>12}{'p95 ms':>12}   aislado")
+    await run("relanzar", relaunch, close_relaunched, count)
+    await run("contexto nuevo", new_context, close_context, count)
+    await run("fresh (pool)", lease("fresh"), manager.release, count)
+    await run("reset", lease("reset"), manager.release, count)
+    await run("shared", lease("shared"), manager.release, count)
+    print(f"Escenarios que esperaron al pool: {manager.waits}")
+
+    await manager.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,126 @@
+# python -m pruebas.bench_item_store [tamaños...]
+"""Benchmark del repositorio de items: consultas de GET /items y escrituras.
+
+Genera catálogos sintéticos (por defecto 10k, 100k y 1M items), lanza las mismas
+consultas que usan los escenarios de API y compara la latencia media de
+ItemStore.query (con índices) con un filtrado lineal de toda la colección.
+
+Después mide el coste medio de cada escritura (alta, modificación y borrado,
+de uno en uno y por lotes), que debe crecer de forma logarítmica con el tamaño
+del catálogo y no linealmente.
+"""
+
+import random
+import sys
+import time
+
+from mocks.item_query import ItemQuery
+from mocks.item_store import ItemStore
+
+CATEGORIES = ["Electrónica", "Telefonía", "Audio", "Periféricos", "Muebles"] + [
+    f"Categoria {i}" for i in range(45)
+]
+
+QUERIES = {
+    "category": {"category": "Audio"},
+    "available+id": {"available": "true", "id": "4"},
+    "price>1990": {"price": ">1990"},
+    "price<5 & stock>0": {"price": "<5", "stock": ">0"},
+    "category+description": {"category": "Electrónica", "description": "RTX"},
+    "stock=0 & available": {"stock": "0", "available": "false"},
+}
+
+
+def build_items(size):
+    rnd = random.Random(size)
+    return [
+        {
+            "id": i,
+            "name": f"Item {i}",
+            "description": rnd.choice(["Tarjeta gráfica RTX", "Teclado", "Monitor 4K"]),
+            "category": rnd.choice(CATEGORIES),
+            "price": round(rnd.uniform(1, 2000), 2),
+            "stock": rnd.randint(0, 500),
+            "available": rnd.random() < 0.8,
+        }
+        for i in range(size)
+    ]
+
+
+WRITES = 2000
+BATCH = 500
+
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, len(result)
+
+
+def main(sizes):
+    for size in sizes:
+        items = build_items(size)
+        start = time.perf_counter()
+        store = ItemStore(items)
+        build_s = time.perf_counter() - start
+        print(f"\n📦 {size:,} items (construcción de índices: {build_s:.2f} s)")
+        print(f"{'consulta':<26}{'resultados':>11}{'índices ms':>12}{'scan ms':>10}")
+        repeat = 20 if size <= 100_000 else 3
+        for name, filters in QUERIES.items():
+            query = ItemQuery(filters)
+            indexed_ms, hits = timeit(lambda: store.query(query), repeat)
+            scan_ms, _ = timeit(
+                lambda: [item for item in items if query.matches(item)], repeat
+            )
+            print(f"{name:<26}{hits:>11}{indexed_ms:>12.3f}{scan_ms:>10.2f}")
+        bench_writes(store, size)
+
+
+def per_write_us(fn, count):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def bench_writes(store, size):
+    """Mide el coste medio por escritura sobre el catálogo ya cargado."""
+    new_items = [dict(item, id=item["id"] + size) for item in build_items(WRITES)]
+    new_ids = [item["id"] for item in new_items]
+    rnd = random.Random(size)
+    changes = [{"price": round(rnd.uniform(1, 2000), 2)} for _ in new_ids]
+
+    def add():
+        for item in new_items:
+            store.add(item)
+
+    def update():
+        for item_id, change in zip(new_ids, changes):
+            store.update(item_id, change)
+
+    def delete():
+        for item_id in new_ids:
+            store.delete(item_id)
+
+    def add_batches():
+        for start in range(0, WRITES, BATCH):
+            store.add_many(new_items[start : start + BATCH])
+
+    def delete_batches():
+        for start in range(0, WRITES, BATCH):
+            store.delete_many(new_ids[start : start + BATCH])
+
+    print(f"{'escritura':<26}{'µs/item':>11}")
+    print(f"{'alta':<26}{per_write_us(add, WRITES):>11.1f}")
+    print(f"{'modificación':<26}{per_write_us(update, WRITES):>11.1f}")
+    print(f"{'borrado':<26}{per_write_us(delete, WRITES):>11.1f}")
+    if hasattr(store, "add_many"):
+        print(
+            f"{f'alta en lotes de {BATCH}':<26}{per_write_us(add_batches, WRITES):>11.1f}"
+        )
+        label = f"borrado en lotes de {BATCH}"
+        print(f"{label:<26}{per_write_us(delete_batches, WRITES):>11.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,98 @@
+# python -m pruebas.bench_items_stream [tamaños...]
+"""Benchmark de GET /items: respuesta completa vs streaming (API_STREAM).
+
+Sirve catálogos sintéticos con un servidor aiohttp local (en otro proceso) y mide, para cada
+tamaño, el tiempo y el pico de memoria (tracemalloc) de:
+
+- completo: leer el cuerpo entero y decodificarlo con `json.loads`.
+- streaming: recorrerlo con `JsonArrayStream` y evaluar cada ítem con el
+  `Matcher` de la tabla de criterios, guardando solo las coincidencias.
+
+En ambos casos se guardan como mucho `LIMIT` coincidencias por fila y se lee la
+respuesta entera (sin cortar al completar todas las filas).
+
+El pico de memoria del modo streaming debe mantenerse plano con el tamaño.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+import tracemalloc
+
+from aiohttp import web
+
+from pruebas.bench_criteria import ROWS
+from pruebas.bench_item_store import build_items
+from utils.criteria import CriteriaEngine
+from utils.http_client import HttpClient
+from utils.json_stream import JsonArrayStream
+
+LIMIT = 10
+
+
+async def measure(fn):
+    # El tiempo se mide sin tracemalloc, que ralentiza mucho las asignaciones
+    start = time.perf_counter()
+    result = await fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    await fn()
+    peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed_ms, peak_mb, result
+
+
+def serve(port):
+    # Servidor en otro proceso para que su memoria no cuente en tracemalloc
+    bodies = {}
+
+    async def items(request):
+        size = int(request.query["size"])
+        if size not in bodies:
+            bodies.clear()
+            payload = {"success": True, "data": build_items(size), "total": size}
+            bodies[size] = json.dumps(payload).encode("utf-8")
+        return web.Response(body=bodies[size], content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/items", items)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+async def main(sizes, port=5088):
+    server = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    await asyncio.sleep(1)
+    http = HttpClient()
+
+    print(f"{'ítems':>10}{'completo ms':>14}{'MB':>8}{'streaming ms':>15}{'MB':>8}")
+    for size in sizes:
+        url = f"http://127.0.0.1:{port}/items?size={size}"
+        engine = CriteriaEngine(ROWS)
+        # Primera petición solo para que el servidor genere el catálogo
+        await http.get(url)
+
+        async def full():
+            response = await http.get(url)
+            return engine.match(response.json()["data"], LIMIT)
+
+        async def streaming():
+            matcher = engine.matcher(LIMIT)
+            async with http.stream("GET", url) as response:
+                async for item in JsonArrayStream(response.chunks):
+                    matcher.add(item)
+            return matcher.matches
+
+        full_ms, full_mb, expected = await measure(full)
+        stream_ms, stream_mb, result = await measure(streaming)
+        assert [len(m) for m in result] == [len(m) for m in expected]
+        print(f"{size:>10,}{full_ms:>14.1f}{full_mb:>8.1f}{stream_ms:>15.1f}{stream_mb:>8.1f}")
+
+    await HttpClient.close()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 300_000]))
@@ -0,0 +1,125 @@
+# python -m pruebas.check_dev_reloader
+"""Comprueba que el modo dev (con recargador) no pierde escrituras al apagarse.
+
+En modo dev Werkzeug lanza un proceso supervisor que importa el servidor y un
+hijo que atiende las peticiones. Si el supervisor compactara el diario al
+salir, escribiría en el YAML su copia de los datos, sin las mutaciones del
+hijo.
+
+Trabaja sobre una copia de resources/ en un directorio temporal:
+1. Deja en el diario un registro de una ejecución anterior (id 88888).
+2. Arranca `python -m mocks.mock_server --server dev` y crea el id 99999.
+3. Lo detiene con SIGINT a todo el grupo de procesos (como Ctrl+C) y
+   comprueba que el YAML, más lo que quede en el diario, tiene ambos ids.
+
+El hijo puede no llegar a compactar (el supervisor lo mata al recibir la
+señal); sus registros siguen entonces en el diario y se reaplican al arrancar.
+"""
+
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import yaml
+
+from mocks.journal import Journal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 5093
+BASE_URL = f"http://127.0.0.1:{PORT}"
+LEFTOVER_ID = 88888
+NEW_ID = 99999
+
+
+def make_item(item_id):
+    return {
+        "id": item_id,
+        "name": f"Reloader {item_id}",
+        "description": "Item de la comprobación del recargador",
+        "category": "Reloader",
+        "price": 1,
+        "stock": 1,
+        "available": True,
+    }
+
+
+def request(method, path, body=None, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(BASE_URL + path, data, headers, method=method)
+    with urllib.request.urlopen(req, timeout=5) as response:
+        return response.status, json.loads(response.read() or b"null")
+
+
+def wait_for_health(process):
+    for _ in range(100):
+        if process.poll() is not None:
+            raise RuntimeError("El servidor mock terminó al arrancar.")
+        try:
+            request("GET", "/health")
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError("El servidor mock no respondió a /health.")
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="check_dev_reloader_")
+    shutil.copytree(
+        os.path.join(ROOT, "resources"),
+        os.path.join(workdir, "resources"),
+        ignore=shutil.ignore_patterns("*.journal*", "*.msgpack", "*.tmp"),
+    )
+    data_file = os.path.join(workdir, "resources", "mock_data.yaml")
+    journal_file = os.path.join(workdir, "resources", "mock_data.journal")
+    with open(journal_file, "w", encoding="utf-8") as file:
+        file.write(json.dumps({"op": "put", "item": make_item(LEFTOVER_ID)}) + "\n")
+
+    env = dict(
+        os.environ,
+        MOCK_DATA_FILE=data_file,
+        MOCK_SWAGGER="false",
+        PYTHONPATH=ROOT,
+    )
+    env.pop("WERKZEUG_RUN_MAIN", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mocks.mock_server", "--server", "dev", "--port", str(PORT)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        wait_for_health(process)
+        _, body = request("POST", "/login", {})
+        status, _ = request("POST", "/items", make_item(NEW_ID), body["token"])
+        print(f"POST /items {NEW_ID}: {status}")
+    finally:
+        os.killpg(process.pid, signal.SIGINT)
+        process.wait(timeout=15)
+
+    with open(data_file, "r", encoding="utf-8") as file:
+        items = yaml.safe_load(file)["items"]
+    ids = {item["id"] for item in Journal.replay(journal_file, items)}
+    shutil.rmtree(workdir)
+
+    missing = [str(item_id) for item_id in (LEFTOVER_ID, NEW_ID) if item_id not in ids]
+    if missing:
+        print(f"❌ Fallo: se perdieron los ids {', '.join(missing)}.")
+        return 1
+    print("✅ Se conservan el registro pendiente y la escritura del modo dev.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# python -m pruebas.check_stream_stale_token
+"""Comprueba que GET /items en streaming (API_STREAM) se recupera de un token caducado.
+
+Sirve una API mínima con aiohttp que solo acepta el token de su último login
+y deja en la caché de tokens uno que el servidor ya no reconoce (como tras
+reiniciar el mock). `ApiTest` debe recibir un 401, renovar el token con un
+nuevo login y repetir la petición, igual que hace `authorized()` sin
+streaming.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+from aiohttp import web
+
+PORT = 5094
+API_URL = f"http://127.0.0.1:{PORT}"
+STALE_TOKEN = "token-de-una-ejecucion-anterior"
+ITEMS = [{"id": item_id, "name": f"Item {item_id}"} for item_id in range(1, 6)]
+
+os.environ["API_URL"] = API_URL
+os.environ["API_STREAM"] = "true"
+os.environ["API_TOKEN_CACHE"] = os.path.join(
+    tempfile.mkdtemp(prefix="check_stream_token_"), "tokens.json"
+)
+
+from features.pages.api_test_page import ApiTest  # noqa: E402
+from utils.http_client import HttpClient  # noqa: E402
+from utils.token_cache import TokenCache  # noqa: E402
+
+
+def build_app(stats):
+    async def login(request):
+        stats["logins"] += 1
+        stats["token"] = f"token-{stats['logins']}"
+        return web.json_response({"success": True, "token": stats["token"]})
+
+    async def items(request):
+        stats["requests"] += 1
+        if request.headers.get("Authorization") != f"Bearer {stats['token']}":
+            return web.json_response({"message": "Token inválido"}, status=401)
+        return web.json_response({"success": True, "data": ITEMS, "total": len(ITEMS)})
+
+    app = web.Application()
+    app.router.add_post("/login", login)
+    app.router.add_get("/items", items)
+    return app
+
+
+async def main():
+    stats = {"logins": 0, "requests": 0, "token": None}
+    runner = web.AppRunner(build_app(stats))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+    TokenCache().put(API_URL, STALE_TOKEN)
+
+    api = ApiTest()
+    errors = []
+    try:
+        await api.login()
+        if api.TOKEN != STALE_TOKEN:
+            errors.append("no se reutilizó el token de la caché")
+        await api.test_get_items()
+        if api.items_request != ITEMS[: api.SAMPLE_SIZE]:
+            errors.append(f"muestra inesperada: {api.items_request}")
+    except AssertionError as error:
+        errors.append(str(error))
+    finally:
+        await HttpClient.close()
+        await runner.cleanup()
+
+    if stats["logins"] != 1 or stats["requests"] != 2:
+        errors.append(
+            f"se esperaban 1 login y 2 peticiones, hubo {stats['logins']} "
+            f"y {stats['requests']}"
+        )
+    if errors:
+        print(f"❌ Fallo: {'; '.join(errors)}.")
+        return 1
+    print("✅ El streaming renovó el token caducado y repitió la petición.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
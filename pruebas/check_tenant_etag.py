@@ -0,0 +1,72 @@
+# python -m pruebas.check_tenant_etag
+"""Comprueba que un tenant recreado no responde 304 a los ETags del anterior.
+
+Un tenant descartado con DELETE /tenants se vuelve a clonar de la semilla con
+la misma versión de repositorio, así que tras el mismo número de escrituras
+vuelve a la misma versión con datos distintos. Con un ETag que dependiera solo
+de la versión y la consulta, el cliente recibiría un 304 y seguiría con el
+listado del tenant anterior.
+
+Trabaja sobre una copia de resources/ en un directorio temporal, con la app
+Flask en el mismo proceso.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TENANT = "etag-check"
+
+
+def make_item(item_id):
+    return {
+        "id": item_id,
+        "name": f"ETag {item_id}",
+        "description": "Item de la comprobación de ETags",
+        "category": "ETag",
+        "price": 1,
+        "stock": 1,
+        "available": True,
+    }
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="check_tenant_etag_")
+    shutil.copytree(
+        os.path.join(ROOT, "resources"),
+        os.path.join(workdir, "resources"),
+        ignore=shutil.ignore_patterns("*.journal*", "*.msgpack", "*.tmp"),
+    )
+    os.chdir(workdir)
+    os.environ["MOCK_SWAGGER"] = "false"
+
+    from mocks import mock_server as server
+
+    client = server.app.test_client()
+    headers = {"Authorization": f"Bearer {server.TOKEN}"}
+    items_url = f"/t/{TENANT}/items"
+
+    client.post(items_url, json=make_item(90001), headers=headers)
+    old = client.get(items_url, query_string={"category": "ETag"}, headers=headers)
+    client.delete(f"/tenants/{TENANT}", headers=headers)
+    client.post(items_url, json=make_item(90002), headers=headers)
+    new = client.get(
+        items_url,
+        query_string={"category": "ETag"},
+        headers={**headers, "If-None-Match": old.headers["ETag"]},
+    )
+    shutil.rmtree(workdir)
+
+    print(f"Tenant anterior: {old.json['data'][0]['id']} ({old.headers['ETag']})")
+    if new.status_code == 304:
+        print("❌ Fallo: el tenant recreado respondió 304 con el ETag del anterior.")
+        return 1
+    print(f"Tenant recreado: {new.json['data'][0]['id']} ({new.headers['ETag']})")
+    print("✅ El tenant recreado no reutiliza los ETags del anterior.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# python -m pruebas.stress_item_store [escritores] [operaciones por escritor]
+"""Prueba de estrés del repositorio de items del servidor mock.
+
+Lanza varios hilos escritores que crean, borran y modifican items (de uno en
+uno y por lotes) a través de la app Flask, mientras otros hilos leen GET /items
+sin parar. Trabaja sobre una copia de resources/ en un directorio temporal, con
+compactaciones frecuentes del diario para que también ocurran en plena carga.
+
+Cada escritor solo toca su propio rango de ids y lleva un modelo de lo que
+espera, y cada PUT cambia `price` y `stock` a la vez (stock == int(price)), de
+modo que un lector que viera un item a medio actualizar lo detectaría.
+
+Comprobaciones:
+- Lectores: `total` coincide con los items devueltos, sin ids repetidos, sin
+  items a medias y los listados filtrados solo contienen items que cumplen.
+- Final: el repositorio coincide con los modelos, las consultas por índices
+  coinciden con un filtrado lineal y el YAML más el diario reproducen el mismo
+  estado, antes y después de cerrar el diario.
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ID_RANGE = 1_000_000
+READERS = 4
+QUERIES = [
+    {"category": "Stress 1"},
+    {"available": "true"},
+    {"price": ">50"},
+    {"stock": "<10", "category": "Stress 2"},
+    {"price": "<20", "available": "false"},
+]
+
+
+def prepare_workdir():
+    """Copia resources/ a un directorio temporal y se sitúa en él."""
+    workdir = tempfile.mkdtemp(prefix="stress_item_store_")
+    shutil.copytree(
+        os.path.join(ROOT, "resources"),
+        os.path.join(workdir, "resources"),
+        ignore=shutil.ignore_patterns("*.journal*", "*.msgpack", "*.tmp"),
+    )
+    os.chdir(workdir)
+    os.environ.setdefault("MOCK_FSYNC_POLICY", "none")
+    os.environ.setdefault("MOCK_COMPACT_EVERY", "250")
+    os.environ.setdefault("MOCK_SWAGGER", "false")
+    return workdir
+
+
+def make_item(item_id, rnd):
+    price = rnd.randint(1, 100)
+    return {
+        "id": item_id,
+        "name": f"Stress {item_id}",
+        "description": "Item de la prueba de estrés",
+        "category": f"Stress {rnd.randint(0, 3)}",
+        "price": price,
+        "stock": price,
+        "available": rnd.random() < 0.5,
+    }
+
+
+def writer(server, index, operations, model, errors):
+    """Ejecuta operaciones aleatorias sobre su rango de ids y actualiza el modelo."""
+    rnd = random.Random(index)
+    client = server.app.test_client()
+    headers = {"Authorization": f"Bearer {server.TOKEN}"}
+    next_id = (index + 1) * ID_RANGE
+
+    def check(response, expected):
+        if response.status_code != expected:
+            errors.append(f"writer {index}: {response.status_code} != {expected}")
+
+    for _ in range(operations):
+        owned = list(model)
+        action = rnd.random()
+        if action < 0.35 or not owned:
+            item = make_item(next_id, rnd)
+            next_id += 1
+            check(client.post("/items", json=item, headers=headers), 201)
+            model[item["id"]] = item
+        elif action < 0.45:
+            items = [make_item(next_id + i, rnd) for i in range(5)]
+            next_id += 5
+            check(client.post("/items/batch", json={"items": items}, headers=headers), 200)
+            model.update((item["id"], item) for item in items)
+        elif action < 0.65:
+            item_id = rnd.choice(owned)
+            check(client.delete(f"/items/{item_id}", headers=headers), 200)
+            del model[item_id]
+        elif action < 0.7:
+            ids = rnd.sample(owned, min(3, len(owned)))
+            check(client.delete("/items/batch", json={"ids": ids}, headers=headers), 200)
+            for item_id in ids:
+                del model[item_id]
+        else:
+            item_id = rnd.choice(owned)
+            price = rnd.randint(1, 100)
+            changes = {
+                "price": price,
+                "stock": price,
+                "category": f"Stress {rnd.randint(0, 3)}",
+                "available": rnd.random() < 0.5,
+            }
+            check(client.put(f"/items/{item_id}", json=changes, headers=headers), 200)
+            model[item_id] = {**model[item_id], **changes}
+
+
+def reader(server, stop, stats, errors):
+    """Lee listados (completos y filtrados) y comprueba su coherencia."""
+    from mocks.item_query import ItemQuery
+
+    client = server.app.test_client()
+    headers = {"Authorization": f"Bearer {server.TOKEN}"}
+    rnd = random.Random()
+    while not stop.is_set():
+        filters = rnd.choice([{}] + QUERIES)
+        response = client.get("/items", query_string=filters, headers=headers)
+        payload = response.get_json()
+        data = payload["data"]
+        ids = [item["id"] for item in data]
+        if payload["total"] != len(data) or len(set(ids)) != len(ids):
+            errors.append(f"listado incoherente: total={payload['total']}")
+        for item in data:
+            stress = item["id"] >= ID_RANGE
+            if stress and item["stock"] != int(item["price"]):
+                errors.append(f"item a medias: {item}")
+            if not ItemQuery(filters).matches(item):
+                errors.append(f"{item['id']} no cumple {filters}")
+        stats["reads"] += 1
+
+
+def main(writers=8, operations=500):
+    workdir = prepare_workdir()
+    from mocks import mock_server as server
+    from mocks.item_query import ItemQuery
+
+    # Cambios de hilo mucho más frecuentes para forzar entrelazados
+    sys.setswitchinterval(1e-5)
+    seed = server.item_store.all()
+    models = [{} for _ in range(writers)]
+    errors, stats, stop = [], {"reads": 0}, threading.Event()
+
+    readers = [
+        threading.Thread(target=reader, args=(server, stop, stats, errors))
+        for _ in range(READERS)
+    ]
+    threads = [
+        threading.Thread(target=writer, args=(server, i, operations, models[i], errors))
+        for i in range(writers)
+    ]
+    start = time.perf_counter()
+    for thread in readers + threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    expected = seed + [item for model in models for item in model.values()]
+    actual = server.item_store.all()
+    if sorted(actual, key=lambda item: item["id"]) != sorted(
+        expected, key=lambda item: item["id"]
+    ):
+        errors.append("el repositorio no coincide con los modelos")
+    ids = [item["id"] for item in actual]
+    if len(set(ids)) != len(ids) or len(ids) != len(server.item_store):
+        errors.append("ids repetidos o longitud incorrecta en el repositorio")
+    for filters in QUERIES:
+        query = ItemQuery(filters)
+        if server.item_store.query(query) != [i for i in actual if query.matches(i)]:
+            errors.append(f"índices incoherentes para {filters}")
+    if server.load_mock_data() != actual:
+        errors.append("YAML + diario no reproducen el repositorio")
+    server.journal.close()
+    if server.load_mock_data() != actual:
+        errors.append("el YAML compactado no reproduce el repositorio")
+
+    total = writers * operations
+    print(f"✍️  {total} escrituras en {elapsed:.2f} s ({total / elapsed:.0f} ops/s)")
+    print(f"👀 {stats['reads']} lecturas concurrentes de GET /items")
+    print(f"📦 {len(actual)} items finales")
+    os.chdir(ROOT)
+    shutil.rmtree(workdir)
+    if errors:
+        print(f"❌ {len(errors)} errores, p. ej.: {errors[:5]}")
+        sys.exit(1)
+    print("✅ Invariantes correctos")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,235 @@
+# scripts/run_concurrent.py
+"""Ejecuta escenarios de behave de forma concurrente con un único navegador.
+
+Alternativa a `scripts/run_parallel.py` para máquinas con poca memoria: en
+lugar de un proceso (y un Chromium) por worker, hay un solo proceso behave con
+un solo navegador, y hasta N escenarios en curso a la vez, cada uno con su
+propio contexto de Playwright.
+
+Cada escenario corre en un hilo con su propio `Context` de behave, así que los
+steps no cambian: su `context.loop.run_until_complete(...)` entrega la
+corrutina al event loop compartido (`utils.threaded_loop.ThreadedLoop`, que
+`before_all` crea cuando BEHAVE_CONCURRENCY > 1) y espera su resultado. Las
+corrutinas de todos los escenarios se ejecutan concurrentemente en ese loop.
+
+Limitaciones:
+- Los atributos que `before_all` deja en el contexto se comparten entre
+  escenarios; los hooks de feature (`before_feature`, `after_feature`) no se
+  ejecutan.
+- Los formatters (allure, pretty...) reciben los resultados al terminar cada
+  feature, no en directo; los tiempos de sus informes no son los reales. Los
+  de junit y el resumen final sí lo son.
+- No admite cassettes de API (API_CASSETTE), que son globales del proceso.
+  Los escenarios de API usan un tenant por escenario (API_TENANT=scenario)
+  salvo que se indique otro.
+
+Uso (el resto de argumentos son los de behave):
+    python -m scripts.run_concurrent -c 4 --tags=@textbox features
+"""
+
+import argparse
+import functools
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from behave.__main__ import run_behave
+from behave.configuration import Configuration
+from behave.model import NoMatch, ScenarioOutline
+from behave.model_core import Status
+from behave.runner import Context, ModelRunner, Runner, the_step_registry
+
+FEATURE_HOOKS = ("before_feature", "after_feature")
+
+
+class ConcurrentRunner(Runner):
+    """Runner de behave que ejecuta los escenarios en varios hilos a la vez."""
+
+    def __init__(self, config):
+        """Inicializa el runner con la concurrencia de BEHAVE_CONCURRENCY.
+
+        La captura de stdout y logging de behave sustituye `sys.stdout` para
+        todo el proceso, así que se desactiva: la salida de los escenarios
+        concurrentes se muestra directamente.
+        """
+        super().__init__(config)
+        self.concurrency = max(1, int(os.getenv("BEHAVE_CONCURRENCY", "4")))
+        config.stdout_capture = False
+        config.stderr_capture = False
+        config.log_capture = False
+        self._slots = threading.local()
+        self._shared = {}
+
+    def scenarios(self, feature):
+        """Escenarios ejecutables de una feature (los Outline, ya expandidos)."""
+        if not feature.should_run(self.config):
+            return []
+        scenarios = []
+        for scenario in feature.scenarios:
+            if isinstance(scenario, ScenarioOutline):
+                scenarios.extend(scenario.scenarios)
+            else:
+                scenarios.append(scenario)
+        return scenarios
+
+    def _slot(self):
+        """Runner del hilo actual, con su propio `Context` de behave.
+
+        Comparte los hooks, los steps y los atributos creados en `before_all`
+        (loop, navegador, servidor mock...) con el runner principal.
+        """
+        slot = getattr(self._slots, "runner", None)
+        if slot is None:
+            slot = ModelRunner(self.config, step_registry=self.step_registry)
+            slot.hooks = self.hooks
+            slot.undefined_steps = self.undefined_steps
+            slot.context = Context(slot)
+            slot.context._root.update(self._shared)
+            self._slots.runner = slot
+        return slot
+
+    def _run_scenario(self, scenario):
+        """Ejecuta un escenario en el runner del hilo actual.
+
+        Returns:
+            bool: True si el escenario falló.
+        """
+        slot = self._slot()
+        slot.feature = scenario.feature
+        slot.context.feature = scenario.feature
+        if self.config.name and not scenario.should_run_with_name_select(self.config):
+            scenario.mark_skipped()
+            return False
+        failed = scenario.run(slot)
+        if scenario.status != Status.skipped:
+            status = "❌" if failed else "✅"
+            name = f"{scenario.feature.name}: {scenario.name}"
+            print(f"{status} {name} ({scenario.duration:.1f} s)")
+        return failed
+
+    def _report(self, feature, formatters):
+        """Pasa a los formatters y reporters los resultados de una feature ya ejecutada.
+
+        Se reproduce la secuencia de llamadas que hace behave al ejecutar la
+        feature de forma secuencial. La reproducción de cada escenario se hace
+        a través de `scenario.run`, que es lo que envuelven formatters como el
+        de allure para detectar el inicio y el fin de cada escenario.
+        """
+        scenarios = [
+            scenario
+            for scenario in self.scenarios(feature)
+            if scenario.status != Status.skipped or self.config.show_skipped
+        ]
+        if scenarios:
+            for scenario in scenarios:
+                scenario.run = functools.partial(self._replay, scenario, formatters)
+            for formatter in formatters:
+                formatter.uri(feature.filename)
+                formatter.feature(feature)
+                if feature.background:
+                    formatter.background(feature.background)
+            for scenario in scenarios:
+                scenario.run(self)
+                del scenario.run
+            for formatter in formatters:
+                formatter.eof()
+        for reporter in self.config.reporters:
+            reporter.feature(feature)
+
+    def _replay(self, scenario, formatters, runner=None):
+        """Envía a los formatters los eventos de un escenario ya ejecutado."""
+        for formatter in formatters:
+            formatter.scenario(scenario)
+            for step in scenario:
+                formatter.step(step)
+        for step in scenario.all_steps:
+            if step.status in (Status.untested, Status.skipped):
+                continue
+            match = self.step_registry.find_match(step) or NoMatch()
+            for formatter in formatters:
+                formatter.match(match)
+                formatter.result(step)
+        return scenario.status == Status.failed
+
+    def run_model(self, features=None):
+        """Ejecuta `before_all`, los escenarios en paralelo, y `after_all`.
+
+        Returns:
+            bool: True si algo falló (como `ModelRunner.run_model`).
+        """
+        if not self.context:
+            self.context = Context(self)
+        if self.step_registry is None:
+            self.step_registry = the_step_registry
+        if features is None:
+            features = self.features
+        formatters, self.formatters = self.formatters, []
+        ignored = [hook for hook in FEATURE_HOOKS if hook in self.hooks]
+        if ignored:
+            print(f"⚠️ En modo concurrente no se ejecutan: {', '.join(ignored)}.")
+
+        self.hook_failures = 0
+        self.run_hook("before_all", self.context)
+        defaults = Context(self)._root
+        self._shared = {
+            name: value
+            for name, value in self.context._root.items()
+            if name not in defaults
+        }
+
+        failed_count = 0
+        if not self.aborted:
+            scenarios = [s for feature in features for s in self.scenarios(feature)]
+            print(
+                f"🚀 {len(scenarios)} escenarios, hasta {self.concurrency} a la vez "
+                "en un único navegador."
+            )
+            with ThreadPoolExecutor(self.concurrency, "escenario") as pool:
+                failed_count = sum(pool.map(self._run_scenario, scenarios))
+
+        for feature in features:
+            self._report(feature, formatters)
+        self.run_hook("after_all", self.context)
+        cleanups_failed = False
+        try:
+            self.context._do_cleanups()
+        except Exception:
+            cleanups_failed = True
+        for formatter in formatters:
+            formatter.close()
+        for reporter in self.config.reporters:
+            reporter.end()
+        failed = failed_count or self.aborted or self.hook_failures
+        return bool(failed or self.undefined_steps or cleanups_failed)
+
+
+def main(argv=None):
+    """Prepara el entorno concurrente y lanza behave con `ConcurrentRunner`."""
+    parser = argparse.ArgumentParser(
+        description="Ejecuta escenarios de behave concurrentemente en un navegador.",
+        epilog="El resto de argumentos se pasan a behave.",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("BEHAVE_CONCURRENCY", "4")),
+        help="Escenarios en curso a la vez (por defecto, BEHAVE_CONCURRENCY o 4).",
+    )
+    args, behave_args = parser.parse_known_args(argv)
+    if os.getenv("API_CASSETTE"):
+        print("❌ API_CASSETTE no es compatible con la ejecución concurrente.")
+        return 2
+
+    concurrency = max(1, args.concurrency)
+    os.environ["BEHAVE_CONCURRENCY"] = str(concurrency)
+    # Un contexto preparado por escenario en curso, más uno de reserva
+    os.environ.setdefault("BROWSER_POOL_SIZE", str(concurrency + 1))
+    # Escenarios de API simultáneos: cada uno con sus propios datos
+    os.environ.setdefault("API_TENANT", "scenario")
+    return run_behave(Configuration(behave_args), runner_class=ConcurrentRunner)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,421 @@
+# scripts/run_parallel.py
+"""Ejecuta los escenarios de behave repartidos entre varios procesos worker.
+
+Es el complemento paralelo de `scripts/run_tests.sh`: descubre los escenarios
+(aplicando los tags de la línea de comandos y de `behave.ini`), los ordena de
+más largo a más corto según su duración en ejecuciones anteriores y los pone
+en una cola común. Cada uno de los N workers va sacando lotes de la cola y
+lanza un `behave` por lote con sus escenarios (`fichero.feature:línea`), así
+que un worker que termina pronto sigue cogiendo trabajo en lugar de quedarse
+parado. Los lotes son grandes al principio y se reducen al final (hasta
+`BEHAVE_MIN_BATCH` segundos estimados, si hay histórico), para repartir bien la
+cola sin pagar un arranque de behave (y de navegador) por escenario.
+
+Al terminar, la duración de cada escenario se guarda en el histórico
+(`BEHAVE_DURATIONS`, por defecto `.behave-durations.json`). Los escenarios sin
+histórico se estiman con la media de los de su misma feature o, si no hay, con
+la mediana de todos.
+
+Cada worker escribe sus artefactos en `reports/workers/worker-<i>/` (log de
+behave, allure-results, un `batch-<j>/` por lote, trazas y capturas). Cada lote
+usa su propio tenant del servidor mock (`API_TENANT=run<pid>-w<i>-b<j>`), así
+que parte de los datos semilla y no de lo que dejó el lote anterior del mismo
+worker. Los resultados de todos se fusionan en `reports/allure-results/` y
+`reports/junit-results/`, como si fuera una sola ejecución.
+
+Uso:
+    python -m scripts.run_parallel -n 4 --tags=@api_test
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from behave.configuration import Configuration
+from behave.parser import parse_file
+
+REPORTS_DIR = Path("reports")
+WORKERS_DIR = REPORTS_DIR / "workers"
+ALLURE_FORMATTER = "allure_behave.formatter:AllureFormatter"
+JUNIT_COUNTERS = ("tests", "errors", "failures", "skipped")
+DURATIONS_FILE = Path(os.getenv("BEHAVE_DURATIONS", ".behave-durations.json"))
+# Peso de la última medida frente al histórico (media móvil exponencial)
+DURATION_WEIGHT = 0.5
+# Duración supuesta cuando aún no hay ningún escenario con histórico
+DEFAULT_DURATION = 1.0
+# Cada lote se lleva como mucho 1/(BATCH_FACTOR * workers) del trabajo pendiente
+BATCH_FACTOR = 2
+# Trabajo mínimo por lote (s), para amortizar el arranque de behave y del navegador
+MIN_BATCH_SECONDS = float(os.getenv("BEHAVE_MIN_BATCH", "10"))
+
+
+def discover(paths, tags):
+    """Devuelve las ubicaciones de los escenarios que se ejecutarían.
+
+    Args:
+        paths (list): Ficheros o carpetas de features.
+        tags (list): Expresiones de tags (como las de `behave --tags`).
+
+    Returns:
+        list[tuple[str, str]]: Pares (ubicación `fichero.feature:línea`, clave
+            del histórico), en orden de ejecución. Los Scenario Outline se
+            expanden en un escenario por ejemplo.
+    """
+    config = Configuration([f"--tags={tag}" for tag in tags] + paths)
+    feature_files = []
+    for path in map(Path, config.paths):
+        if path.is_dir():
+            feature_files.extend(sorted(path.rglob("*.feature")))
+        else:
+            feature_files.append(path)
+
+    locations = []
+    for feature_file in feature_files:
+        feature = parse_file(str(feature_file))
+        for scenario in feature.walk_scenarios():
+            if config.tags.check(scenario.effective_tags):
+                key = scenario_key(scenario.location.filename, scenario.name)
+                locations.append((str(scenario.location), key))
+    return locations
+
+
+def scenario_key(filename, name):
+    """Clave de un escenario en el histórico de duraciones.
+
+    Se usa el nombre y no la línea para que el histórico sobreviva a los
+    cambios en el fichero .feature.
+    """
+    return f"{Path(filename).as_posix()}::{name.strip()}"
+
+
+class DurationHistory:
+    """Histórico de la duración de cada escenario, guardado en un JSON local."""
+
+    def __init__(self, path=DURATIONS_FILE):
+        """Carga el histórico (vacío si el fichero no existe o está corrupto)."""
+        self.path = Path(path)
+        try:
+            self.durations = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.durations = {}
+
+    def estimate(self, key):
+        """Duración esperada de un escenario, en segundos.
+
+        Sin histórico, se usa la media de los escenarios de la misma feature o,
+        si tampoco hay, la mediana de todos los conocidos.
+        """
+        if key in self.durations:
+            return self.durations[key]
+        feature = key.partition("::")[0]
+        siblings = [
+            duration
+            for known, duration in self.durations.items()
+            if known.partition("::")[0] == feature
+        ]
+        if siblings:
+            return statistics.mean(siblings)
+        if self.durations:
+            return statistics.median(self.durations.values())
+        return DEFAULT_DURATION
+
+    def update(self, measured):
+        """Incorpora las duraciones medidas y guarda el histórico.
+
+        Args:
+            measured (dict): Segundos por clave de escenario.
+        """
+        for key, duration in measured.items():
+            previous = self.durations.get(key, duration)
+            smoothed = DURATION_WEIGHT * duration + (1 - DURATION_WEIGHT) * previous
+            self.durations[key] = round(smoothed, 3)
+        temp_path = self.path.with_name(f"{self.path.name}.tmp")
+        temp_path.write_text(
+            json.dumps(self.durations, indent=2, sort_keys=True, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(temp_path, self.path)
+
+
+class WorkQueue:
+    """Cola de escenarios, de más largo a más corto, compartida por los workers."""
+
+    def __init__(self, locations, history, workers):
+        """Ordena los escenarios por duración estimada (LPT).
+
+        Args:
+            locations (list): Pares (ubicación, clave) de `discover`.
+            history (DurationHistory): Histórico para estimar las duraciones.
+            workers (int): Número de workers que consumen la cola.
+        """
+        estimated = [(history.estimate(key), location) for location, key in locations]
+        estimated.sort(key=lambda item: item[0], reverse=True)
+        self.pending = estimated
+        self.remaining = sum(duration for duration, _ in estimated)
+        self.total = self.remaining
+        self.workers = workers
+        # Sin histórico las duraciones son supuestas: no se fuerza un mínimo
+        self.min_batch = MIN_BATCH_SECONDS if history.durations else 0.0
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Saca el siguiente lote de escenarios.
+
+        El lote se llena hasta 1/(BATCH_FACTOR * workers) del trabajo pendiente,
+        pero nunca por debajo de MIN_BATCH_SECONDS (y al menos un escenario):
+        lotes grandes al principio y cada vez más pequeños al final de la cola,
+        sin que el arranque de behave llegue a pesar más que el propio lote.
+        El mínimo solo se aplica con histórico de duraciones, y ningún lote
+        supera la parte que toca a cada worker (1/workers de lo pendiente),
+        para que todos reciban trabajo.
+
+        Returns:
+            list[str]: Ubicaciones del lote (vacía si la cola se ha agotado).
+        """
+        with self._lock:
+            guided = self.remaining / (BATCH_FACTOR * self.workers)
+            fair_share = self.remaining / self.workers
+            budget = min(max(guided, self.min_batch), fair_share)
+            batch, batch_time = [], 0.0
+            while self.pending:
+                duration, location = self.pending[0]
+                if batch and batch_time + duration > budget:
+                    break
+                self.pending.pop(0)
+                batch.append(location)
+                batch_time += duration
+            self.remaining -= batch_time
+            return batch
+
+
+def batch_tenant(index, batch_index):
+    """Nombre del tenant del servidor mock para un lote, único en cada ejecución."""
+    return f"run{os.getpid()}-w{index}-b{batch_index}"
+
+
+def run_batch(index, batch_index, locations, tags):
+    """Ejecuta un lote de escenarios en un proceso behave y espera a que acabe.
+
+    Cada lote es un proceso behave nuevo, que toma su instantánea inicial de
+    los datos al empezar: por eso usa un tenant propio, recién clonado de la
+    semilla, salvo que se fije API_TENANT.
+
+    Returns:
+        int: Código de salida de behave.
+    """
+    worker_dir = WORKERS_DIR / f"worker-{index}"
+    batch_dir = worker_dir / f"batch-{batch_index}"
+    env = {
+        **os.environ,
+        "WORKER_ID": str(index),
+        "REPORTS_DIR": str(worker_dir),
+        "API_TENANT": os.getenv("API_TENANT") or batch_tenant(index, batch_index),
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "behave",
+        *locations,
+        *(f"--tags={tag}" for tag in tags),
+        "--no-skipped",
+        "-f",
+        ALLURE_FORMATTER,
+        "-o",
+        str(worker_dir / "allure-results"),
+        "-f",
+        "json",
+        "-o",
+        str(batch_dir / "behave.json"),
+        "-f",
+        "progress",
+        "--junit",
+        "--junit-directory",
+        str(batch_dir / "junit-results"),
+    ]
+    batch_dir.mkdir(parents=True)
+    with open(worker_dir / "behave.log", "ab") as log_file:
+        log_file.write(f"--- lote {batch_index}: {' '.join(locations)}\n".encode())
+        log_file.flush()
+        process = subprocess.run(
+            command, env=env, stdout=log_file, stderr=subprocess.STDOUT
+        )
+    return process.returncode
+
+
+def run_worker(index, queue, tags, results):
+    """Saca lotes de la cola y los ejecuta hasta que se agota.
+
+    Guarda en `results[index]` el peor código de salida de sus lotes.
+    """
+    worker_dir = WORKERS_DIR / f"worker-{index}"
+    shutil.rmtree(worker_dir, ignore_errors=True)
+    worker_dir.mkdir(parents=True)
+    exit_code = 0
+    batch_index = 0
+    while batch := queue.take():
+        batch_index += 1
+        start = time.perf_counter()
+        returncode = run_batch(index, batch_index, batch, tags)
+        exit_code = exit_code or returncode
+        status = "✅" if returncode == 0 else "❌"
+        elapsed = time.perf_counter() - start
+        print(
+            f"{status} worker-{index} lote {batch_index}: {len(batch)} escenarios "
+            f"en {elapsed:.1f} s (código {returncode})",
+            flush=True,
+        )
+    results[index] = exit_code
+
+
+def read_durations(worker_dirs):
+    """Lee la duración de cada escenario ejecutado de los informes JSON de behave.
+
+    La duración es la suma de la de sus pasos (incluido el Background), la
+    misma que usa behave en los informes junit.
+
+    Returns:
+        dict: Segundos por clave de escenario.
+    """
+    measured = {}
+    for worker_dir in worker_dirs:
+        for report in sorted(worker_dir.glob("batch-*/behave.json")):
+            try:
+                features = json.loads(report.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            for feature in features:
+                for element in feature.get("elements", []):
+                    if element.get("type") != "scenario":
+                        continue
+                    if element.get("status") not in ("passed", "failed"):
+                        continue
+                    filename = element["location"].rpartition(":")[0]
+                    steps = element.get("steps", [])
+                    duration = sum(
+                        step.get("result", {}).get("duration", 0) for step in steps
+                    )
+                    measured[scenario_key(filename, element["name"])] = duration
+    return measured
+
+
+def merge_allure(worker_dirs, target):
+    """Copia los resultados de allure de todos los workers en `target`.
+
+    Los ficheros de allure tienen nombres únicos (UUID), así que basta con
+    juntarlos en la misma carpeta.
+    """
+    target.mkdir(parents=True, exist_ok=True)
+    copied = 0
+    for worker_dir in worker_dirs:
+        source = worker_dir / "allure-results"
+        for result in sorted(source.glob("*")) if source.is_dir() else []:
+            shutil.copy2(result, target / result.name)
+            copied += 1
+    return copied
+
+
+def merge_junit(worker_dirs, target):
+    """Fusiona los informes junit de los workers, uno por feature.
+
+    Cada lote escribe `TESTS-<feature>.xml` con los escenarios de esa
+    feature que ejecutó; los `<testcase>` de todos se juntan en un único
+    `<testsuite>` por feature, sumando sus contadores y tiempos.
+
+    Returns:
+        int: Número de informes escritos en `target`.
+    """
+    suites = {}
+    for worker_dir in worker_dirs:
+        for report in sorted(worker_dir.glob("batch-*/junit-results/*.xml")):
+            suite = ET.parse(report).getroot()
+            merged = suites.get(report.name)
+            if merged is None:
+                suites[report.name] = suite
+                continue
+            for counter in JUNIT_COUNTERS:
+                total = int(merged.get(counter, 0)) + int(suite.get(counter, 0))
+                merged.set(counter, str(total))
+            elapsed = float(merged.get("time", 0)) + float(suite.get("time", 0))
+            merged.set("time", f"{elapsed:.6f}")
+            merged.extend(suite.findall("testcase"))
+
+    target.mkdir(parents=True, exist_ok=True)
+    for name, suite in suites.items():
+        tree = ET.ElementTree(suite)
+        tree.write(target / name, encoding="UTF-8", xml_declaration=True)
+    return len(suites)
+
+
+def main(argv=None):
+    """Descubre, reparte y ejecuta los escenarios, y fusiona los resultados."""
+    parser = argparse.ArgumentParser(description="Ejecuta behave en varios workers.")
+    parser.add_argument(
+        "-n",
+        "--workers",
+        type=int,
+        default=int(os.getenv("BEHAVE_WORKERS", os.cpu_count() or 1)),
+        help="Número de procesos worker (por defecto, BEHAVE_WORKERS o nº de CPUs).",
+    )
+    parser.add_argument(
+        "--tags",
+        action="append",
+        default=[],
+        help="Expresión de tags, como en behave (se puede repetir).",
+    )
+    parser.add_argument("paths", nargs="*", default=["features"])
+    args = parser.parse_args(argv)
+
+    locations = discover(args.paths, args.tags)
+    if not locations:
+        print("⚠️ No hay escenarios que ejecutar con esos tags.")
+        return 0
+    history = DurationHistory()
+    workers = max(1, min(args.workers, len(locations)))
+    queue = WorkQueue(locations, history, workers)
+    print(
+        f"🚀 {len(locations)} escenarios en cola para {workers} workers "
+        f"(estimado: {queue.total:.1f} s de trabajo, "
+        f"~{queue.total / workers:.1f} s por worker)."
+    )
+
+    start = time.perf_counter()
+    # Un worker que falla sin llegar a guardar su código cuenta como fallido
+    results = dict.fromkeys(range(1, workers + 1), 1)
+    threads = [
+        threading.Thread(target=run_worker, args=(index, queue, args.tags, results))
+        for index in range(1, workers + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    exit_code = next((code for code in results.values() if code), 0)
+
+    worker_dirs = [WORKERS_DIR / f"worker-{index}" for index in results]
+    measured = read_durations(worker_dirs)
+    history.update(measured)
+    allure_files = merge_allure(worker_dirs, REPORTS_DIR / "allure-results")
+    junit_files = merge_junit(worker_dirs, REPORTS_DIR / "junit-results")
+    elapsed = time.perf_counter() - start
+    print(
+        f"📊 Resultados fusionados: {allure_files} ficheros de allure y "
+        f"{junit_files} informes junit ({elapsed:.1f} s)."
+    )
+    work = sum(measured.values())
+    print(
+        f"⏱️ Trabajo medido: {work:.1f} s (ideal con {workers} workers: "
+        f"{work / workers:.1f} s). Histórico actualizado: {history.path}"
+    )
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
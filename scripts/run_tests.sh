@@ -49,12 +49,38 @@ playwright install --with-deps
 # -----------------------------------------------------------------------------#
 # 3) INICIAR SERVIDOR MOCK EN BACKGROUND
 # -----------------------------------------------------------------------------#
-echo "🚀 Iniciando servidor mock en segundo plano..."
-python mocks/mock_server.py &
-MOCK_PID=$!
-
-# Opcional: esperar unos segundos a que levante el servidor
-sleep 3
+# Con API_CASSETTE=replay las respuestas salen de las cassettes, con
+# API_TRANSPORT=wsgi la app del mock corre dentro de behave y con
+# MOCK_EMBEDDED=true la arranca before_all: en esos casos no hace falta
+if [ "$API_CASSETTE" == "replay" ]; then
+  echo "📼 Reproduciendo cassettes de API: no se inicia el servidor mock."
+elif [ "$API_TRANSPORT" == "wsgi" ]; then
+  echo "🧩 Transporte WSGI en proceso: no se inicia el servidor mock."
+elif [ "$MOCK_EMBEDDED" == "true" ]; then
+  echo "🧩 behave arranca su propio servidor mock en un puerto libre."
+else
+  echo "🚀 Iniciando servidor mock en segundo plano..."
+  python -m mocks.mock_server --server gevent --quiet &
+  MOCK_PID=$!
+
+  # Espera activa al endpoint /health en lugar de un retardo fijo (máx. 60s)
+  API_URL=${API_URL:-http://localhost:5000}
+  MOCK_READY=false
+  for _ in $(seq 1 600); do
+    if curl -sf "$API_URL/health" > /dev/null; then
+      echo "✅ Servidor mock listo en $API_URL"
+      MOCK_READY=true
+      break
+    fi
+    sleep 0.1
+  done
+
+  if [ "$MOCK_READY" != "true" ]; then
+    kill $MOCK_PID 2>/dev/null || true
+    echo "❌ El servidor mock no respondió en $API_URL/health tras 60s."
+    exit 1
+  fi
+fi
 
 # -----------------------------------------------------------------------------#
 # 4) EJECUTAR PRUEBAS CON BEHAVE + GUARDAR FALLAS
@@ -92,8 +118,10 @@ allure open reports/allure-report
 # -----------------------------------------------------------------------------#
 # 7) DETENER SERVIDOR MOCK
 # -----------------------------------------------------------------------------#
-echo "🛑 Deteniendo servidor mock (PID=$MOCK_PID)..."
-kill $MOCK_PID 2>/dev/null || echo "⚠️ No se pudo detener el servidor mock."
+if [ -n "$MOCK_PID" ]; then
+  echo "🛑 Deteniendo servidor mock (PID=$MOCK_PID)..."
+  kill $MOCK_PID 2>/dev/null || echo "⚠️ No se pudo detener el servidor mock."
+fi
 
 echo "✅ Proceso de pruebas finalizado correctamente."
 exit 0
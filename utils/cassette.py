@@ -0,0 +1,154 @@
+# utils/cassette.py
+"""Módulo que define `Cassette`, la grabación de peticiones y respuestas de la API.
+
+En modo `record`, `HttpClient` envía las peticiones al servidor y guarda cada
+par petición/respuesta en la cassette; en modo `replay` responde desde la
+cassette sin abrir ningún socket, así que los escenarios de API se ejecutan
+sin servidor mock y en milisegundos (útil cuando solo cambian las aserciones).
+
+Las peticiones se identifican por método, ruta (con la query ordenada y sin el
+prefijo `/t/<tenant>/`), hash del cuerpo y hash de la cabecera Authorization,
+de modo que en disco no se guardan tokens. Si la misma petición se repite, las
+respuestas se devuelven en el orden en que se grabaron (la última se repite).
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict, deque
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import msgpack
+
+from utils.http_client import ApiResponse
+
+CASSETTE_MODES = ("record", "replay")
+CASSETTE_VERSION = 1
+TENANT_PATH_RE = re.compile(r"^/t/[^/]+(?=/)")
+
+
+class CassetteError(LookupError):
+    """Error lanzado cuando una petición no está grabada en la cassette."""
+
+
+def _digest(data):
+    """Devuelve un hash corto de `data` (o '' si no hay datos)."""
+    if data is None:
+        return ""
+    if not isinstance(data, bytes):
+        data = str(data).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class Cassette:
+    """Fichero msgpack con las interacciones grabadas de un escenario."""
+
+    def __init__(self, path, mode):
+        """Abre la cassette; en modo `replay` carga sus interacciones.
+
+        Args:
+            path (str | Path): Ruta del fichero .msgpack.
+            mode (str): 'record' (se sobrescribe al guardar) o 'replay'.
+
+        Raises:
+            ValueError: Si el modo no es válido.
+            CassetteError: Si en modo `replay` la cassette no existe.
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Modo de cassette '{mode}' no válido: {CASSETTE_MODES}")
+        self.path = path
+        self.mode = mode
+        self.interactions = []
+        self._responses = defaultdict(deque)
+        if mode == "replay":
+            self._load()
+
+    @staticmethod
+    def key(method, url, params=None, json_body=None, data=None, headers=None):
+        """Calcula la clave con la que se graba y se busca una petición.
+
+        Args:
+            method (str): Método HTTP.
+            url (str): URL completa.
+            params (dict, opcional): Parámetros de la query.
+            json_body (Any, opcional): Cuerpo JSON.
+            data (bytes | str, opcional): Cuerpo sin codificar.
+            headers (dict, opcional): Cabeceras (solo cuenta Authorization).
+
+        Returns:
+            tuple: (método, ruta con query, hash del cuerpo, hash de Authorization).
+        """
+        parts = urlsplit(url)
+        path = TENANT_PATH_RE.sub("", parts.path)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        query.extend((str(k), str(v)) for k, v in (params or {}).items())
+        if query:
+            path = f"{path}?{urlencode(sorted(query))}"
+        if json_body is not None:
+            data = json.dumps(json_body, sort_keys=True, ensure_ascii=False)
+        auth = (headers or {}).get("Authorization")
+        return method.upper(), path, _digest(data), _digest(auth)
+
+    @property
+    def replaying(self):
+        """Indica si la cassette responde en lugar del servidor."""
+        return self.mode == "replay"
+
+    def _load(self):
+        """Carga las interacciones agrupando las respuestas por clave."""
+        try:
+            with open(self.path, "rb") as file:
+                payload = msgpack.unpack(file, raw=False)
+        except FileNotFoundError:
+            raise CassetteError(
+                f"No existe la cassette '{self.path}': grábala con API_CASSETTE=record"
+            ) from None
+        self.interactions = payload["interactions"]
+        for interaction in self.interactions:
+            self._responses[tuple(interaction["key"])].append(interaction)
+
+    def record(self, key, response):
+        """Añade una interacción a la grabación.
+
+        Args:
+            key (tuple): Clave de la petición (ver `key`).
+            response (ApiResponse): Respuesta recibida del servidor.
+        """
+        self.interactions.append(
+            {
+                "key": list(key),
+                "status": response.status_code,
+                "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+                "text": response.text,
+            }
+        )
+
+    def play(self, key):
+        """Devuelve la respuesta grabada para una petición.
+
+        Raises:
+            CassetteError: Si la petición no se grabó.
+        """
+        responses = self._responses.get(key)
+        if not responses:
+            method, path, _, _ = key
+            raise CassetteError(
+                f"Petición {method} {path} no grabada en '{self.path}': vuelve a "
+                "grabar la cassette con API_CASSETTE=record"
+            )
+        interaction = responses.popleft() if len(responses) > 1 else responses[0]
+        return ApiResponse(
+            interaction["status"], interaction["text"], interaction["headers"]
+        )
+
+    def save(self):
+        """Guarda la grabación (de forma atómica) si está en modo `record`."""
+        if self.replaying:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        payload = {"version": CASSETTE_VERSION, "interactions": self.interactions}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as file:
+            msgpack.pack(payload, file, use_bin_type=True)
+        os.replace(tmp_path, self.path)
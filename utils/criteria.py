@@ -0,0 +1,303 @@
+# utils/criteria.py
+"""Módulo que compila las tablas de criterios de Gherkin en predicados tipados.
+
+Cada fila de criterios (p. ej. `{"price": ">100", "available": "true"}`) se
+analiza una sola vez: los umbrales se convierten a número, los textos se
+normalizan y el operador se resuelve a una función. Después, `CriteriaEngine`
+evalúa todas las filas en una única pasada sobre los ítems.
+
+Semántica de cada columna (igual que la de la tabla de `verify_items_request`):
+- Valor vacío: la columna se ignora.
+- description: el valor debe estar contenido en la descripción.
+- price / stock: comparación numérica con '>', '<' o igualdad.
+- available: igualdad sin distinguir mayúsculas.
+- Resto: igualdad como texto.
+Un ítem sin la columna (o con valor None) nunca cumple esa condición.
+
+Para respuestas muy grandes hay un backend columnar con NumPy, que es opcional:
+solo se importa si se usa.
+"""
+
+import operator
+
+NUMERIC_FIELDS = ("price", "stock")
+# A partir de este número de ítems, el backend 'auto' usa NumPy si está instalado
+NUMPY_THRESHOLD = 50_000
+OPERATORS = {">": operator.gt, "<": operator.lt, "=": operator.eq}
+
+
+def _to_float(value):
+    """Convierte a float o devuelve None si no es numérico."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Condition:
+    """Condición compilada sobre una columna de la tabla de criterios."""
+
+    __slots__ = ("field", "kind", "compare", "operand", "predicate")
+
+    def __init__(self, field, raw):
+        """Analiza el valor de la celda una sola vez.
+
+        Args:
+            field (str): Nombre de la columna.
+            raw (str): Valor de la celda, ya sin espacios y no vacío.
+        """
+        self.field = field
+        self.compare = operator.eq
+        if field == "description":
+            self.kind, self.operand = "contains", raw
+        elif field in NUMERIC_FIELDS:
+            symbol = raw[0] if raw[0] in "<>" else "="
+            self.kind = "number"
+            self.compare = OPERATORS[symbol]
+            # Un umbral no numérico hace que la condición no se cumpla nunca
+            self.operand = _to_float(raw[1:] if symbol != "=" else raw)
+        elif field == "available":
+            self.kind, self.operand = "caseless", raw.lower()
+        else:
+            self.kind, self.operand = "text", raw
+
+        self.predicate = self._compile()
+
+    def _compile(self):
+        """Genera una función especializada para el tipo de condición.
+
+        Los valores int/float (el caso habitual en JSON) se comparan sin pasar
+        por float(), y los de texto sin pasar por str().
+        """
+        field, operand, compare = self.field, self.operand, self.compare
+        if self.kind == "number":
+            if operand is None:
+                return lambda item: False
+
+            def number(item):
+                value = item.get(field)
+                if type(value) is not int and type(value) is not float:
+                    if value is None:
+                        return False
+                    value = _to_float(value)
+                    if value is None:
+                        return False
+                return compare(value, operand)
+
+            return number
+        if self.kind == "contains":
+
+            def contains(item):
+                value = item.get(field)
+                if type(value) is str:
+                    return operand in value
+                return value is not None and operand in str(value)
+
+            return contains
+        if self.kind == "caseless":
+
+            def caseless(item):
+                value = item.get(field)
+                return value is not None and str(value).lower() == operand
+
+            return caseless
+
+        def text(item):
+            value = item.get(field)
+            if type(value) is str:
+                return value == operand
+            return value is not None and str(value) == operand
+
+        return text
+
+    def __call__(self, item):
+        """Indica si el ítem cumple la condición."""
+        return self.predicate(item)
+
+
+class Criteria:
+    """Fila de criterios compilada: se cumple si se cumplen todas sus condiciones."""
+
+    __slots__ = ("row", "conditions", "predicate")
+
+    def __init__(self, row):
+        """Compila una fila de la tabla de criterios.
+
+        Args:
+            row (dict): Columna -> valor de la celda (las celdas vacías se ignoran).
+        """
+        self.row = row
+        self.conditions = [
+            Condition(field, value.strip())
+            for field, value in row.items()
+            if value.strip()
+        ]
+
+        self.predicate = self._compile()
+
+    def _compile(self):
+        """Combina las condiciones en una sola función (AND con cortocircuito)."""
+        predicates = [condition.predicate for condition in self.conditions]
+        if not predicates:
+            return lambda item: True
+        if len(predicates) == 1:
+            return predicates[0]
+
+        def all_of(item):
+            for predicate in predicates:
+                if not predicate(item):
+                    return False
+            return True
+
+        return all_of
+
+    def __call__(self, item):
+        """Indica si el ítem cumple todas las condiciones de la fila."""
+        return self.predicate(item)
+
+
+class Matcher:
+    """Evaluación incremental de varias filas de criterios, ítem a ítem.
+
+    Solo guarda las coincidencias (como mucho `limit` por fila), así que la
+    memoria no depende del número de ítems evaluados.
+    """
+
+    def __init__(self, criteria, limit=None):
+        """Inicializa el matcher.
+
+        Args:
+            criteria (list[Criteria]): Filas compiladas.
+            limit (int, opcional): Máximo de coincidencias por fila.
+        """
+        self.limit = limit
+        self.matches = [[] for _ in criteria]
+        self._active = [(i, c.predicate) for i, c in enumerate(criteria)]
+
+    @property
+    def done(self):
+        """Indica si todas las filas han alcanzado el límite."""
+        return not self._active
+
+    def add(self, item):
+        """Evalúa un ítem contra las filas aún abiertas.
+
+        Returns:
+            bool: False si ya no queda ninguna fila abierta (se puede parar).
+        """
+        matches = self.matches
+        for index, predicate in self._active:
+            if predicate(item):
+                matches[index].append(item)
+        if self.limit is not None:
+            limit = self.limit
+            self._active = [(i, p) for i, p in self._active if len(matches[i]) < limit]
+        return bool(self._active)
+
+
+class CriteriaEngine:
+    """Evalúa varias filas de criterios compiladas sobre una lista de ítems."""
+
+    def __init__(self, rows, backend="auto"):
+        """Compila todas las filas.
+
+        Args:
+            rows (list): Filas de la tabla (dicts columna -> valor).
+            backend (str, opcional): 'python', 'numpy' o 'auto' (NumPy si está
+                instalado y hay al menos `NUMPY_THRESHOLD` ítems).
+        """
+        if backend not in ("auto", "python", "numpy"):
+            raise ValueError(f"Backend '{backend}' no válido")
+        self.criteria = [Criteria(row) for row in rows]
+        self.backend = backend
+
+    def match(self, items, limit=None):
+        """Devuelve, para cada fila, los ítems que la cumplen (en su orden).
+
+        Args:
+            items (list): Ítems a evaluar.
+            limit (int, opcional): Máximo de coincidencias por fila; cuando
+                todas las filas lo alcanzan, se deja de recorrer.
+
+        Returns:
+            list[list]: Coincidencias de cada fila, en el orden de `rows`.
+        """
+        if self._use_numpy(len(items)):
+            return self._match_numpy(items, limit)
+        return self._match_python(items, limit)
+
+    def _use_numpy(self, size):
+        """Decide el backend para una lista de `size` ítems."""
+        if self.backend != "auto":
+            return self.backend == "numpy"
+        if size < NUMPY_THRESHOLD:
+            return False
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def matcher(self, limit=None):
+        """Crea un `Matcher` para evaluar los ítems de uno en uno (streaming)."""
+        return Matcher(self.criteria, limit)
+
+    def _match_python(self, items, limit):
+        """Una sola pasada: cada ítem se evalúa contra las filas aún abiertas."""
+        matcher = self.matcher(limit)
+        for item in items:
+            if not matcher.add(item):
+                break
+        return matcher.matches
+
+    def _match_numpy(self, items, limit):
+        """Backend columnar: cada columna se extrae y convierte una sola vez.
+
+        Cada condición se evalúa como una máscara booleana sobre la columna y
+        cada fila es el AND de sus máscaras.
+        """
+        import numpy as np
+
+        size = len(items)
+        columns = {}
+
+        def column(condition):
+            key = (condition.field, condition.kind)
+            if key not in columns:
+                values = [item.get(condition.field) for item in items]
+                if condition.kind == "number":
+                    numbers = (_to_float(v) for v in values)
+                    columns[key] = np.fromiter(
+                        (np.nan if n is None else n for n in numbers), float, size
+                    )
+                elif condition.kind == "caseless":
+                    columns[key] = np.array(
+                        [None if v is None else str(v).lower() for v in values], object
+                    )
+                else:
+                    columns[key] = np.array(
+                        [None if v is None else str(v) for v in values], object
+                    )
+            return columns[key]
+
+        def mask(condition):
+            values = column(condition)
+            if condition.kind == "number":
+                if condition.operand is None:
+                    return np.zeros(size, bool)
+                # NaN (ausente o no numérico) nunca cumple ninguna comparación
+                return condition.compare(values, condition.operand)
+            if condition.kind == "contains":
+                operand = condition.operand
+                found = (v is not None and operand in v for v in values)
+                return np.fromiter(found, bool, size)
+            return values == condition.operand
+
+        matches = []
+        for criteria in self.criteria:
+            selected = np.ones(size, bool)
+            for condition in criteria.conditions:
+                selected &= mask(condition)
+            indexes = np.flatnonzero(selected)[:limit]
+            matches.append([items[i] for i in indexes])
+        return matches
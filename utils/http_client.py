@@ -0,0 +1,277 @@
+# utils/http_client.py
+"""Módulo que define `HttpClient`, un cliente HTTP asíncrono compartido con pool.
+
+Todas las peticiones de las pruebas de API pasan por la misma
+`aiohttp.ClientSession`, que vive en el event loop compartido de behave
+(`context.loop`): las conexiones keep-alive se reutilizan entre steps y
+escenarios, y las peticiones no bloquean el loop, así que pueden solaparse
+entre sí y con el trabajo del navegador.
+
+Configuración por variables de entorno:
+- API_POOL_SIZE: conexiones simultáneas por host en el pool (por defecto, 10).
+- API_RETRIES: reintentos ante errores de conexión o 502/503/504 (por defecto, 2).
+- API_CONNECT_TIMEOUT / API_READ_TIMEOUT: timeouts en segundos (3.05 / 10).
+- API_TRANSPORT: 'http' (por defecto) o 'wsgi', que entrega las peticiones a la
+  aplicación del servidor mock en el mismo proceso (ver `utils/wsgi_transport.py`).
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+
+import aiohttp
+
+RETRY_STATUSES = (502, 503, 504)
+# Como urllib3: los errores de lectura y los 5xx solo se reintentan si es idempotente
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+TRANSPORTS = ("http", "wsgi")
+# Tamaño de los trozos al leer el cuerpo en streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ApiResponse:
+    """Respuesta HTTP ya leída.
+
+    Expone `status_code`, `text`, `headers` y `json()` como `requests.Response`,
+    que es lo que usan los métodos verify_* de las páginas de API.
+    """
+
+    def __init__(self, status_code, text, headers=None):
+        """Inicializa la respuesta.
+
+        Args:
+            status_code (int): Código HTTP.
+            text (str): Cuerpo de la respuesta.
+            headers (Mapping, opcional): Cabeceras de la respuesta.
+        """
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self):
+        """Devuelve el cuerpo decodificado como JSON."""
+        return json.loads(self.text)
+
+
+class StreamedResponse:
+    """Respuesta HTTP cuyo cuerpo se lee por trozos (ver `HttpClient.stream`)."""
+
+    def __init__(self, status_code, headers, chunks):
+        """Inicializa la respuesta.
+
+        Args:
+            status_code (int): Código HTTP.
+            headers (Mapping): Cabeceras de la respuesta.
+            chunks (AsyncIterable[bytes]): Trozos del cuerpo, ya descomprimidos.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.chunks = chunks
+
+
+async def _single_chunk(body):
+    """Entrega un cuerpo ya leído como un único trozo."""
+    yield body
+
+
+class HttpClient:
+    """Clase singleton que mantiene la sesión HTTP asíncrona compartida."""
+
+    _session = None
+    # Loop en el que se creó la sesión: una sesión de aiohttp solo sirve en él
+    _loop = None
+    _stats = {"requests": 0, "connections": 0, "reused": 0}
+    # Cassette activa (ver `utils/cassette.py`): graba o reproduce las peticiones
+    cassette = None
+    _wsgi = None
+
+    def __init__(self):
+        """Lee el transporte y la configuración del pool, reintentos y timeouts."""
+        self.transport = os.getenv("API_TRANSPORT", "http").lower()
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"API_TRANSPORT '{self.transport}' no válido")
+        self.pool_size = int(os.getenv("API_POOL_SIZE", "10"))
+        self.retries = int(os.getenv("API_RETRIES", "2"))
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=float(os.getenv("API_CONNECT_TIMEOUT", "3.05")),
+            sock_read=float(os.getenv("API_READ_TIMEOUT", "10")),
+        )
+
+    async def get_session(self):
+        """Obtiene la sesión compartida, creándola en el loop actual si hace falta.
+
+        Returns:
+            aiohttp.ClientSession: Sesión con pool de conexiones.
+        """
+        session = HttpClient._session
+        loop = asyncio.get_running_loop()
+        if session is None or session.closed or HttpClient._loop is not loop:
+            stale = session
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.pool_size),
+                timeout=self.timeout,
+                trace_configs=[self._trace_config()],
+            )
+            HttpClient._session = session
+            HttpClient._loop = loop
+            # La sesión de un loop anterior se cierra en lugar de abandonarla
+            if stale is not None and not stale.closed:
+                await stale.close()
+        return session
+
+    @staticmethod
+    def _wsgi_transport():
+        """Devuelve el transporte WSGI compartido, creándolo la primera vez."""
+        if HttpClient._wsgi is None:
+            from utils.wsgi_transport import WsgiTransport
+
+            HttpClient._wsgi = WsgiTransport()
+        return HttpClient._wsgi
+
+    @staticmethod
+    def _trace_config():
+        """Crea los hooks de aiohttp que cuentan peticiones y conexiones."""
+        stats = HttpClient._stats
+
+        async def on_request_start(session, trace_context, params):
+            stats["requests"] += 1
+
+        async def on_connection_create_end(session, trace_context, params):
+            stats["connections"] += 1
+
+        async def on_connection_reuseconn(session, trace_context, params):
+            stats["reused"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    async def request(self, method, url, **kwargs):
+        """Envía una petición con reintentos y devuelve la respuesta ya leída.
+
+        Los errores al conectar se reintentan siempre; los de lectura y los
+        502/503/504, solo en métodos idempotentes. La espera entre intentos
+        crece exponencialmente (0.2 s, 0.4 s, ...). Con una cassette activa, la
+        respuesta se graba o, en modo `replay`, se lee de ella sin red.
+
+        Args:
+            method (str): Método HTTP.
+            url (str): URL completa.
+            **kwargs: Argumentos de `aiohttp.ClientSession.request`
+                (headers, params, json...).
+
+        Returns:
+            ApiResponse: Respuesta con el cuerpo ya leído.
+        """
+        cassette = HttpClient.cassette
+        if cassette is None:
+            return await self._send(method, url, **kwargs)
+        key = cassette.key(
+            method,
+            url,
+            params=kwargs.get("params"),
+            json_body=kwargs.get("json"),
+            data=kwargs.get("data"),
+            headers=kwargs.get("headers"),
+        )
+        if cassette.replaying:
+            return cassette.play(key)
+        response = await self._send(method, url, **kwargs)
+        cassette.record(key, response)
+        return response
+
+    async def _send(self, method, url, **kwargs):
+        """Envía la petición al servidor con reintentos (ver `request`)."""
+        if self.transport == "wsgi":
+            HttpClient._stats["requests"] += 1
+            return self._wsgi_transport().request(method, url, **kwargs)
+        session = await self.get_session()
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    text = await response.text()
+                result = ApiResponse(response.status, text, response.headers)
+                if last or not idempotent or result.status_code not in RETRY_STATUSES:
+                    return result
+            except aiohttp.ClientConnectorError:
+                if last:
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if last or not idempotent:
+                    raise
+            await asyncio.sleep(0.2 * 2**attempt)
+
+    async def get(self, url, **kwargs):
+        """Envía una petición GET (ver `request`)."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        """Envía una petición POST (ver `request`)."""
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        """Envía una petición PUT (ver `request`)."""
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        """Envía una petición DELETE (ver `request`)."""
+        return await self.request("DELETE", url, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method, url, **kwargs):
+        """Envía una petición y entrega el cuerpo por trozos, sin leerlo entero.
+
+        No se reintenta: el cuerpo se consume a medida que llega. Si el
+        consumidor para antes del final, la conexión se cierra en lugar de
+        volver al pool. Con una cassette activa o con el transporte WSGI se usa
+        `request` y el cuerpo se entrega en un único trozo.
+
+        Args:
+            method (str): Método HTTP.
+            url (str): URL completa.
+            **kwargs: Argumentos de `aiohttp.ClientSession.request`.
+
+        Yields:
+            StreamedResponse: Respuesta con el cuerpo en `chunks`.
+        """
+        if HttpClient.cassette is not None or self.transport == "wsgi":
+            response = await self.request(method, url, **kwargs)
+            chunks = _single_chunk(response.text.encode("utf-8"))
+            yield StreamedResponse(response.status_code, response.headers, chunks)
+            return
+        session = await self.get_session()
+        async with session.request(method, url, **kwargs) as response:
+            chunks = response.content.iter_chunked(STREAM_CHUNK_SIZE)
+            yield StreamedResponse(response.status, response.headers, chunks)
+
+    @classmethod
+    def use_cassette(cls, cassette):
+        """Activa una cassette para las peticiones siguientes (None la desactiva).
+
+        Args:
+            cassette (utils.cassette.Cassette | None): Cassette a usar.
+        """
+        cls.cassette = cassette
+
+    @classmethod
+    def stats(cls):
+        """Devuelve estadísticas de uso del pool de conexiones.
+
+        Returns:
+            dict: Peticiones enviadas, conexiones abiertas y peticiones que
+                reutilizaron una conexión existente.
+        """
+        return dict(cls._stats)
+
+    @classmethod
+    async def close(cls):
+        """Cierra la sesión compartida y sus conexiones."""
+        if cls._session and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
+        cls._loop = None
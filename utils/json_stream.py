@@ -0,0 +1,113 @@
+# utils/json_stream.py
+"""Módulo que define `JsonArrayStream`, un parser JSON incremental.
+
+Permite recorrer los elementos de un array de un objeto JSON (p. ej. `data` en
+la respuesta de GET /items) a medida que llegan los trozos del cuerpo, sin
+decodificar ni guardar en memoria la respuesta completa: solo se mantiene el
+elemento en curso. El resto de claves de primer nivel (`success`, `total`...)
+se decodifican normalmente y quedan en `fields`.
+"""
+
+import codecs
+import json
+
+WHITESPACE = " \t\n\r"
+# Tamaño a partir del cual se descarta del buffer lo ya consumido
+COMPACT_SIZE = 1 << 16
+
+
+class JsonArrayStream:
+    """Iterador asíncrono sobre los elementos de `obj[key]` de un JSON en trozos."""
+
+    def __init__(self, chunks, key="data"):
+        """Inicializa el parser.
+
+        Args:
+            chunks (AsyncIterable[bytes]): Trozos del cuerpo de la respuesta.
+            key (str, opcional): Clave del array a recorrer. Por defecto, 'data'.
+        """
+        self.chunks = chunks.__aiter__()
+        self.key = key
+        self.fields = {}
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    async def _more(self):
+        """Añade el siguiente trozo al buffer; devuelve False al final del cuerpo."""
+        if self._eof:
+            return False
+        try:
+            chunk = await self.chunks.__anext__()
+        except StopAsyncIteration:
+            self._eof = True
+            self._buffer += self._utf8.decode(b"", final=True)
+            return False
+        self._buffer += self._utf8.decode(chunk)
+        return True
+
+    async def _peek(self):
+        """Salta espacios y devuelve el siguiente carácter significativo."""
+        while True:
+            buffer = self._buffer
+            while self._pos < len(buffer) and buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buffer):
+                return buffer[self._pos]
+            if not await self._more():
+                raise ValueError("JSON incompleto: el cuerpo terminó antes de tiempo")
+
+    async def _expect(self, char):
+        """Consume `char` (tras los espacios) o lanza ValueError."""
+        found = await self._peek()
+        if found != char:
+            raise ValueError(f"JSON no válido: se esperaba '{char}' y llegó '{found}'")
+        self._pos += 1
+
+    async def _value(self):
+        """Decodifica el siguiente valor JSON completo, leyendo más si hace falta.
+
+        Un valor que acaba justo al final del buffer (p. ej. el número `12` de
+        `123`) solo se acepta cuando ya no quedan más trozos.
+        """
+        await self._peek()
+        if self._pos > COMPACT_SIZE:
+            consumed, self._pos = self._pos, 0
+            self._buffer = self._buffer[consumed:]
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not await self._more():
+                    raise
+                continue
+            if end < len(self._buffer) or not await self._more():
+                self._pos = end
+                return value
+
+    async def __aiter__(self):
+        """Recorre los elementos del array y rellena `fields` con el resto."""
+        await self._expect("{")
+        if await self._peek() == "}":
+            return
+        while True:
+            name = await self._value()
+            await self._expect(":")
+            if name == self.key and await self._peek() == "[":
+                self._pos += 1
+                if await self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield await self._value()
+                        if await self._peek() == "]":
+                            self._pos += 1
+                            break
+                        await self._expect(",")
+            else:
+                self.fields[name] = await self._value()
+            if await self._peek() == "}":
+                return
+            await self._expect(",")
@@ -0,0 +1,56 @@
+# utils/threaded_loop.py
+"""Módulo que define `ThreadedLoop`, un event loop de asyncio en su propio hilo.
+
+Los steps ejecutan el código asíncrono con `context.loop.run_until_complete`,
+que bloquea al que llama hasta que la corrutina termina. Con un loop normal eso
+solo permite un escenario a la vez. `ThreadedLoop` ofrece el mismo método, pero
+la corrutina se entrega a un único loop que corre en un hilo aparte: varios
+escenarios, cada uno en su hilo, pueden esperar a la vez y sus corrutinas se
+ejecutan de forma concurrente en el mismo loop (y con el mismo navegador).
+"""
+
+import asyncio
+import threading
+
+
+class ThreadedLoop:
+    """Event loop que corre en un hilo propio y acepta corrutinas de otros hilos."""
+
+    def __init__(self):
+        """Crea el loop y arranca el hilo que lo ejecuta."""
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="asyncio-loop", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        """Ejecuta el loop en el hilo propio hasta que se detiene."""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run_until_complete(self, coro):
+        """Ejecuta `coro` en el loop y espera su resultado.
+
+        Args:
+            coro (Coroutine): Corrutina a ejecutar.
+
+        Returns:
+            Any: Resultado de la corrutina (o relanza su excepción).
+
+        Raises:
+            RuntimeError: Si se llama desde el propio hilo del loop, donde
+                esperar al resultado bloquearía el loop para siempre.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run_until_complete no se puede usar dentro del loop")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self):
+        """Detiene el loop, espera a su hilo y lo cierra."""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -0,0 +1,120 @@
+# utils/token_cache.py
+"""Módulo que define `TokenCache`, una caché de tokens compartida entre procesos.
+
+El Background de las pruebas de API hace login en cada escenario. Con esta
+caché, el token obtenido se reutiliza en los escenarios siguientes y en los
+demás workers que se lancen en paralelo: se guarda en memoria y en un fichero
+JSON protegido con `filelock`, así que solo se vuelve a hacer login cuando el
+token caduca o el servidor lo rechaza (401).
+
+Configuración por variables de entorno:
+- API_TOKEN_CACHE: ruta del fichero compartido (por defecto, en el directorio
+  temporal del sistema). Con el valor 'off' solo se usa la caché en memoria.
+- API_TOKEN_TTL: segundos de validez de un token si el login no indica su
+  caducidad con `expires_in` (por defecto, 3600).
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from filelock import FileLock
+
+DEFAULT_CACHE_FILE = Path(tempfile.gettempdir()) / "behave-api-tokens.json"
+# Margen para no usar un token que caduque en mitad de un escenario
+EXPIRY_MARGIN = 30
+
+
+class TokenCache:
+    """Clase singleton con los tokens vigentes, indexados por URL de la API."""
+
+    _tokens = {}
+
+    def __init__(self):
+        """Lee la ruta del fichero compartido y la validez por defecto del entorno."""
+        path = os.getenv("API_TOKEN_CACHE", str(DEFAULT_CACHE_FILE))
+        self.path = None if path.lower() == "off" else Path(path)
+        self.ttl = float(os.getenv("API_TOKEN_TTL", "3600"))
+
+    def _lock(self):
+        """Devuelve el lock del fichero compartido."""
+        return FileLock(f"{self.path}.lock", timeout=10)
+
+    def _read(self):
+        """Lee el fichero compartido (vacío si no existe o está corrupto)."""
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, tokens):
+        """Escribe el fichero compartido de forma atómica (solo para el usuario)."""
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            json.dump(tokens, tmp_file)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _valid(entry):
+        """Indica si una entrada existe y no está a punto de caducar."""
+        return entry is not None and entry["expires_at"] - EXPIRY_MARGIN > time.time()
+
+    def get(self, key):
+        """Devuelve el token vigente para `key` o None si hay que hacer login.
+
+        Primero se consulta la memoria del proceso y, si no hay token válido,
+        el fichero compartido (donde puede haberlo dejado otro worker).
+
+        Args:
+            key (str): URL base de la API.
+
+        Returns:
+            str | None: Token vigente.
+        """
+        entry = TokenCache._tokens.get(key)
+        if not self._valid(entry) and self.path:
+            with self._lock():
+                entry = self._read().get(key)
+            if self._valid(entry):
+                TokenCache._tokens[key] = entry
+        return entry["token"] if self._valid(entry) else None
+
+    def put(self, key, token, expires_in=None):
+        """Guarda un token recién obtenido.
+
+        Args:
+            key (str): URL base de la API.
+            token (str): Token devuelto por /login.
+            expires_in (float, opcional): Segundos de validez indicados por el
+                servidor. Por defecto, `API_TOKEN_TTL`.
+        """
+        ttl = self.ttl if expires_in is None else float(expires_in)
+        entry = {"token": token, "expires_at": time.time() + ttl}
+        TokenCache._tokens[key] = entry
+        if self.path:
+            with self._lock():
+                tokens = self._read()
+                tokens[key] = entry
+                self._write(tokens)
+
+    def invalidate(self, key, token):
+        """Descarta un token rechazado por el servidor.
+
+        Solo se borra si sigue siendo el guardado: si otro worker ya lo ha
+        renovado, el nuevo se conserva.
+
+        Args:
+            key (str): URL base de la API.
+            token (str): Token rechazado.
+        """
+        if TokenCache._tokens.get(key, {}).get("token") == token:
+            del TokenCache._tokens[key]
+        if self.path:
+            with self._lock():
+                tokens = self._read()
+                if tokens.get(key, {}).get("token") == token:
+                    del tokens[key]
+                    self._write(tokens)
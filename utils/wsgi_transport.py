@@ -0,0 +1,69 @@
+# utils/wsgi_transport.py
+"""Módulo que define `WsgiTransport`, el transporte en proceso de `HttpClient`.
+
+Con `API_TRANSPORT=wsgi`, las peticiones de las pruebas de API no salen por la
+red: se entregan directamente a la aplicación WSGI del servidor mock (por
+defecto `mocks.mock_server:app`) mediante el cliente de pruebas de Flask. No
+hay sockets ni proceso aparte, así que no hay que esperar a que el servidor
+arranque ni se paga el coste de TCP por petición. El esquema y el host de la
+URL se ignoran; la ruta (incluido el prefijo `/t/<tenant>/`) se respeta.
+
+Configuración por variables de entorno:
+- API_WSGI_APP: aplicación a usar, como `modulo:atributo`
+  (por defecto, 'mocks.mock_server:app').
+"""
+
+import importlib
+import os
+from urllib.parse import parse_qsl, urlsplit
+
+from utils.http_client import ApiResponse
+
+DEFAULT_WSGI_APP = "mocks.mock_server:app"
+
+
+class WsgiTransport:
+    """Envía peticiones a una aplicación Flask en el mismo proceso."""
+
+    def __init__(self, app=None):
+        """Carga la aplicación (importándola la primera vez que se usa).
+
+        Args:
+            app (flask.Flask, opcional): Aplicación a usar. Por defecto, la
+                indicada en `API_WSGI_APP`.
+        """
+        if app is None:
+            module_name, _, attribute = os.getenv(
+                "API_WSGI_APP", DEFAULT_WSGI_APP
+            ).partition(":")
+            app = getattr(importlib.import_module(module_name), attribute or "app")
+        self.client = app.test_client()
+
+    def request(self, method, url, params=None, json=None, data=None, headers=None):
+        """Envía una petición a la aplicación y devuelve la respuesta ya leída.
+
+        Args:
+            method (str): Método HTTP.
+            url (str): URL completa (solo se usan la ruta y la query).
+            params (dict, opcional): Parámetros de la query.
+            json (Any, opcional): Cuerpo JSON.
+            data (bytes | str, opcional): Cuerpo sin codificar.
+            headers (dict, opcional): Cabeceras.
+
+        Returns:
+            ApiResponse: Respuesta con el cuerpo ya leído.
+        """
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        query.extend((params or {}).items())
+        response = self.client.open(
+            parts.path or "/",
+            method=method.upper(),
+            query_string=query,
+            json=json,
+            data=data,
+            headers=headers,
+        )
+        return ApiResponse(
+            response.status_code, response.get_data(as_text=True), response.headers
+        )